@@ -0,0 +1,10 @@
+import azure.functions as func
+import logging
+from TranscribeAudio.bubble_outbox import get_dispatcher
+
+
+def main(timer: func.TimerRequest) -> None:
+    # Timer triggers run on one instance at a time, so each delivery is attempted once per pass
+    counts = get_dispatcher().dispatch_due()
+    if any(counts.values()):
+        logging.info(f"Bubble dispatch pass: {counts}")
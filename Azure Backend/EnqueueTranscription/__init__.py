@@ -0,0 +1,53 @@
+import azure.functions as func
+import os
+import json
+import logging
+from TranscribeAudio import InvalidRequestError, parse_transcription_request, process_transcription
+from TranscribeAudio.jobs import enqueue_job, get_job_store, get_local_queue, run_job
+from TranscribeAudio.language_config import get_supported_countries
+
+
+def main(req: func.HttpRequest, msg: func.Out[str]) -> func.HttpResponse:
+    logging.info("Enqueue transcription started")
+
+    try:
+        file_url, country, options = parse_transcription_request(req)
+    except InvalidRequestError as e:
+        return func.HttpResponse(
+            json.dumps(e.body),
+            status_code=400,
+            mimetype="application/json"
+        )
+
+    try:
+        store = get_job_store()
+
+        # JOB_QUEUE=local drains jobs on in-process threads instead of the storage queue
+        if os.environ.get("JOB_QUEUE", "storage").lower() == "local":
+            send = get_local_queue(lambda message: run_job(message, store, process_transcription)).put
+        else:
+            send = msg.set
+
+        record = enqueue_job(store, {"file_url": file_url, "country": country, **options}, send)
+        logging.info(f"Enqueued transcription job: {record['job_id']}")
+
+        return func.HttpResponse(
+            json.dumps({
+                "job_id": record["job_id"],
+                "status": record["status"],
+                "status_url": f"/api/status/{record['job_id']}"
+            }),
+            status_code=202,
+            mimetype="application/json"
+        )
+
+    except Exception as e:
+        logging.error(f"Error: {str(e)}")
+        return func.HttpResponse(
+            json.dumps({
+                "error": str(e),
+                "supported_countries": get_supported_countries()
+            }),
+            status_code=500,
+            mimetype="application/json"
+        )
@@ -6,147 +6,244 @@ import subprocess
 import requests
 import json
 import time
-import stat
 import logging
 import zipfile
 import io
-import tarfile
-from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_blob_sas
-from azure.cognitiveservices.speech import SpeechConfig
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from azure.storage.blob import ContentSettings
 from datetime import datetime, timedelta
 from .language_config import get_language_config, get_supported_countries
-from langchain.llms import AzureOpenAI
+from .audio_stream import DownloadError, IngestError, download_to_file, iter_converted_wav, stage_wav_stream
+from .ffmpeg_binary import prewarm_ffmpeg, resolve_ffmpeg_path
+from .wav_audio import decode_wav_in_process, read_wav_info
+from .silence import TrimResult, remap_transcription_result, trim_silence
+from .chunked_transcription import get_min_chunk_seconds, transcribe_in_segments
+from .polling import AdaptivePoller, ThrottledError, parse_retry_after
+from .http_session import get_session
+from .storage import get_container_client
+from .sas_links import get_link_signer
+from .llm import complete
+from .result_cache import ResultCache, cached_stage, get_result_cache, hash_wav_file, hash_wav_stream, transcript_key
+from .translation_memory import get_translation_memory
+from .translator_client import get_translator_client
+from .stage_planner import StagePlan, plan_stages
+from .progress import ProgressPublisher, create_progress_publisher
+from .pipeline import Pipeline, Stage
+from .checkpoints import get_job_checkpoint
+from .bubble_outbox import BUBBLE_HEADERS, ensure_local_dispatch_loop, get_outbox_store, new_delivery
+from .text_chunking import count_tokens, get_chunk_tokens, map_reduce_summary, transform_in_chunks
+from .structured_llm import LLM_PIPELINE_MODES, StructuredResponseError, refine_english, refine_translated
+from .realtime_transcription import iter_file_chunks, iter_wav_pcm, transcribe_realtime
+
+# Resolve ffmpeg while the worker starts instead of on the first request
+if os.environ.get("FFMPEG_PREWARM", "false").lower() in ("1", "true"):
+    prewarm_ffmpeg()
 
 def clean_transcription(text: str, language: str) -> str:
     """
     Cleans up transcription text using Azure OpenAI LLM via LangChain.
+    Long transcripts are cleaned in chunks that fit the context window.
     Args:
         text: The raw transcription text
         language: The language code (e.g., 'en', 'hi', etc.)
     Returns:
         Cleaned transcription string
     """
-    import os
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
-    api_key = os.environ["AZURE_OPENAI_KEY"]
-    azure_endpoint = os.environ["AZURE_OPENAI_ENDPOINT"]
+    def clean_chunk(chunk: str) -> str:
+        prompt = (
+            f"Clean up this {language} transcription: "
+            "remove filler words, repeated words, fix grammar and punctuation, "
+            "and make it easy to translate. Output only the cleaned text.\n\n"
+            f"Transcription:\n{chunk}\n\nCleaned:"
+        )
+        return complete(prompt)
 
-    prompt = (
-        f"Clean up this {language} transcription: "
-        "remove filler words, repeated words, fix grammar and punctuation, "
-        "and make it easy to translate. Output only the cleaned text.\n\n"
-        f"Transcription:\n{text}\n\nCleaned:"
-    )
-    llm = AzureOpenAI(
-        deployment_name=deployment_name,
-        api_key=api_key,
-        azure_endpoint=azure_endpoint
-    )
-    return llm(prompt)
+    return transform_in_chunks(text, clean_chunk)
 
-def polish_english_text(text: str) -> str:
+def polish_english_text(text: str, on_progress=None) -> str:
     """
     Polishes English text for clarity, grammar, and natural flow using Azure OpenAI LLM via LangChain.
+    Long texts are polished in parallel chunks that fit the context window.
     Args:
         text: The English text to polish
+        on_progress: Optional callback receiving the polished text produced so far
     Returns:
         Polished English text
     """
-    import os
-    from langchain.llms import AzureOpenAI
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
-    api_key = os.environ["AZURE_OPENAI_KEY"]
-    azure_endpoint = os.environ["AZURE_OPENAI_ENDPOINT"]
+    def polish_chunk(chunk: str, on_text=None) -> str:
+        prompt = (
+            "Polish this English text for clarity, grammar, and natural flow. "
+            "Output only the improved version.\n\n"
+            f"Text:\n{chunk}\n\nPolished:"
+        )
+        return complete(prompt, on_text=on_text)
 
-    prompt = (
-        "Polish this English text for clarity, grammar, and natural flow. "
-        "Output only the improved version.\n\n"
-        f"Text:\n{text}\n\nPolished:"
-    )
-    llm = AzureOpenAI(
-        deployment_name=deployment_name,
-        api_key=api_key,
-        azure_endpoint=azure_endpoint
-    )
-    return llm(prompt)
+    return transform_in_chunks(text, polish_chunk, on_progress=on_progress)
 
 
-def summarize_transcript(text: str) -> str:
+def summarize_transcript(text: str, on_progress=None) -> str:
     """
     Summarizes a transcript, highlighting main points and action items, using Azure OpenAI LLM via LangChain.
+    Long transcripts are summarized map-reduce style: each chunk is summarized
+    in parallel and the partial summaries are combined.
     Args:
         text: The transcript text to summarize
+        on_progress: Optional callback receiving the summary produced so far
     Returns:
         Summary string
     """
-    import os
-    from langchain.llms import AzureOpenAI
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
-    api_key = os.environ["AZURE_OPENAI_KEY"]
-    azure_endpoint = os.environ["AZURE_OPENAI_ENDPOINT"]
+    def summarize(chunk: str, on_text=None) -> str:
+        prompt = (
+            "Summarize the following voice memo in 2-3 sentences, highlighting the main points and any action items. "
+            "Output only the summary.\n\n"
+            f"Transcript:\n{chunk}\n\nSummary:"
+        )
+        return complete(prompt, on_text=on_text)
 
-    prompt = (
-        "Summarize the following voice memo in 2-3 sentences, highlighting the main points and any action items. "
-        "Output only the summary.\n\n"
-        f"Transcript:\n{text}\n\nSummary:"
-    )
-    llm = AzureOpenAI(
-        deployment_name=deployment_name,
-        api_key=api_key,
-        azure_endpoint=azure_endpoint
+    def summarize_part(chunk: str) -> str:
+        prompt = (
+            "The following is one part of a longer voice memo. Summarize this part in a few sentences, "
+            "keeping its main points and any action items. Output only the summary.\n\n"
+            f"Transcript part:\n{chunk}\n\nSummary:"
+        )
+        return complete(prompt)
+
+    def combine(partials: str, on_text=None) -> str:
+        prompt = (
+            "The following are summaries of consecutive parts of one voice memo. Combine them into a single "
+            "2-3 sentence summary, highlighting the main points and any action items. Output only the summary.\n\n"
+            f"Part summaries:\n{partials}\n\nSummary:"
+        )
+        return complete(prompt, on_text=on_text)
+
+    return map_reduce_summary(text, summarize, summarize_part, combine, on_progress=on_progress)
+
+def call_llm(prompt: str) -> str:
+    """Sends a single prompt to the Azure OpenAI deployment and returns the completion"""
+    return complete(prompt)
+
+def get_llm_pipeline_mode(requested: str = None) -> str:
+    """
+    LLM pipeline for a request: the per-request llm_mode, else LLM_PIPELINE_MODE.
+    "sequential" (default) makes separate clean, polish and summarize calls,
+    "structured" asks for all outputs as one JSON object.
+    """
+    mode = (requested or os.environ.get("LLM_PIPELINE_MODE", "sequential")).lower()
+    if mode not in LLM_PIPELINE_MODES:
+        raise ValueError(f"Unsupported LLM pipeline mode: {mode}. Use 'sequential' or 'structured'")
+    return mode
+
+def refine_transcript(original_text: str, country: str, report, llm_mode: str = None, cache: ResultCache = None, parent_key: str = None, plan: StagePlan = None, progress: ProgressPublisher = None) -> tuple[str, str, str, str]:
+    """
+    Clean, translate, polish and summarize a transcript.
+
+    Stages the plan skips pass their input through: an English source is not
+    translated, and a trivially short transcript is its own cleaned, polished
+    and summarized text. In structured mode an English source needs one LLM
+    call for all three outputs; other languages are cleaned, translated, then
+    polished and summarized in a second call. If a structured response fails
+    validation the remaining steps run through the sequential prompts.
+
+    Args:
+        original_text: Transcript in the source language
+        country: Source country
+        report: Stage callback, invoked only for stages that run
+        llm_mode: Requested LLM pipeline mode, or None for the configured default
+        cache: Optional result cache; each stage is reused when its input and version are unchanged
+        parent_key: Cache key of original_text
+        plan: Stages to run (defaults to plan_stages for the transcript)
+        progress: Optional publisher; the English, polished and summary texts are
+            published as soon as each is ready, and LLM output is streamed to it
+
+    Returns:
+        Tuple of (cleaned_text, english_text, polished_english_text, summary_text)
+    """
+    lang_config = get_language_config(country)
+    plan = plan or plan_stages(lang_config, original_text)
+
+    def publish(field: str, text: str) -> None:
+        if progress:
+            progress.complete(field, text)
+
+    def streamer(field: str):
+        return progress.streamer(field) if progress else None
+
+    def finish(cleaned: str, english: str, polished: str, summary: str) -> tuple[str, str, str, str]:
+        publish("polished_english_text", polished)
+        publish("summary_text", summary)
+        return cleaned, english, polished, summary
+    # Long transcripts are processed in chunks, so the chunk size is part of each LLM stage's cache key
+    chunk_tokens = get_chunk_tokens()
+    # A single structured call only works while the transcript fits one prompt
+    structured = (
+        get_llm_pipeline_mode(llm_mode) == "structured" and plan.runs("polish")
+        and count_tokens(original_text) <= chunk_tokens
     )
-    return llm(prompt)
+    deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
 
-#local Testing
-"""
-def convert_mp4_to_wav(mp4_path: str, wav_path: str) -> None:
-   ffmpeg_path = os.path.join(os.path.dirname(__file__), 'ffmpeg', 'ffmpeg')
-   
-   subprocess.run([
-        ffmpeg_path, "-y", "-i", mp4_path,
-        "-ar", "16000",  # 16kHz sample rate for STT
-        "-ac", "1",      # mono channel
-        wav_path
-    ], check=True)
-   
-   '''subprocess.run([
-        "ffmpeg", "-y", "-i", mp4_path,
-        "-ar", "16000",  # 16kHz sample rate for STT
-        "-ac", "1",      # mono channel
-        wav_path
-    ], check=True) '''
-    
-"""
-#Azure Testing
-def get_tmp_ffmpeg_path() -> str:
-    tmp_ffmpeg_path = "/tmp/ffmpeg"
-    if not os.path.exists(tmp_ffmpeg_path):
-        print("Downloading ffmpeg static Linux build...")
-        ffmpeg_url = "https://www.johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
-        archive_path = "/tmp/ffmpeg.tar.xz"
-
-        # Download .tar.xz archive
-        with requests.get(ffmpeg_url, stream=True) as r:
-            r.raise_for_status()
-            with open(archive_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-        # Extract archive
-        with tarfile.open(archive_path, mode='r:xz') as tar:
-            for member in tar.getmembers():
-                if member.isfile() and os.path.basename(member.name) == "ffmpeg":
-                    member.name = os.path.basename(member.name)  # Remove path
-                    tar.extract(member, path="/tmp")
-                    break
-
-        os.rename("/tmp/ffmpeg", tmp_ffmpeg_path)
-        os.chmod(tmp_ffmpeg_path, os.stat(tmp_ffmpeg_path).st_mode | stat.S_IEXEC)
-
-    return tmp_ffmpeg_path
+    if structured and not plan.runs("translate"):
+        report("refining")
+        try:
+            refined, _ = cached_stage(cache, parent_key, "refine_english", lambda: refine_english(original_text, call_llm), deployment)
+            publish("english_text", refined["cleaned_text"])
+            return finish(refined["cleaned_text"], refined["cleaned_text"], refined["polished_text"], refined["summary"])
+        except StructuredResponseError as e:
+            logging.warning(f"Structured LLM response rejected, falling back to sequential calls: {str(e)}")
+
+    # Step 1: Clean the original transcript
+    cleaned_text, cleaned_key = original_text, parent_key
+    if plan.runs("clean"):
+        report("cleaning")
+        cleaned_text, cleaned_key = cached_stage(
+            cache, parent_key, "clean",
+            lambda: clean_transcription(original_text, lang_config.translate_from),
+            lang_config.translate_from, deployment, chunk_tokens
+        )
+
+    # Step 2: Translate the cleaned transcript to English
+    english_text, english_key = cleaned_text, cleaned_key
+    if plan.runs("translate") and cleaned_text:
+        report("translating")
+        english_text, english_key = cached_stage(
+            cache, cleaned_key, "translate",
+            lambda: translate_to_english(cleaned_text, country),
+            lang_config.translate_from, lang_config.translate_to
+        )
+    publish("english_text", english_text)
+
+    if structured and english_text:
+        report("refining")
+        try:
+            refined, _ = cached_stage(cache, english_key, "refine_translated", lambda: refine_translated(english_text, call_llm), deployment)
+            return finish(cleaned_text, english_text, refined["polished_text"], refined["summary"])
+        except StructuredResponseError as e:
+            logging.warning(f"Structured LLM response rejected, falling back to sequential calls: {str(e)}")
+
+    # Step 3: Polish the English translation
+    polished_english_text, polished_key = english_text, english_key
+    if plan.runs("polish") and english_text:
+        report("polishing")
+        polished_english_text, polished_key = cached_stage(
+            cache, english_key, "polish",
+            lambda: polish_english_text(english_text, on_progress=streamer("polished_english_text")),
+            deployment, chunk_tokens
+        )
+
+    # Step 4: Summarize the polished English transcript
+    summary_text = polished_english_text
+    if plan.runs("summarize") and polished_english_text:
+        report("summarizing")
+        summary_text, _ = cached_stage(
+            cache, polished_key, "summarize",
+            lambda: summarize_transcript(polished_english_text, on_progress=streamer("summary_text")),
+            deployment, chunk_tokens
+        )
+
+    return finish(cleaned_text, english_text, polished_english_text, summary_text)
 
 def convert_mp4_to_wav(mp4_path: str, wav_path: str) -> None:
-    ffmpeg_path = get_tmp_ffmpeg_path()
+    ffmpeg_path = resolve_ffmpeg_path()
     subprocess.run([
         ffmpeg_path,
         "-y", "-i", mp4_path,
@@ -156,29 +253,199 @@ def convert_mp4_to_wav(mp4_path: str, wav_path: str) -> None:
     ], check=True)
 
 def upload_to_blob(file_path: str) -> str:
-    connect_str = os.environ["AZURE_STORAGE_CONNECTION_STRING"]
-    container_name = os.environ["AZURE_STORAGE_CONTAINER"]
-    blob_service_client = BlobServiceClient.from_connection_string(connect_str)
+    container_client = get_container_client()
     blob_name = f"audio/{uuid.uuid4()}{os.path.splitext(file_path)[1]}"
-    blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+    blob_client = container_client.get_blob_client(blob_name)
 
     with open(file_path, "rb") as data:
         blob_client.upload_blob(data, overwrite=True)
 
-    sas_token = generate_blob_sas(
-        account_name=blob_service_client.account_name,
-        container_name=container_name,
-        blob_name=blob_name,
-        account_key=blob_service_client.credential.account_key,
-        permission=BlobSasPermissions(read=True),
-        expiry=datetime.utcnow() + timedelta(hours=1)
-    )
+    return get_link_signer().sign(blob_name, datetime.utcnow() + timedelta(hours=1))
+
+def upload_wav_stream(chunks) -> str:
+    """
+    Upload a streamed WAV file to blob storage without materialising it locally.
+
+    Args:
+        chunks: Iterable of WAV bytes, e.g. from iter_converted_wav
+
+    Returns:
+        Blob URL with a read-only SAS token
+    """
+    container_client = get_container_client()
+    blob_name = f"audio/{uuid.uuid4()}.wav"
+    blob_client = container_client.get_blob_client(blob_name)
+
+    stage_wav_stream(blob_client, chunks)
+
+    return get_link_signer().sign(blob_name, datetime.utcnow() + timedelta(hours=1))
+
+def transcribe_source(file_url: str, country: str, report, mode: str = "batch", cache: ResultCache = None, on_text=None) -> tuple[str, TrimResult, str]:
+    """
+    Download, convert and transcribe the source audio.
+
+    INGEST_MODE=stream pipes the download through ffmpeg without touching disk,
+    falling back to the buffered path if ffmpeg cannot decode the container
+    from a pipe. The default buffered mode downloads to a temp file, compresses
+    long silences when TRIM_SILENCE is enabled, and transcribes recordings
+    longer than CHUNK_TRANSCRIPTION_MIN_SECONDS as parallel segments.
+
+    With a result cache, the decoded audio is hashed and a transcript of the
+    same audio and settings is reused instead of calling Azure Speech.
+
+    Args:
+        file_url: URL of the audio file
+        country: Source country for language detection
+        report: Stage callback
+        mode: "batch" for the batch REST API with diarization, or "realtime"
+            to push the PCM through the Speech SDK's continuous recognition
+        cache: Optional result cache
+        on_text: Optional callback receiving the transcript recognised so far,
+            including the phrase in progress, while real-time recognition runs
+
+    Returns:
+        Tuple of (original transcript, TrimResult or None if the audio was not
+        trimmed, cache key of the transcript or None without a cache)
+    """
+    lang_config = get_language_config(country)
+    trim_enabled = os.environ.get("TRIM_SILENCE", "false").lower() in ("1", "true")
+
+    # Real-time recognition reports the transcript so far as phrases arrive
+    recognized = []
+
+    def on_final(text: str) -> None:
+        recognized.append(text)
+        if on_text:
+            on_text(" ".join(recognized))
 
-    return f"{blob_client.url}?{sas_token}"
+    def on_partial(text: str) -> None:
+        if on_text:
+            on_text(" ".join(recognized + [text]))
+
+    def cache_key(audio_hash: str) -> str:
+        return transcript_key(audio_hash, country, mode, trim_enabled) if cache is not None else None
+
+    def cache_lookup(audio_hash: str):
+        if cache is None:
+            return None, None
+        key = cache_key(audio_hash)
+        entry = cache.get(key)
+        if entry is not None:
+            logging.info("Result cache hit for stage transcribe")
+        return key, entry
+
+    def cache_store(key: str, text: str, trim: TrimResult) -> None:
+        if cache is not None and key:
+            cache.put(key, {"text": text, "silence_trim": trim.to_dict() if trim else None})
+
+    def from_entry(entry: dict, key: str) -> tuple[str, TrimResult, str]:
+        trim = TrimResult.from_dict(entry["silence_trim"]) if entry["silence_trim"] else None
+        return entry["text"], trim, key
+
+    ffmpeg_path = None
+    if os.environ.get("INGEST_MODE", "buffered").lower() == "stream":
+        try:
+            ffmpeg_path = resolve_ffmpeg_path()
+        except Exception as e:
+            logging.warning(f"ffmpeg unavailable for streaming ingest, falling back to buffered download: {str(e)}")
+
+    if ffmpeg_path:
+        report("ingesting")
+        digest = hashlib.sha256()
+        # Only conversion failures fall back to the buffered path; recognition
+        # and upload errors propagate rather than transcribing the audio twice
+        pushed = []
+
+        def track_pushed(pcm_chunks):
+            for chunk in pcm_chunks:
+                if chunk:
+                    pushed.append(len(chunk))
+                yield chunk
+
+        try:
+            wav_chunks = hash_wav_stream(iter_converted_wav(file_url, ffmpeg_path), digest)
+            if mode == "realtime":
+                report("transcribing")
+                result = transcribe_realtime(track_pushed(iter_wav_pcm(wav_chunks)), lang_config.speech_locale, on_partial=on_partial, on_final=on_final)
+                # The hash is only complete after recognition, so the transcript is stored but not looked up
+                key = cache_key(digest.hexdigest())
+                original_text = combine_phrases(result)
+                cache_store(key, original_text, None)
+                return original_text, None, key
+            blob_url = upload_wav_stream(wav_chunks)
+        except IngestError as e:
+            # Audio already recognised would be recognised again by the fallback
+            if pushed:
+                raise
+            logging.warning(f"Streaming ingest failed, falling back to buffered download: {str(e)}")
+            recognized.clear()
+        else:
+            key, entry = cache_lookup(digest.hexdigest())
+            if entry is not None:
+                return from_entry(entry, key)
+            report("transcribing")
+            original_text, _ = transcribe_audio_batch(blob_url, country, translate=False)
+            cache_store(key, original_text, None)
+            return original_text, None, key
+
+    temp_dir = tempfile.gettempdir()
+    mp4_path = os.path.join(temp_dir, f"{uuid.uuid4()}.mp4")
+    wav_path = mp4_path.rsplit('.', 1)[0] + '.wav'
+
+    try:
+        report("downloading")
+        download_to_file(file_url, mp4_path)
+
+        # Only spawn ffmpeg for inputs that are not already WAV/PCM
+        report("converting")
+        if not decode_wav_in_process(mp4_path, wav_path):
+            convert_mp4_to_wav(mp4_path, wav_path)
+
+        key, entry = cache_lookup(hash_wav_file(wav_path)) if cache is not None else (None, None)
+        if entry is not None:
+            return from_entry(entry, key)
+
+        trim = None
+        if trim_enabled:
+            report("trimming")
+            trim = trim_silence(wav_path, wav_path)
+
+        if mode == "realtime":
+            report("transcribing")
+            result = transcribe_realtime(iter_wav_pcm(iter_file_chunks(wav_path)), lang_config.speech_locale, on_partial=on_partial, on_final=on_final)
+            if trim:
+                result = remap_transcription_result(result, trim)
+            original_text = combine_phrases(result)
+            cache_store(key, original_text, trim)
+            return original_text, trim, key
+
+        audio_seconds = read_wav_info(wav_path).duration
+        min_chunk_seconds = get_min_chunk_seconds()
+        if min_chunk_seconds and audio_seconds >= min_chunk_seconds:
+            report("transcribing")
+            original_text = transcribe_audio_chunked(wav_path, country, trim=trim)
+            cache_store(key, original_text, trim)
+            return original_text, trim, key
+
+        report("uploading")
+        blob_url = upload_to_blob(wav_path)
+    finally:
+        for path in (mp4_path, wav_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    report("transcribing")
+    original_text, _ = transcribe_audio_batch(blob_url, country, trim=trim, audio_seconds=audio_seconds, translate=False)
+    cache_store(key, original_text, trim)
+    return original_text, trim, key
 
 def translate_to_english(text: str, country: str) -> str:
     """
     Translate text to English based on the source country/language.
+
+    Long text is split on sentence boundaries and sent as batched, concurrent
+    Translator requests. With TRANSLATION_MEMORY enabled, remembered sentences
+    are reused and only new sentences are sent.
     
     Args:
         text: Text to translate
@@ -188,39 +455,27 @@ def translate_to_english(text: str, country: str) -> str:
         Translated English text
     """
     lang_config = get_language_config(country)
-    
-    translator_key = os.environ["AZURE_TRANSLATOR_KEY"]
-    translator_region = os.environ["AZURE_TRANSLATOR_REGION"]
-    endpoint = "https://api.cognitive.microsofttranslator.com/translate"
-    
-    headers = {
-        "Ocp-Apim-Subscription-Key": translator_key,
-        "Ocp-Apim-Subscription-Region": translator_region,
-        "Content-Type": "application/json"
-    }
-    
-    params = {
-        "api-version": "3.0",
-        "from": lang_config.translate_from,
-        "to": lang_config.translate_to
-    }
-    
-    body = [{"text": text}]
-    
-    response = requests.post(endpoint, headers=headers, params=params, json=body)
-    if response.status_code != 200:
-        raise Exception(f"Translation failed: {response.text}")
-        
-    translation_result = response.json()
-    return translation_result[0]["translations"][0]["text"]
+    client = get_translator_client()
+
+    memory = get_translation_memory()
+    if memory is None:
+        return client.translate_text(text, lang_config.translate_from, lang_config.translate_to)
 
-def create_transcription(file_url: str, country: str) -> str:
+    return memory.translate(
+        text,
+        lang_config.translate_from,
+        lang_config.translate_to,
+        lambda segments: client.translate_segments(segments, lang_config.translate_from, lang_config.translate_to)
+    )
+
+def create_transcription(file_url: str, country: str, diarization: bool = True) -> str:
     """
     Creates a transcription job using Azure Speech REST API
     
     Args:
         file_url: URL of the audio file to transcribe
         country: Source country for language detection (required)
+        diarization: Request speaker diarization
     """
     lang_config = get_language_config(country)
     
@@ -235,28 +490,41 @@ def create_transcription(file_url: str, country: str) -> str:
         "contentUrls": [file_url],
         "locale": lang_config.speech_locale,
         "properties": {
-            "diarizationEnabled": True,
+            "diarizationEnabled": diarization,
             "wordLevelTimestampsEnabled": True,
         },
     }
     
-    response = requests.post(endpoint, headers=headers, json=body)
+    response = get_session().post(endpoint, headers=headers, json=body)
     if response.status_code != 201:
         raise Exception(f"Failed to create transcription: {response.text}")
     
     return response.json()["self"]
 
-def get_transcription_status(transcription_url: str) -> dict:
-    """Gets the status of a transcription job"""
+def fetch_transcription_status(transcription_url: str) -> tuple[dict, float]:
+    """
+    Gets the status of a transcription job along with any Retry-After hint
+    
+    Raises:
+        ThrottledError: If the request was rejected with 429
+    """
     headers = {
         "Ocp-Apim-Subscription-Key": os.environ["AZURE_SPEECH_KEY"]
     }
     
-    response = requests.get(transcription_url, headers=headers)
+    response = get_session().get(transcription_url, headers=headers)
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if response.status_code == 429:
+        raise ThrottledError(retry_after)
     if response.status_code != 200:
         raise Exception(f"Failed to get transcription status: {response.text}")
     
-    return response.json()
+    return response.json(), retry_after
+
+def get_transcription_status(transcription_url: str) -> dict:
+    """Gets the status of a transcription job"""
+    status, _ = fetch_transcription_status(transcription_url)
+    return status
 
 def get_transcription_result(files_url: str) -> str:
     """Gets the final transcription result"""
@@ -265,7 +533,7 @@ def get_transcription_result(files_url: str) -> str:
     }
     
     # Get the files list
-    response = requests.get(files_url, headers=headers)
+    response = get_session().get(files_url, headers=headers)
     if response.status_code != 200:
         raise Exception(f"Failed to get files list: {response.text}")
     
@@ -275,116 +543,268 @@ def get_transcription_result(files_url: str) -> str:
         raise Exception("No transcription files found")
     
     # Get the actual transcription
-    response = requests.get(files[0]["links"]["contentUrl"], headers=headers)
+    response = get_session().get(files[0]["links"]["contentUrl"], headers=headers)
     if response.status_code != 200:
         raise Exception(f"Failed to get transcription content: {response.text}")
     
     return response.json()
 
-def transcribe_audio_batch(file_url: str, country: str) -> tuple[str, str]:
+def delete_transcription(transcription_url: str) -> None:
+    """Deletes a transcription job, stopping it if it is still running; failures are only logged"""
+    try:
+        response = get_session().delete(transcription_url, headers={
+            "Ocp-Apim-Subscription-Key": os.environ["AZURE_SPEECH_KEY"]
+        })
+        if response.status_code not in (200, 204, 404):
+            logging.warning(f"Failed to delete transcription {transcription_url}: {response.text}")
+    except Exception as e:
+        logging.warning(f"Failed to delete transcription {transcription_url}: {str(e)}")
+
+def run_batch_transcription(file_url: str, country: str, audio_seconds: float = None, diarization: bool = True) -> dict:
     """
-    Handles the complete transcription process
+    Runs a batch transcription job to completion and returns its raw result
     
     Args:
         file_url: URL of the audio file to transcribe
         country: Source country for language detection (required)
+        audio_seconds: Audio duration, used to estimate when the job will finish
+        diarization: Request speaker diarization
     """
     # Start transcription
-    transcription_url = create_transcription(file_url, country)
+    transcription_url = create_transcription(file_url, country, diarization=diarization)
     logging.info(f"Created transcription job: {transcription_url}")
     
-    # Poll for completion
-    while True:
-        status = get_transcription_status(transcription_url)
-        logging.info(f"Transcription status: {status['status']}")
-        
-        if status["status"] == "Succeeded":
-            # Get results
-            result = get_transcription_result(status["links"]["files"])
-            
-            # Combine all recognized phrases
-            combined_text = " ".join([item["nBest"][0]["display"] for item in result["recognizedPhrases"]])
-            
-            # Delete the transcription
-            requests.delete(transcription_url, headers={
-                "Ocp-Apim-Subscription-Key": os.environ["AZURE_SPEECH_KEY"]
-            })
-            
-            # Translate to English if needed
-            english_text = translate_to_english(combined_text, country) if combined_text else ""
-            
-            return combined_text, english_text
-            
-        elif status["status"] == "Failed":
-            raise Exception(f"Transcription failed: {status.get('statusMessage', 'Unknown error')}")
+    # Poll for completion; the job is deleted however polling ends, so a
+    # timed out job does not keep running
+    poller = AdaptivePoller.from_env(audio_seconds)
+    try:
+        while True:
+            try:
+                status, retry_after = fetch_transcription_status(transcription_url)
+            except ThrottledError as e:
+                logging.warning(f"Transcription status throttled; retrying after {e.retry_after}s")
+                poller.wait(e.retry_after)
+                continue
+            poller.record_poll()
+            logging.info(f"Transcription status: {status['status']}")
             
-        time.sleep(5)
+            if status["status"] == "Succeeded":
+                poller.finish()
+
+                # Get results
+                return get_transcription_result(status["links"]["files"])
+                
+            elif status["status"] == "Failed":
+                poller.finish()
+                raise Exception(f"Transcription failed: {status.get('statusMessage', 'Unknown error')}")
+                
+            poller.wait(retry_after)
+    finally:
+        delete_transcription(transcription_url)
+
+def combine_phrases(result: dict) -> str:
+    """Combines the top candidate of all recognized phrases into one text"""
+    return " ".join([item["nBest"][0]["display"] for item in result["recognizedPhrases"]])
+
+def transcribe_audio_batch(file_url: str, country: str, trim: TrimResult = None, audio_seconds: float = None, translate: bool = True) -> tuple[str, str]:
+    """
+    Handles the complete transcription process
+    
+    Args:
+        file_url: URL of the audio file to transcribe
+        country: Source country for language detection (required)
+        trim: Silence trimming applied to the audio, used to map timestamps back to the original
+        audio_seconds: Duration of the uploaded audio, if known
+        translate: Also translate the raw transcript; the pipeline passes False
+            because it translates the cleaned text instead
+    """
+    result = run_batch_transcription(file_url, country, audio_seconds=audio_seconds)
+    if trim:
+        result = remap_transcription_result(result, trim)
 
-def save_transcript_to_blob(original_text: str, cleaned_text: str, english_text: str, polished_english_text: str, summary_text: str, file_id: str) -> None:
-    connect_str = os.environ["AZURE_STORAGE_CONNECTION_STRING"]
-    container_name = os.environ["AZURE_STORAGE_CONTAINER"]
-    blob_service_client = BlobServiceClient.from_connection_string(connect_str)
+    # Combine all recognized phrases
+    combined_text = combine_phrases(result)
     
-    # Save original transcript
-    original_blob_name = f"transcripts/{file_id}_original.txt"
-    original_blob_client = blob_service_client.get_blob_client(container=container_name, blob=original_blob_name)
-    original_blob_client.upload_blob(original_text, overwrite=True)
+    # Translate to English if needed
+    lang_config = get_language_config(country)
+    needs_translation = translate and combined_text and lang_config.translate_from != lang_config.translate_to
+    english_text = translate_to_english(combined_text, country) if needs_translation else combined_text
     
-    # Save cleaned transcript
-    cleaned_blob_name = f"transcripts/{file_id}_cleaned.txt"
-    cleaned_blob_client = blob_service_client.get_blob_client(container=container_name, blob=cleaned_blob_name)
-    cleaned_blob_client.upload_blob(cleaned_text, overwrite=True)
+    return combined_text, english_text
+
+def transcribe_audio_chunked(wav_path: str, country: str, trim: TrimResult = None) -> str:
+    """
+    Transcribes a long recording as overlapping segments submitted concurrently
+
+    Diarization is turned off: each segment is a separate batch job whose
+    speaker numbers cannot be matched up with the other segments'.
     
-    # Save English translation
-    english_blob_name = f"transcripts/{file_id}_english.txt"
-    english_blob_client = blob_service_client.get_blob_client(container=container_name, blob=english_blob_name)
-    english_blob_client.upload_blob(english_text, overwrite=True)
+    Args:
+        wav_path: Local 16 kHz mono WAV of the whole recording
+        country: Source country for language detection (required)
+        trim: Silence trimming applied to the audio, used to map timestamps back to the original
+    """
+    result = transcribe_in_segments(
+        wav_path,
+        lambda segment_path: run_batch_transcription(
+            upload_to_blob(segment_path), country, audio_seconds=read_wav_info(segment_path).duration, diarization=False
+        )
+    )
+    if trim:
+        result = remap_transcription_result(result, trim)
+
+    return combine_phrases(result)
+
+# Transcript versions stored per file_id, in pipeline order
+TRANSCRIPT_VARIANTS = ("original", "cleaned", "english", "polished", "summary")
+TRANSCRIPT_STORAGE_MODES = ("files", "bundle", "both")
+
+def get_transcript_storage_mode() -> str:
+    """
+    How transcripts are written, configurable through TRANSCRIPT_STORAGE_MODE:
+    "files" (default) writes one text blob per variant, "bundle" writes a single
+    JSON document holding every variant, "both" writes both.
+    """
+    mode = os.environ.get("TRANSCRIPT_STORAGE_MODE", "files").lower()
+    if mode not in TRANSCRIPT_STORAGE_MODES:
+        raise ValueError(f"Unsupported TRANSCRIPT_STORAGE_MODE: {mode}. Use 'files', 'bundle', or 'both'")
+    return mode
+
+def transcript_blob_name(file_id: str, variant: str) -> str:
+    """Blob name of a transcript variant, or of the JSON bundle for variant "bundle"."""
+    variant = variant.lower()
+    if variant == "bundle":
+        return f"transcripts/{file_id}.json"
+    if variant not in TRANSCRIPT_VARIANTS:
+        raise ValueError(f"Unsupported language: {variant}. Use 'original', 'cleaned', 'english', 'polished', 'summary', or 'bundle'")
+    return f"transcripts/{file_id}_{variant}.txt"
+
+def save_original_transcript(original_text: str, file_id: str) -> None:
+    """
+    Save the original transcript file ahead of the other versions.
 
-    # Save polished English transcript
-    polished_blob_name = f"transcripts/{file_id}_polished.txt"
-    polished_blob_client = blob_service_client.get_blob_client(container=container_name, blob=polished_blob_name)
-    polished_blob_client.upload_blob(polished_english_text, overwrite=True)
+    Only per-variant files can be written early; the bundle holds every
+    version and is written by save_transcript_to_blob.
+    """
+    if get_transcript_storage_mode() in ("files", "both"):
+        get_container_client().get_blob_client(transcript_blob_name(file_id, "original")).upload_blob(original_text, overwrite=True)
+
+
+def save_transcript_to_blob(original_text: str, cleaned_text: str, english_text: str, polished_english_text: str, summary_text: str, file_id: str, skip_original: bool = False) -> None:
+    """
+    Save every transcript version, uploading all blobs in one parallel wave.
+
+    TRANSCRIPT_STORAGE_MODE selects per-variant text files, a single JSON
+    bundle, or both (see get_transcript_storage_mode). With skip_original the
+    original text file is assumed saved by save_original_transcript; it is
+    still included in the bundle.
+    """
+    mode = get_transcript_storage_mode()
+    container_client = get_container_client()
+    texts = dict(zip(TRANSCRIPT_VARIANTS, (original_text, cleaned_text, english_text, polished_english_text, summary_text)))
+
+    uploads = []
+    if mode in ("files", "both"):
+        uploads.extend(
+            (transcript_blob_name(file_id, variant), text, None)
+            for variant, text in texts.items()
+            if not (skip_original and variant == "original")
+        )
+    if mode in ("bundle", "both"):
+        bundle = {"file_id": file_id, "created_at": datetime.utcnow().isoformat(), "transcripts": texts}
+        uploads.append((
+            transcript_blob_name(file_id, "bundle"),
+            json.dumps(bundle, ensure_ascii=False),
+            ContentSettings(content_type="application/json; charset=utf-8")
+        ))
+
+    def upload(item) -> None:
+        blob_name, data, content_settings = item
+        container_client.get_blob_client(blob_name).upload_blob(data, overwrite=True, content_settings=content_settings)
 
-    # Save summary
-    summary_blob_name = f"transcripts/{file_id}_summary.txt"
-    summary_blob_client = blob_service_client.get_blob_client(container=container_name, blob=summary_blob_name)
-    summary_blob_client.upload_blob(summary_text, overwrite=True)
+    with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+        # list() re-raises the first failed upload
+        list(executor.map(upload, uploads))
 
 
 def generate_transcript_blob_link(file_id: str, language: str = "english") -> str:
-    connect_str = os.environ["AZURE_STORAGE_CONNECTION_STRING"]
-    container_name = os.environ["AZURE_STORAGE_CONTAINER"]
-    blob_service_client = BlobServiceClient.from_connection_string(connect_str)
-
-    # Map language parameter to actual blob naming convention
-    if language.lower() == "original":
-        blob_name = f"transcripts/{file_id}_original.txt"
-    elif language.lower() == "cleaned":
-        blob_name = f"transcripts/{file_id}_cleaned.txt"
-    elif language.lower() == "english":
-        blob_name = f"transcripts/{file_id}_english.txt"
-    elif language.lower() == "polished":
-        blob_name = f"transcripts/{file_id}_polished.txt"
-    elif language.lower() == "summary":
-        blob_name = f"transcripts/{file_id}_summary.txt"
-    else:
-        raise ValueError(f"Unsupported language: {language}. Use 'original', 'cleaned', 'english', 'polished', or 'summary'")
-
-    blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
-
-    sas_token = generate_blob_sas(
-        account_name=blob_service_client.account_name,
-        container_name=container_name,
-        blob_name=blob_name,
-        account_key=blob_service_client.credential.account_key,
-        permission=BlobSasPermissions(read=True),
-        expiry=datetime.utcnow() + timedelta(hours=24)
-    )
+    blob_name = transcript_blob_name(file_id, language)
+    return get_link_signer().sign(blob_name, datetime.utcnow() + timedelta(hours=24))
+
+
+def generate_transcript_links(file_id: str) -> dict:
+    """
+    Sign read links for every stored transcript version in one pass.
+
+    Signing is local, so this makes no storage requests.
+
+    Args:
+        file_id: Identifier the transcripts were saved under
+
+    Returns:
+        Dict mapping each variant (and "bundle" when a bundle is stored) to its SAS URL
+    """
+    mode = get_transcript_storage_mode()
+    variants = []
+    if mode in ("files", "both"):
+        variants.extend(TRANSCRIPT_VARIANTS)
+    if mode in ("bundle", "both"):
+        variants.append("bundle")
+
+    blob_names = {variant: transcript_blob_name(file_id, variant) for variant in variants}
+    urls = get_link_signer().sign_all(blob_names.values(), timedelta(hours=24))
+    return {variant: urls[blob_name] for variant, blob_name in blob_names.items()}
+
+
+def build_bubble_payload(file_id: str, blob_url: str, polished_text: str, summary_text: str, transcript_urls: dict = None, request_id: str = None) -> dict:
+    """Webhook body for one processed memo (see send_to_bubble for the fields)"""
+    payload = {
+        "file_id": file_id,
+        "transcript_url": blob_url,
+        "polished_text": polished_text,
+        "summary_text": summary_text,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if transcript_urls:
+        payload["transcript_urls"] = transcript_urls
+    if request_id:
+        payload["request_id"] = request_id
+    return payload
+
+
+def notify_bubble(file_id: str, blob_url: str, polished_text: str, summary_text: str, transcript_urls: dict = None, request_id: str = None) -> bool:
+    """
+    Hand a processed memo to Bubble without waiting on the webhook.
+
+    BUBBLE_DELIVERY selects "outbox" (default), which records a delivery for
+    the BubbleDispatcher function and returns, or "inline", which posts with
+    send_to_bubble's blocking retries. With BUBBLE_DISPATCH=local, outbox
+    deliveries are sent by an in-process loop instead of the timer function.
+
+    The idempotency key is derived from the file id and texts, so Bubble can
+    drop repeats of the same notification.
 
-    return f"{blob_client.url}?{sas_token}"
+    Returns:
+        True if the delivery was recorded (or, inline, sent)
+    """
+    if os.environ.get("BUBBLE_DELIVERY", "outbox").lower() == "inline":
+        return send_to_bubble(file_id, blob_url, polished_text, summary_text, transcript_urls=transcript_urls, request_id=request_id)
 
+    bubble_endpoint = os.environ.get("BUBBLE_WEBHOOK_URL")
+    if not bubble_endpoint:
+        logging.error("BUBBLE_WEBHOOK_URL environment variable not set")
+        return False
+
+    payload = build_bubble_payload(file_id, blob_url, polished_text, summary_text, transcript_urls, request_id)
+    content_hash = hashlib.sha256(json.dumps([polished_text, summary_text], ensure_ascii=False).encode("utf-8")).hexdigest()
+    if not get_outbox_store().add(new_delivery(bubble_endpoint, payload, f"{file_id}-{content_hash[:16]}")):
+        logging.info(f"Bubble delivery for {file_id} is already in the outbox")
+    if os.environ.get("BUBBLE_DISPATCH", "function").lower() == "local":
+        ensure_local_dispatch_loop()
+    return True
 
-def send_to_bubble(file_id: str, blob_url: str, polished_text: str, summary_text: str, max_retries: int = 3, retry_delay: float = 1.0):
+
+def send_to_bubble(file_id: str, blob_url: str, polished_text: str, summary_text: str, max_retries: int = 3, retry_delay: float = 1.0, transcript_urls: dict = None, request_id: str = None):
     """
     Send transcript blob URL, polished text, and summary text to Bubble webhook with retry logic
     
@@ -395,6 +815,8 @@ def send_to_bubble(file_id: str, blob_url: str, polished_text: str, summary_text
         summary_text: The summary text
         max_retries: Maximum number of retry attempts
         retry_delay: Delay between retries in seconds
+        transcript_urls: Optional SAS links for every transcript version
+        request_id: Optional identifier matching earlier progress updates
     """
     bubble_endpoint = os.environ.get("BUBBLE_WEBHOOK_URL")
     
@@ -402,22 +824,12 @@ def send_to_bubble(file_id: str, blob_url: str, polished_text: str, summary_text
         logging.error("BUBBLE_WEBHOOK_URL environment variable not set")
         return False
 
-    payload = {
-        "file_id": file_id,
-        "transcript_url": blob_url,
-        "polished_text": polished_text,
-        "summary_text": summary_text,
-        "timestamp": datetime.utcnow().isoformat()
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "ONOW-Translator/1.0"
-    }
+    payload = build_bubble_payload(file_id, blob_url, polished_text, summary_text, transcript_urls, request_id)
+    headers = BUBBLE_HEADERS
 
     for attempt in range(max_retries + 1):
         try:
-            response = requests.post(
+            response = get_session().post(
                 bubble_endpoint, 
                 json=payload, 
                 headers=headers,
@@ -441,101 +853,281 @@ def send_to_bubble(file_id: str, blob_url: str, polished_text: str, summary_text
     return False
 
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
-    logging.info("Function started")
-    
+def send_progress_to_bubble(update: dict) -> None:
+    """
+    Post one progress update to BUBBLE_PROGRESS_WEBHOOK_URL.
+
+    Progress updates are not retried: a later update or the final webhook
+    supersedes a lost one.
+
+    Args:
+        update: Update dict from ProgressPublisher (request_id, sequence, field, text, final, timestamp)
+    """
+    response = get_session().post(
+        os.environ["BUBBLE_PROGRESS_WEBHOOK_URL"],
+        json=update,
+        headers=BUBBLE_HEADERS,
+        timeout=10
+    )
+    if response.status_code not in [200, 201]:
+        raise Exception(f"Bubble progress webhook returned status {response.status_code}: {response.text}")
+
+
+# Transcription back-ends selectable per request through the "mode" field
+TRANSCRIPTION_MODES = ("batch", "realtime")
+
+
+class InvalidRequestError(ValueError):
+    """Raised when a transcription request body fails validation"""
+
+    def __init__(self, body: dict):
+        super().__init__(body["error"])
+        self.body = body
+
+
+def parse_transcription_request(req: func.HttpRequest) -> tuple[str, str, dict]:
+    """
+    Parse and validate a transcription request body.
+
+    Args:
+        req: HTTP request with a JSON body containing file_url, optional country
+            and optional pipeline options (mode, llm_mode)
+
+    Returns:
+        Tuple of (file_url, country, options) where options are keyword
+        arguments for process_transcription
+
+    Raises:
+        InvalidRequestError: If the body is not JSON, file_url is missing or the country is not supported
+    """
     try:
         req_body = req.get_json()
-        file_url = req_body.get("file_url")
-        country = req_body.get("country")
-        
-        # If country is not provided, default to Hindi (India)
-        if not country:
-            country = "India"  # Default to Hindi
-            logging.info("No country provided. Defaulting to Hindi (India).")
-
-        # Validate required parameters
-        if not file_url:
-            return func.HttpResponse(
-                json.dumps({
-                    "error": "Missing 'file_url' field in JSON body",
-                    "supported_countries": get_supported_countries()
-                }),
-                status_code=400,
-                mimetype="application/json"
-            )
-        
-        # Validate country is supported
-        try:
-            lang_config = get_language_config(country)
-            logging.info(f"Processing audio from {file_url} for country: {country} ({lang_config.language_name})")
-        except ValueError as e:
-            return func.HttpResponse(
-                json.dumps({
-                    "error": str(e),
-                    "supported_countries": get_supported_countries(),
-                    "note": "If no country is provided, Hindi (India) is assumed by default."
-                }),
-                status_code=400,
-                mimetype="application/json"
-            )
+    except ValueError:
+        raise InvalidRequestError({
+            "error": "Request body must be valid JSON",
+            "supported_countries": get_supported_countries()
+        })
+
+    file_url = req_body.get("file_url")
+    country = req_body.get("country")
 
-        response = requests.get(file_url)
-        if response.status_code != 200:
-            return func.HttpResponse("Failed to download file", status_code=400)
+    # If country is not provided, default to Hindi (India)
+    if not country:
+        country = "India"  # Default to Hindi
+        logging.info("No country provided. Defaulting to Hindi (India).")
 
-        temp_dir = tempfile.gettempdir()
-        mp4_path = os.path.join(temp_dir, f"{uuid.uuid4()}.mp4")
-        wav_path = mp4_path.rsplit('.', 1)[0] + '.wav'
+    # Validate required parameters
+    if not file_url:
+        raise InvalidRequestError({
+            "error": "Missing 'file_url' field in JSON body",
+            "supported_countries": get_supported_countries()
+        })
 
-        with open(mp4_path, "wb") as f:
-            f.write(response.content)
+    # Validate country is supported
+    try:
+        get_language_config(country)
+    except ValueError as e:
+        raise InvalidRequestError({
+            "error": str(e),
+            "supported_countries": get_supported_countries(),
+            "note": "If no country is provided, Hindi (India) is assumed by default."
+        })
 
-        convert_mp4_to_wav(mp4_path, wav_path)
+    mode = req_body.get("mode", "batch")
+    if mode not in TRANSCRIPTION_MODES:
+        raise InvalidRequestError({
+            "error": f"Unsupported mode: {mode}. Use one of: {', '.join(TRANSCRIPTION_MODES)}",
+            "supported_countries": get_supported_countries()
+        })
+
+    llm_mode = req_body.get("llm_mode")
+    if llm_mode is not None and llm_mode not in LLM_PIPELINE_MODES:
+        raise InvalidRequestError({
+            "error": f"Unsupported llm_mode: {llm_mode}. Use one of: {', '.join(LLM_PIPELINE_MODES)}",
+            "supported_countries": get_supported_countries()
+        })
+
+    return file_url, country, {"mode": mode, "llm_mode": llm_mode}
 
-        blob_url = upload_to_blob(wav_path)
 
-        original_text, _ = transcribe_audio_batch(blob_url, country)
+def process_transcription(file_url: str, country: str, on_stage=None, mode: str = "batch", llm_mode: str = None, on_partial=None, job_id: str = None) -> dict:
+    """
+    Run the full pipeline for one voice memo: download, convert, transcribe,
+    clean, translate, polish, summarize, persist and notify Bubble.
+
+    Stages run on a Pipeline as soon as their inputs are ready, so without a
+    result cache the original transcript is stored and the transcript links
+    are signed while the LLM stages run. Bubble is notified (through the outbox by default) once every transcript is stored.
+
+    With a job id and CHECKPOINT_STORE enabled, each completed stage is
+    checkpointed and a retried job resumes after the last completed stage.
+
+    Args:
+        file_url: URL of the audio file to transcribe
+        country: Source country for language detection
+        on_stage: Optional callback invoked with the name of each stage as it starts
+        mode: "batch" (default) or "realtime" transcription
+        llm_mode: "sequential" or "structured" LLM refinement (defaults to LLM_PIPELINE_MODE)
+        on_partial: Optional callback receiving progress updates as each transcript
+            version becomes available, and in realtime mode as phrases are recognised;
+            updates also go to BUBBLE_PROGRESS_WEBHOOK_URL when set
+        job_id: Optional job identifier the stage checkpoints are stored under
+
+    Returns:
+        Dict with the file_id, the request_id used for progress updates, every
+        transcript version and the per-stage timings
+    """
+    stages_run = []
+
+    def report(stage: str) -> None:
+        stages_run.append(stage)
+        if on_stage:
+            on_stage(stage)
+
+    lang_config = get_language_config(country)
+    logging.info(f"Processing audio from {file_url} for country: {country} ({lang_config.language_name})")
+
+    cache = get_result_cache()
+    storage_mode = get_transcript_storage_mode()
+    request_id = str(uuid.uuid4())
+
+    sinks = [on_partial, send_progress_to_bubble if os.environ.get("BUBBLE_PROGRESS_WEBHOOK_URL") else None]
+    progress = create_progress_publisher(request_id, sinks)
+
+    # Checkpointed stage outputs are JSON: the transcript stage returns a dict rather than a TrimResult
+    def transcribe() -> dict:
+        on_text = progress.streamer("original_text") if progress else None
+        original_text, trim, transcript_cache_key = transcribe_source(file_url, country, report, mode=mode, cache=cache, on_text=on_text)
+        return {"text": original_text, "silence_trim": trim.to_dict() if trim else None, "cache_key": transcript_cache_key}
+
+    def plan(transcribe) -> StagePlan:
+        stage_plan = plan_stages(lang_config, transcribe["text"])
+        if stage_plan.skipped:
+            logging.info(f"Skipping stages: {stage_plan.skipped}")
+        return stage_plan
+
+    def refine(transcribe, plan) -> tuple[str, str, str, str]:
+        original_text, transcript_cache_key = transcribe["text"], transcribe["cache_key"]
+        try:
+            # The original transcript is shown while the LLM stages run
+            if progress:
+                progress.complete("original_text", original_text)
+            return refine_transcript(
+                original_text, country, report, llm_mode=llm_mode, cache=cache, parent_key=transcript_cache_key, plan=plan, progress=progress
+            )
+        finally:
+            # Every update is delivered before Bubble is notified
+            if progress:
+                progress.close()
 
-        # Step 1: Clean the original transcript
-        cleaned_text = clean_transcription(original_text, lang_config.translate_from)
+    def transcript_hash(transcribe, refine) -> str:
+        texts = (transcribe["text"], *refine)
+        return hashlib.sha256(json.dumps(texts, ensure_ascii=False).encode("utf-8")).hexdigest()
 
-        # Step 2: Translate the cleaned transcript to English
-        english_text = translate_to_english(cleaned_text, country) if cleaned_text else ""
+    def file_id(transcribe, refine=None) -> str:
+        if cache is None:
+            return str(uuid.uuid4())
+        # Identical transcripts keep their file id and stored blobs; changed
+        # ones get a new id instead of overwriting what Bubble already links to
+        value, _ = cached_stage(cache, transcribe["cache_key"], "file_id", lambda: str(uuid.uuid4()), transcript_hash(transcribe, refine), storage_mode)
+        return value
 
-        # Step 3: Polish the English translation
-        polished_english_text = polish_english_text(english_text) if english_text else ""
+    def save_original(transcribe, file_id) -> None:
+        cached_stage(cache, transcribe["cache_key"], "save_original", lambda: save_original_transcript(transcribe["text"], file_id) or True, file_id, storage_mode)
 
-        # Step 4: Summarize the polished English transcript
-        summary_text = summarize_transcript(polished_english_text) if polished_english_text else ""
+    def save(transcribe, refine, file_id) -> None:
+        report("saving")
+        texts = (transcribe["text"], *refine)
+        # Identical transcripts already in storage are not uploaded again
+        cached_stage(cache, transcribe["cache_key"], "save", lambda: save_transcript_to_blob(*texts, file_id, skip_original=True) or True, file_id, transcript_hash(transcribe, refine), storage_mode)
 
-        file_id = str(uuid.uuid4())
-        save_transcript_to_blob(original_text, cleaned_text, english_text, polished_english_text, summary_text, file_id)
+    def links(file_id) -> dict:
+        return generate_transcript_links(file_id)
 
-        #Level 2: Bubble Integration        
-        transcript_url = generate_transcript_blob_link(file_id, language="polished")
-        send_to_bubble(file_id, transcript_url, polished_english_text, summary_text)
+    #Level 2: Bubble Integration
+    def notify(refine, file_id, links, save, save_original) -> None:
+        report("notifying")
+        _, _, polished_english_text, summary_text = refine
+        # Bundle-only storage has no per-variant files to link to
+        link_variant = "bundle" if storage_mode == "bundle" else "polished"
+        notify_bubble(file_id, links[link_variant], polished_english_text, summary_text, transcript_urls=links, request_id=request_id)
 
+    checkpoint = get_job_checkpoint(job_id)
+    try:
+        run = Pipeline([
+            Stage("transcribe", transcribe),
+            # Planning is cheap and links expire, so both are recomputed on resume
+            Stage("plan", plan, ("transcribe",), checkpoint=False),
+            Stage("refine", refine, ("transcribe", "plan")),
+            # Without a cache the file id is new and the original is stored while
+            # refining; with one the id depends on every transcript version
+            Stage("file_id", file_id, ("transcribe",) if cache is None else ("transcribe", "refine")),
+            Stage("save_original", save_original, ("transcribe", "file_id")),
+            Stage("save", save, ("transcribe", "refine", "file_id")),
+            Stage("links", links, ("file_id",), checkpoint=False),
+            Stage("notify", notify, ("refine", "file_id", "links", "save", "save_original")),
+        ]).run(checkpoint)
+    finally:
+        # Closes the publisher when refinement was restored or never ran
+        if progress:
+            progress.close()
+    timings = {name: round(seconds, 3) for name, seconds in run.timings.items()}
+    logging.info(f"Stage timings: {timings}")
+    if checkpoint:
+        checkpoint.clear()
 
-        os.remove(mp4_path)
-        os.remove(wav_path)
+    original_text = run.outputs["transcribe"]["text"]
+    trim = run.outputs["transcribe"]["silence_trim"]
+    cleaned_text, english_text, polished_english_text, summary_text = run.outputs["refine"]
+    result = {
+        "file_id": run.outputs["file_id"],
+        "request_id": request_id,
+        "original_text": original_text,
+        "cleaned_text": cleaned_text,
+        "english_text": english_text,
+        "polished_english_text": polished_english_text,
+        "summary_text": summary_text,
+        "country": country,
+        "language": lang_config.language_name,
+        "transcript_urls": run.outputs["links"],
+        "stages_run": stages_run,
+        "stages_skipped": run.outputs["plan"].skipped,
+        "stage_timings": timings,
+    }
+    if run.restored:
+        result["resumed_stages"] = run.restored
+    if trim:
+        result["silence_trim"] = trim
+    return result
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    logging.info("Function started")
+    
+    try:
+        file_url, country, options = parse_transcription_request(req)
+    except InvalidRequestError as e:
+        return func.HttpResponse(
+            json.dumps(e.body),
+            status_code=400,
+            mimetype="application/json"
+        )
+
+    try:
+        result = process_transcription(file_url, country, **options)
 
         return func.HttpResponse(
             json.dumps({
-                "file_id": file_id,
-                "original_text": original_text,
-                "cleaned_text": cleaned_text,
-                "english_text": english_text,
-                "polished_english_text": polished_english_text,
-                "summary_text": summary_text,
-                "country": country,
-                "language": lang_config.language_name,
+                **result,
                 "supported_countries": get_supported_countries()
             }),
             status_code=200,
             mimetype="application/json"
         )
 
+    except DownloadError as e:
+        return func.HttpResponse(str(e), status_code=400)
+
     except Exception as e:
         logging.error(f"Error: {str(e)}")
         return func.HttpResponse(
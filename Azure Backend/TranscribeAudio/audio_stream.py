@@ -0,0 +1,244 @@
+"""
+Streaming audio ingest.
+Pipes the downloaded HTTP body straight into ffmpeg's stdin and streams the
+16 kHz mono WAV output onwards, so a memo is never held whole in memory or on disk.
+"""
+
+import base64
+import logging
+import os
+import struct
+import subprocess
+import threading
+from typing import Iterable, Iterator
+
+import requests
+
+from .http_session import get_session
+
+# Bytes read from the download and from ffmpeg's stdout per iteration
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Bytes staged per blob block when uploading a stream
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class DownloadError(Exception):
+    """Raised when the source audio file cannot be downloaded"""
+
+
+class IngestError(Exception):
+    """Raised when ffmpeg cannot convert the audio from a pipe; the buffered path may still succeed"""
+
+
+def get_chunk_size() -> int:
+    """Chunk size for streaming reads, configurable through INGEST_CHUNK_SIZE"""
+    return int(os.environ.get("INGEST_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+
+
+def get_block_size() -> int:
+    """Blob block size for streamed uploads, configurable through INGEST_BLOCK_SIZE"""
+    return int(os.environ.get("INGEST_BLOCK_SIZE", DEFAULT_BLOCK_SIZE))
+
+
+def open_download(file_url: str) -> requests.Response:
+    """Start a streaming download, raising DownloadError on a non-200 response"""
+    response = get_session().get(file_url, stream=True)
+    if response.status_code != 200:
+        response.close()
+        raise DownloadError("Failed to download file")
+    return response
+
+
+def download_to_file(file_url: str, path: str, chunk_size: int = None) -> None:
+    """
+    Download a file to disk chunk by chunk instead of buffering the whole body.
+
+    Args:
+        file_url: URL of the file to download
+        path: Destination path
+        chunk_size: Bytes per read (defaults to INGEST_CHUNK_SIZE)
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    with open_download(file_url) as response, open(path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+
+
+def iter_converted_wav(file_url: str, ffmpeg_path: str, chunk_size: int = None) -> Iterator[bytes]:
+    """
+    Stream a remote audio file through ffmpeg and yield 16 kHz mono WAV bytes.
+
+    The download is fed to ffmpeg's stdin on a background thread while the
+    converted output is read from stdout, so memory stays bounded by chunk_size.
+    Containers that need seeking (e.g. MP4 with the moov atom at the end)
+    cannot be decoded from a pipe and raise IngestError.
+
+    Args:
+        file_url: URL of the audio file
+        ffmpeg_path: Path to the ffmpeg binary
+        chunk_size: Bytes per read (defaults to INGEST_CHUNK_SIZE)
+
+    Yields:
+        Chunks of WAV output, starting with the RIFF header
+
+    Raises:
+        DownloadError: If the download fails
+        IngestError: If ffmpeg cannot be started or fails to convert the stream
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    response = open_download(file_url)
+
+    try:
+        process = subprocess.Popen(
+            [
+                ffmpeg_path,
+                "-hide_banner", "-loglevel", "error",
+                "-i", "pipe:0",
+                "-ar", "16000",
+                "-ac", "1",
+                "-map_metadata", "-1",
+                "-f", "wav",
+                "pipe:1"
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+    except OSError as e:
+        response.close()
+        raise IngestError(f"Could not start ffmpeg: {str(e)}")
+
+    feed_errors = []
+    stderr_tail = []
+
+    def feed() -> None:
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            # ffmpeg exited early; its exit code reports the reason
+            pass
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            response.close()
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def drain_stderr() -> None:
+        for line in process.stderr:
+            stderr_tail.append(line)
+            del stderr_tail[:-20]
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    stderr_reader = threading.Thread(target=drain_stderr, daemon=True)
+    feeder.start()
+    stderr_reader.start()
+
+    try:
+        while True:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        process.stdout.close()
+        if process.poll() is None and feeder.is_alive():
+            # Consumer stopped early; stop ffmpeg so the feeder unblocks
+            process.kill()
+        process.wait()
+        feeder.join()
+        stderr_reader.join()
+
+    if feed_errors:
+        raise DownloadError(f"Failed to download file: {feed_errors[0]}")
+    if process.returncode != 0:
+        message = b"".join(stderr_tail).decode("utf-8", errors="replace").strip()
+        raise IngestError(f"ffmpeg streaming conversion failed ({process.returncode}): {message}")
+
+
+def patch_wav_header(block: bytes, total_size: int) -> bytes:
+    """
+    Fill in the RIFF and data chunk sizes that ffmpeg cannot seek back to
+    write when its output is a pipe.
+
+    Args:
+        block: First bytes of the WAV stream, containing the full header
+        total_size: Total number of bytes in the stream
+
+    Returns:
+        The block with corrected size fields
+    """
+    if block[:4] != b"RIFF" or block[8:12] != b"WAVE":
+        raise ValueError("Stream does not start with a RIFF/WAVE header")
+
+    patched = bytearray(block)
+    struct.pack_into("<I", patched, 4, min(total_size - 8, 0xFFFFFFFF))
+
+    offset = 12
+    while offset + 8 <= len(patched):
+        chunk_id = bytes(patched[offset:offset + 4])
+        if chunk_id == b"data":
+            struct.pack_into("<I", patched, offset + 4, min(total_size - offset - 8, 0xFFFFFFFF))
+            return bytes(patched)
+        chunk_size = struct.unpack_from("<I", patched, offset + 4)[0]
+        offset += 8 + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV data chunk not found in the first block")
+
+
+def stage_wav_stream(blob_client, chunks: Iterable[bytes], block_size: int = None) -> int:
+    """
+    Upload a streamed WAV file as a block blob with bounded memory.
+
+    The first block is held back until the stream ends so its header can be
+    patched with the final sizes, then every block is committed in order.
+
+    Args:
+        blob_client: Target BlobClient
+        chunks: Iterable of WAV bytes
+        block_size: Bytes per staged block (defaults to INGEST_BLOCK_SIZE)
+
+    Returns:
+        Total number of bytes uploaded
+    """
+    block_size = block_size or get_block_size()
+    block_ids = []
+    first_block = None
+    buffer = bytearray()
+    total_size = 0
+
+    def stage(data: bytes) -> None:
+        block_id = base64.b64encode(f"{len(block_ids):08d}".encode()).decode()
+        blob_client.stage_block(block_id=block_id, data=data)
+        block_ids.append(block_id)
+
+    for chunk in chunks:
+        buffer.extend(chunk)
+        total_size += len(chunk)
+        while len(buffer) >= block_size:
+            data = bytes(buffer[:block_size])
+            del buffer[:block_size]
+            if first_block is None:
+                first_block = data
+                block_ids.append(None)  # placeholder, staged once sizes are known
+            else:
+                stage(data)
+
+    if first_block is None:
+        first_block = bytes(buffer)
+        buffer = bytearray()
+        block_ids.append(None)
+    if buffer:
+        stage(bytes(buffer))
+
+    first_id = base64.b64encode(b"header00").decode()
+    blob_client.stage_block(block_id=first_id, data=patch_wav_header(first_block, total_size))
+    block_ids[0] = first_id
+
+    blob_client.commit_block_list(block_ids)
+    logging.info(f"Streamed {total_size} bytes to {blob_client.blob_name} in {len(block_ids)} blocks")
+    return total_size
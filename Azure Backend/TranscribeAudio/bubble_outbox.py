@@ -0,0 +1,579 @@
+"""
+Outbox for Bubble webhook deliveries.
+The pipeline records each notification as a delivery and returns; the
+BubbleDispatcher function sends due deliveries with jittered exponential
+backoff, an Idempotency-Key header, per-endpoint concurrency limits and
+dead-lettering once the attempts are used up. Under burst load deliveries
+can be coalesced into bulk requests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+from .http_session import get_session
+from .polling import parse_retry_after
+from .storage import get_container_client
+
+# Delivery lifecycle states
+DELIVERY_PENDING = "pending"
+DELIVERY_DELIVERED = "delivered"
+DELIVERY_DEAD = "dead"
+
+BUBBLE_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "ONOW-Translator/1.0"
+}
+
+
+def new_delivery(endpoint: str, payload: dict, idempotency_key: str, now: float = None) -> dict:
+    """
+    Build a pending delivery record.
+
+    The idempotency key doubles as the delivery id, so recording the same
+    notification twice leaves a single delivery.
+    """
+    return {
+        "delivery_id": idempotency_key,
+        "endpoint": endpoint,
+        "payload": payload,
+        "status": DELIVERY_PENDING,
+        "attempts": 0,
+        "next_attempt_at": now if now is not None else time.time(),
+        "last_error": None,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+class SQLiteOutboxStore:
+    """Local outbox backed by SQLite, used for local runs and tests"""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS deliveries "
+                "(delivery_id TEXT PRIMARY KEY, status TEXT NOT NULL, next_attempt_at REAL NOT NULL, record TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    def add(self, record: dict) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO deliveries (delivery_id, status, next_attempt_at, record) VALUES (?, ?, ?, ?)",
+                (record["delivery_id"], record["status"], record["next_attempt_at"], json.dumps(record))
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def save(self, record: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deliveries (delivery_id, status, next_attempt_at, record) VALUES (?, ?, ?, ?)",
+                (record["delivery_id"], record["status"], record["next_attempt_at"], json.dumps(record))
+            )
+            self._conn.commit()
+
+    def get(self, delivery_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM deliveries WHERE delivery_id = ?", (delivery_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def due(self, now: float, limit: int) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM deliveries WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (DELIVERY_PENDING, now, limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def dead_letters(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT record FROM deliveries WHERE status = ?", (DELIVERY_DEAD,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class BlobOutboxStore:
+    """
+    Outbox backed by blob storage.
+
+    Every record is kept under outbox/records/{id}.json, delivered ones
+    included, so a recorded idempotency key is never accepted twice (as in
+    SQLiteOutboxStore). Pending records also have an empty marker under
+    outbox/due/{next_attempt_at in ms}-{id}; marker names sort by due time,
+    so due() lists markers in order and downloads only the due records.
+    Dead letters are copied to outbox/dead/ for inspection.
+    """
+
+    def __init__(self, container_client, prefix: str = "outbox/"):
+        self._container = container_client
+        self._prefix = prefix
+
+    def _record_name(self, delivery_id: str) -> str:
+        return f"{self._prefix}records/{delivery_id}.json"
+
+    def _due_name(self, record: dict) -> str:
+        return f"{self._prefix}due/{int(record['next_attempt_at'] * 1000):015d}-{record['delivery_id']}"
+
+    def _upload(self, name: str, data: str, overwrite: bool = True) -> None:
+        self._container.get_blob_client(name).upload_blob(data, overwrite=overwrite)
+
+    def _delete(self, name: str) -> None:
+        try:
+            self._container.delete_blob(name)
+        except ResourceNotFoundError:
+            pass
+
+    def _download(self, name: str) -> Optional[dict]:
+        try:
+            return json.loads(self._container.get_blob_client(name).download_blob().readall())
+        except ResourceNotFoundError:
+            return None
+
+    def add(self, record: dict) -> bool:
+        # The marker goes first so a crash between the writes cannot strand a pending record
+        due_name = self._due_name(record)
+        self._upload(due_name, "")
+        try:
+            self._upload(self._record_name(record["delivery_id"]), json.dumps(record, ensure_ascii=False), overwrite=False)
+        except ResourceExistsError:
+            existing = self.get(record["delivery_id"])
+            if existing is None or self._due_name(existing) != due_name:
+                self._delete(due_name)
+            return False
+        return True
+
+    def save(self, record: dict) -> None:
+        previous = self.get(record["delivery_id"])
+        due_name = self._due_name(record)
+        if record["status"] == DELIVERY_PENDING:
+            self._upload(due_name, "")
+        elif record["status"] == DELIVERY_DEAD:
+            self._upload(f"{self._prefix}dead/{record['delivery_id']}.json", json.dumps(record, ensure_ascii=False))
+        self._upload(self._record_name(record["delivery_id"]), json.dumps(record, ensure_ascii=False))
+        if previous is not None and (record["status"] != DELIVERY_PENDING or self._due_name(previous) != due_name):
+            self._delete(self._due_name(previous))
+
+    def get(self, delivery_id: str) -> Optional[dict]:
+        return self._download(self._record_name(delivery_id))
+
+    def due(self, now: float, limit: int) -> list[dict]:
+        records = []
+        due_prefix = f"{self._prefix}due/"
+        cutoff = int(now * 1000)
+        # Listings are ordered by name, so the first marker past now ends the scan
+        for blob in self._container.list_blobs(name_starts_with=due_prefix):
+            if len(records) >= limit:
+                break
+            due_at, _, delivery_id = blob.name[len(due_prefix):].partition("-")
+            if int(due_at) > cutoff:
+                break
+            record = self.get(delivery_id)
+            if record is None:
+                # Written by an add that has not stored its record yet
+                continue
+            if record["status"] != DELIVERY_PENDING or self._due_name(record) != blob.name:
+                # Left behind by a save that stopped before removing it
+                self._delete(blob.name)
+                continue
+            if record["next_attempt_at"] <= now:
+                records.append(record)
+        return records
+
+    def dead_letters(self) -> list[dict]:
+        records = []
+        for blob in self._container.list_blobs(name_starts_with=f"{self._prefix}dead/"):
+            record = self._download(blob.name)
+            if record is not None:
+                records.append(record)
+        return records
+
+
+@dataclass
+class BatchEnvelope:
+    """
+    Shape of a bulk webhook request and its per-item acknowledgements.
+
+    The request body is {items_key: [{id_key: delivery_id, **payload}, ...]}
+    plus any extra fields. A 2xx response may acknowledge items individually
+    with {results_key: [{id_key: delivery_id, "status": 200 | "ok" | ...,
+    "error": "..."}]}; without results every item counts as delivered.
+
+    Args:
+        items_key: Body field holding the items
+        id_key: Item field carrying the delivery id (also used in results)
+        results_key: Response field holding the per-item results
+        extra: Additional top-level body fields
+    """
+    items_key: str = "items"
+    id_key: str = "idempotency_key"
+    results_key: str = "results"
+    extra: dict = field(default_factory=dict)
+
+    def build(self, records: list[dict]) -> dict:
+        return {**self.extra, self.items_key: [{self.id_key: record["delivery_id"], **record["payload"]} for record in records]}
+
+    def acknowledgements(self, body) -> Optional[dict]:
+        """Map of delivery id to (delivered, status, error) from a response body, or None if it has no results"""
+        results = body.get(self.results_key) if isinstance(body, dict) else None
+        if not isinstance(results, list):
+            return None
+        acks = {}
+        for result in results:
+            # Malformed entries are ignored; their items count as missing from the results
+            if not isinstance(result, dict) or not isinstance(result.get(self.id_key), str):
+                continue
+            status = result.get("status")
+            delivered = status in ("ok", "success", "delivered", True) or (isinstance(status, int) and 200 <= status < 300)
+            acks[result[self.id_key]] = (delivered, status, result.get("error"))
+        return acks
+
+
+# Batch responses meaning the endpoint does not accept bulk requests
+BATCH_REJECTED_STATUSES = (404, 405, 415)
+# Batch responses that may be caused by one item or by the batch size; the
+# batch is resent as single requests but batching stays on
+BATCH_SPLIT_STATUSES = (400, 413, 422)
+
+
+class BubbleDispatcher:
+    """
+    Sends due outbox deliveries.
+
+    Delivery outcomes:
+    - 2xx: delivered
+    - 4xx other than 408 and 429: dead-lettered, since retrying cannot help
+    - anything else, including connection errors: retried after a full-jitter
+      exponential backoff (or the endpoint's Retry-After), and dead-lettered
+      after max_attempts
+
+    With a batch envelope, the deliveries due for one endpoint are coalesced
+    into bulk requests of up to batch_size items, held back for up to
+    batch_window seconds while the batch fills. Items are acknowledged
+    individually. An endpoint that does not support batches (404, 405 or 415)
+    is sent single requests from then on; a batch refused as invalid or too
+    large (400, 413 or 422) is resent as single requests so only the bad
+    items fail.
+
+    Args:
+        store: Outbox store
+        max_attempts: Attempts before a delivery is dead-lettered
+        base_delay: Backoff base in seconds
+        max_delay: Backoff cap in seconds
+        endpoint_concurrency: Requests in flight per endpoint
+        timeout: Seconds per request
+        batch: Envelope for bulk requests, or None to send every delivery singly
+        batch_size: Most items per bulk request
+        batch_window: Seconds a due delivery may wait for its batch to fill
+        post: Callable with the requests.post signature
+        clock: Wall clock in epoch seconds
+        jitter: Returns a random float in [a, b]
+    """
+
+    def __init__(
+        self,
+        store,
+        max_attempts: int = 8,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        endpoint_concurrency: int = 4,
+        timeout: float = 30,
+        batch: Optional[BatchEnvelope] = None,
+        batch_size: int = 50,
+        batch_window: float = 2.0,
+        post: Callable = None,
+        clock: Callable[[], float] = time.time,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ):
+        self.store = store
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.endpoint_concurrency = endpoint_concurrency
+        self.timeout = timeout
+        self.batch = batch
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._post = post or get_session().post
+        self._clock = clock
+        self._jitter = jitter
+        self._limits: dict[str, threading.Semaphore] = {}
+        self._limits_lock = threading.Lock()
+        self._single_only: set[str] = set()
+
+    def _limit(self, endpoint: str) -> threading.Semaphore:
+        with self._limits_lock:
+            if endpoint not in self._limits:
+                self._limits[endpoint] = threading.BoundedSemaphore(self.endpoint_concurrency)
+            return self._limits[endpoint]
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter delay before the next attempt"""
+        return self._jitter(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    def _send(self, endpoint: str, body: dict, idempotency_key: str):
+        headers = {**BUBBLE_HEADERS, "Idempotency-Key": idempotency_key}
+        with self._limit(endpoint):
+            return self._post(endpoint, json=body, headers=headers, timeout=self.timeout)
+
+    def _delivered(self, record: dict) -> dict:
+        record["status"], record["last_error"] = DELIVERY_DELIVERED, None
+        logging.info(f"Delivered {record['delivery_id']} to Bubble (attempt {record['attempts']})")
+        self.store.save(record)
+        return record
+
+    def _failed(self, record: dict, error: str, permanent: bool, retry_after: Optional[float] = None) -> dict:
+        record["last_error"] = error
+        if permanent or record["attempts"] >= self.max_attempts:
+            record["status"] = DELIVERY_DEAD
+            logging.error(f"Dead-lettered Bubble delivery {record['delivery_id']} after {record['attempts']} attempts: {error}")
+        else:
+            delay = retry_after if retry_after is not None else self.backoff(record["attempts"])
+            record["next_attempt_at"] = self._clock() + delay
+            logging.warning(f"Bubble delivery {record['delivery_id']} failed (attempt {record['attempts']}), retrying in {delay:.1f}s: {error}")
+        self.store.save(record)
+        return record
+
+    @staticmethod
+    def _is_permanent(status_code: int) -> bool:
+        return 400 <= status_code < 500 and status_code not in (408, 429)
+
+    def deliver(self, record: dict) -> dict:
+        """
+        Attempt one delivery and record the outcome.
+
+        Returns:
+            The updated record
+        """
+        record = dict(record)
+        record["attempts"] += 1
+        try:
+            response = self._send(record["endpoint"], record["payload"], record["delivery_id"])
+        except Exception as e:
+            return self._failed(record, f"Request failed: {str(e)}", permanent=False)
+        if 200 <= response.status_code < 300:
+            return self._delivered(record)
+        return self._failed(
+            record,
+            f"Bubble webhook returned status {response.status_code}: {response.text}",
+            permanent=self._is_permanent(response.status_code),
+            retry_after=parse_retry_after(response.headers.get("Retry-After"))
+        )
+
+    def deliver_batch(self, records: list[dict]) -> list[dict]:
+        """
+        Attempt deliveries to one endpoint in a single bulk request.
+
+        Falls back to single requests if the endpoint rejects the batch or
+        refuses it as invalid.
+
+        Returns:
+            The updated records
+        """
+        endpoint = records[0]["endpoint"]
+        records = [{**record, "attempts": record["attempts"] + 1} for record in records]
+        batch_key = hashlib.sha256("|".join(sorted(record["delivery_id"] for record in records)).encode("utf-8")).hexdigest()
+        try:
+            response = self._send(endpoint, self.batch.build(records), f"batch-{batch_key[:32]}")
+        except Exception as e:
+            return [self._failed(record, f"Batch request failed: {str(e)}", permanent=False) for record in records]
+
+        if response.status_code in BATCH_REJECTED_STATUSES:
+            logging.warning(f"{endpoint} rejected a batch with status {response.status_code}; sending single requests")
+            self._single_only.add(endpoint)
+            # The rejected batch does not count as an attempt
+            return [self.deliver({**record, "attempts": record["attempts"] - 1}) for record in records]
+        if response.status_code in BATCH_SPLIT_STATUSES:
+            logging.warning(f"{endpoint} refused a batch with status {response.status_code}; sending its items singly")
+            return [self.deliver({**record, "attempts": record["attempts"] - 1}) for record in records]
+        if not 200 <= response.status_code < 300:
+            error = f"Bubble batch webhook returned status {response.status_code}: {response.text}"
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            return [self._failed(record, error, permanent=False, retry_after=retry_after) for record in records]
+
+        try:
+            acks = self.batch.acknowledgements(response.json())
+        except ValueError:
+            acks = None
+        if acks is None:
+            return [self._delivered(record) for record in records]
+
+        results = []
+        for record in records:
+            delivered, status, error = acks.get(record["delivery_id"], (False, None, "missing from batch results"))
+            if delivered:
+                results.append(self._delivered(record))
+            else:
+                permanent = isinstance(status, int) and self._is_permanent(status)
+                results.append(self._failed(record, f"Bubble rejected item ({status}): {error}", permanent=permanent))
+        return results
+
+    def _plan_batches(self, due: list[dict], now: float) -> list[list[dict]]:
+        by_endpoint: dict[str, list[dict]] = {}
+        for record in due:
+            by_endpoint.setdefault(record["endpoint"], []).append(record)
+        batches = []
+        for endpoint, records in by_endpoint.items():
+            if endpoint in self._single_only:
+                batches.extend([record] for record in records)
+                continue
+            for start in range(0, len(records), self.batch_size):
+                batch = records[start:start + self.batch_size]
+                # A partial batch waits for more deliveries until its oldest has waited batch_window
+                oldest = min(record["next_attempt_at"] for record in batch)
+                if len(batch) < self.batch_size and now - oldest < self.batch_window:
+                    continue
+                batches.append(batch)
+        return batches
+
+    def dispatch_due(self, limit: int = 100, workers: int = 8) -> dict:
+        """
+        Attempt every delivery that is due.
+
+        Args:
+            limit: Most deliveries to attempt in this pass
+            workers: Requests in flight across all endpoints
+
+        Returns:
+            Count of deliveries per resulting status
+        """
+        now = self._clock()
+        due = self.store.due(now, limit)
+        counts = {DELIVERY_DELIVERED: 0, DELIVERY_PENDING: 0, DELIVERY_DEAD: 0}
+        if self.batch is None:
+            batches = [[record] for record in due]
+        else:
+            batches = self._plan_batches(due, now)
+        if not batches:
+            return counts
+
+        def send(batch: list[dict]) -> list[dict]:
+            if self.batch is None or len(batch) == 1 and batch[0]["endpoint"] in self._single_only:
+                return [self.deliver(batch[0])]
+            return self.deliver_batch(batch)
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            for records in executor.map(send, batches):
+                for record in records:
+                    counts[record["status"]] += 1
+        return counts
+
+
+_store = None
+_dispatcher: Optional[BubbleDispatcher] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox_store():
+    """
+    Get the process-wide outbox store.
+
+    OUTBOX_STORE selects "blob" (default, the transcript container) or
+    "sqlite" (a local database at OUTBOX_STORE_PATH).
+    """
+    global _store
+    with _outbox_lock:
+        if _store is None:
+            backend = os.environ.get("OUTBOX_STORE", "blob").lower()
+            if backend == "sqlite":
+                path = os.environ.get("OUTBOX_STORE_PATH", os.path.join(tempfile.gettempdir(), "bubble_outbox.sqlite3"))
+                _store = SQLiteOutboxStore(path)
+            elif backend == "blob":
+                _store = BlobOutboxStore(get_container_client())
+            else:
+                raise ValueError(f"Unsupported OUTBOX_STORE: {backend}. Use 'blob' or 'sqlite'")
+        return _store
+
+
+def get_batch_envelope() -> Optional[BatchEnvelope]:
+    """
+    Batch envelope from the environment, or None when batching is off.
+
+    BUBBLE_BATCH=true enables batching. BUBBLE_BATCH_ITEMS_KEY,
+    BUBBLE_BATCH_ID_KEY and BUBBLE_BATCH_RESULTS_KEY rename the envelope
+    fields, and BUBBLE_BATCH_EXTRA is a JSON object of fields added to
+    every bulk request.
+    """
+    if os.environ.get("BUBBLE_BATCH", "false").lower() not in ("1", "true"):
+        return None
+    return BatchEnvelope(
+        items_key=os.environ.get("BUBBLE_BATCH_ITEMS_KEY", "items"),
+        id_key=os.environ.get("BUBBLE_BATCH_ID_KEY", "idempotency_key"),
+        results_key=os.environ.get("BUBBLE_BATCH_RESULTS_KEY", "results"),
+        extra=json.loads(os.environ.get("BUBBLE_BATCH_EXTRA", "{}")),
+    )
+
+
+def get_dispatcher() -> BubbleDispatcher:
+    """
+    Get the process-wide dispatcher.
+
+    Uses BUBBLE_MAX_ATTEMPTS (default 8), BUBBLE_BACKOFF_SECONDS (default 2),
+    BUBBLE_MAX_BACKOFF_SECONDS (default 300) and BUBBLE_ENDPOINT_CONCURRENCY
+    (default 4), with batching configured by get_batch_envelope,
+    BUBBLE_BATCH_SIZE (default 50) and BUBBLE_BATCH_WINDOW_SECONDS (default 2).
+    """
+    global _dispatcher
+    store = get_outbox_store()
+    with _outbox_lock:
+        if _dispatcher is None:
+            _dispatcher = BubbleDispatcher(
+                store,
+                max_attempts=int(os.environ.get("BUBBLE_MAX_ATTEMPTS", "8")),
+                base_delay=float(os.environ.get("BUBBLE_BACKOFF_SECONDS", "2")),
+                max_delay=float(os.environ.get("BUBBLE_MAX_BACKOFF_SECONDS", "300")),
+                endpoint_concurrency=int(os.environ.get("BUBBLE_ENDPOINT_CONCURRENCY", "4")),
+                batch=get_batch_envelope(),
+                batch_size=int(os.environ.get("BUBBLE_BATCH_SIZE", "50")),
+                batch_window=float(os.environ.get("BUBBLE_BATCH_WINDOW_SECONDS", "2")),
+            )
+        return _dispatcher
+
+
+class LocalDispatchLoop:
+    """In-process stand-in for the BubbleDispatcher timer, polling every interval seconds"""
+
+    def __init__(self, dispatcher: BubbleDispatcher, interval: float = 1.0):
+        self._dispatcher = dispatcher
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="bubble-dispatch")
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._dispatcher.dispatch_due()
+            except Exception as e:
+                logging.error(f"Local Bubble dispatcher error: {str(e)}")
+            self._stop.wait(self._interval)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+_local_loop: Optional[LocalDispatchLoop] = None
+
+
+def ensure_local_dispatch_loop() -> LocalDispatchLoop:
+    """Start the process-wide local dispatch loop on first use"""
+    global _local_loop
+    dispatcher = get_dispatcher()
+    with _outbox_lock:
+        if _local_loop is None:
+            _local_loop = LocalDispatchLoop(dispatcher, interval=float(os.environ.get("BUBBLE_DISPATCH_INTERVAL", "1.0")))
+        return _local_loop
@@ -0,0 +1,144 @@
+"""
+Durable per-job pipeline checkpoints.
+Each completed stage's output is stored under the job id, so a retried job
+resumes after the last completed stage instead of downloading, converting
+and transcribing the memo again.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from typing import Optional
+
+from .storage import get_container_client
+
+
+class LocalCheckpointStore:
+    """Stores checkpoints as {directory}/{job_id}/{stage}.json"""
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self._directory, job_id)
+
+    def load(self, job_id: str) -> dict:
+        job_dir = self._job_dir(job_id)
+        if not os.path.isdir(job_dir):
+            return {}
+        outputs = {}
+        for name in os.listdir(job_dir):
+            if name.endswith(".json"):
+                with open(os.path.join(job_dir, name), "r", encoding="utf-8") as f:
+                    outputs[name[:-len(".json")]] = json.load(f)["output"]
+        return outputs
+
+    def save(self, job_id: str, stage: str, output) -> None:
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        tmp_path = os.path.join(job_dir, f".{uuid.uuid4()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"output": output}, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(job_dir, f"{stage}.json"))
+
+    def clear(self, job_id: str) -> None:
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+
+class BlobCheckpointStore:
+    """Stores checkpoints as blobs under checkpoints/{job_id}/{stage}.json"""
+
+    def __init__(self, container_client, prefix: str = "checkpoints/"):
+        self._container = container_client
+        self._prefix = prefix
+
+    def _job_prefix(self, job_id: str) -> str:
+        return f"{self._prefix}{job_id}/"
+
+    def load(self, job_id: str) -> dict:
+        job_prefix = self._job_prefix(job_id)
+        outputs = {}
+        for blob in self._container.list_blobs(name_starts_with=job_prefix):
+            stage = blob.name[len(job_prefix):-len(".json")]
+            data = self._container.get_blob_client(blob.name).download_blob().readall()
+            outputs[stage] = json.loads(data)["output"]
+        return outputs
+
+    def save(self, job_id: str, stage: str, output) -> None:
+        blob_client = self._container.get_blob_client(f"{self._job_prefix(job_id)}{stage}.json")
+        blob_client.upload_blob(json.dumps({"output": output}, ensure_ascii=False), overwrite=True)
+
+    def clear(self, job_id: str) -> None:
+        for blob in self._container.list_blobs(name_starts_with=self._job_prefix(job_id)):
+            self._container.delete_blob(blob.name)
+
+
+class JobCheckpoint:
+    """
+    Checkpoints of one job.
+
+    Write failures are logged and ignored: a missing checkpoint only means a
+    retry repeats that stage.
+    """
+
+    def __init__(self, store, job_id: str):
+        self._store = store
+        self.job_id = job_id
+
+    def load(self) -> dict:
+        """Outputs of the stages completed by earlier attempts, keyed by stage name"""
+        try:
+            return self._store.load(self.job_id)
+        except Exception as e:
+            logging.warning(f"Could not load checkpoints for job {self.job_id}: {str(e)}")
+            return {}
+
+    def save(self, stage: str, output) -> None:
+        """Record a completed stage; output must be JSON-serialisable"""
+        try:
+            self._store.save(self.job_id, stage, output)
+        except Exception as e:
+            logging.warning(f"Could not checkpoint stage {stage} of job {self.job_id}: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop the job's checkpoints once it has finished"""
+        try:
+            self._store.clear(self.job_id)
+        except Exception as e:
+            logging.warning(f"Could not clear checkpoints for job {self.job_id}: {str(e)}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    """
+    Get the process-wide checkpoint store, or None when checkpointing is off.
+
+    CHECKPOINT_STORE selects "off" (default), "blob" (the transcript
+    container) or "local" (files under CHECKPOINT_DIR).
+    """
+    global _store
+    backend = os.environ.get("CHECKPOINT_STORE", "off").lower()
+    if backend == "off":
+        return None
+    with _store_lock:
+        if _store is None:
+            if backend == "blob":
+                _store = BlobCheckpointStore(get_container_client())
+            elif backend == "local":
+                _store = LocalCheckpointStore(os.environ.get("CHECKPOINT_DIR", os.path.join(tempfile.gettempdir(), "transcription-checkpoints")))
+            else:
+                raise ValueError(f"Unsupported CHECKPOINT_STORE: {backend}. Use 'off', 'blob', or 'local'")
+        return _store
+
+
+def get_job_checkpoint(job_id: Optional[str]) -> Optional[JobCheckpoint]:
+    """Checkpoints for a job, or None without a job id or checkpoint store"""
+    store = get_checkpoint_store() if job_id else None
+    return JobCheckpoint(store, job_id) if store is not None else None
@@ -0,0 +1,199 @@
+"""
+Chunked parallel transcription for long recordings.
+Splits the converted WAV into overlapping segments cut at quiet points,
+transcribes them concurrently and stitches the recognized phrases back into
+one result on the original timeline.
+"""
+
+import copy
+import logging
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from .silence import TICKS_PER_SECOND, frame_energy_db, iso_duration
+from .wav_audio import read_mono, write_wav
+
+_FRAME_MS = 30
+
+
+@dataclass
+class Segment:
+    """A slice of the recording, in samples"""
+    start: int  # first sample sent for transcription, including overlap
+    end: int  # sample after the last one sent
+    owned_start: int  # phrases centred in [owned_start, owned_end) belong to this segment
+    owned_end: int
+
+
+def get_min_chunk_seconds() -> float:
+    """Recordings at least this long are chunked; CHUNK_TRANSCRIPTION_MIN_SECONDS=0 disables chunking"""
+    return float(os.environ.get("CHUNK_TRANSCRIPTION_MIN_SECONDS", "1800"))
+
+
+def plan_segments(
+    samples: np.ndarray,
+    sample_rate: int,
+    segment_seconds: float = 300.0,
+    overlap_seconds: float = 2.0,
+    search_seconds: float = 15.0,
+) -> list[Segment]:
+    """
+    Choose segment boundaries at the quietest frame near every segment_seconds.
+
+    Args:
+        samples: Mono samples of the whole recording
+        sample_rate: Sample rate of samples
+        segment_seconds: Target segment length
+        overlap_seconds: Audio added on both sides of each cut
+        search_seconds: How far either side of the target to look for a quiet cut point
+
+    Returns:
+        Segments covering the recording in order
+    """
+    total = len(samples)
+    segment_length = int(segment_seconds * sample_rate)
+    if total <= segment_length:
+        return [Segment(0, total, 0, total)]
+
+    frame_length = int(sample_rate * _FRAME_MS / 1000)
+    energy = frame_energy_db(samples, sample_rate, _FRAME_MS)
+    search = int(search_seconds * sample_rate)
+
+    cuts = [0]
+    target = segment_length
+    # Stop before leaving a final segment shorter than a quarter of the target
+    while target < total - segment_length // 4:
+        lo = max((target - search) // frame_length, cuts[-1] // frame_length + 1)
+        hi = min((target + search) // frame_length, len(energy))
+        if lo < hi:
+            cut = (lo + int(np.argmin(energy[lo:hi]))) * frame_length + frame_length // 2
+        else:
+            cut = target
+        cuts.append(cut)
+        target = cut + segment_length
+    cuts.append(total)
+
+    overlap = int(overlap_seconds * sample_rate)
+    return [
+        Segment(max(start - overlap, 0), min(end + overlap, total), start, end)
+        for start, end in zip(cuts, cuts[1:])
+    ]
+
+
+def _shift(item: dict, ticks: int) -> None:
+    """Move a phrase or word from segment time to recording time"""
+    if "offsetInTicks" not in item:
+        return
+    item["offsetInTicks"] += ticks
+    if "offset" in item:
+        item["offset"] = iso_duration(item["offsetInTicks"] / TICKS_PER_SECOND)
+
+
+def _overlap_ratio(a: dict, b: dict) -> float:
+    """Fraction of the shorter phrase covered by the other"""
+    a_start, b_start = a["offsetInTicks"], b["offsetInTicks"]
+    a_end = a_start + a.get("durationInTicks", 0)
+    b_end = b_start + b.get("durationInTicks", 0)
+    shortest = min(a_end - a_start, b_end - b_start)
+    if shortest <= 0:
+        return 0.0
+    return max(min(a_end, b_end) - max(a_start, b_start), 0) / shortest
+
+
+def stitch_results(results: list[dict], segments: list[Segment], sample_rate: int) -> dict:
+    """
+    Merge per-segment transcription results into one.
+
+    Timestamps are shifted onto the recording timeline and each phrase is kept
+    only by the segment that owns its midpoint, which drops the duplicates
+    recognised twice in the overlap. Phrases that still overlap across a cut are
+    de-duplicated by keeping the longer one. Segments are transcribed without
+    diarization, since speaker numbers restart in every segment.
+
+    Args:
+        results: Batch transcription results, one per segment
+        segments: The segments the results were produced from
+        sample_rate: Sample rate the segments were cut at
+
+    Returns:
+        A result dict with the stitched recognizedPhrases in time order
+    """
+    kept = []
+    for index, (result, segment) in enumerate(zip(results, segments)):
+        shift = round(segment.start / sample_rate * TICKS_PER_SECOND)
+        owned_start = segment.owned_start / sample_rate * TICKS_PER_SECOND
+        owned_end = segment.owned_end / sample_rate * TICKS_PER_SECOND
+        is_last = index == len(segments) - 1
+
+        for phrase in result.get("recognizedPhrases", []):
+            phrase = copy.deepcopy(phrase)
+            _shift(phrase, shift)
+            for candidate in phrase.get("nBest", []):
+                for word in candidate.get("words", []):
+                    _shift(word, shift)
+
+            midpoint = phrase.get("offsetInTicks", 0) + phrase.get("durationInTicks", 0) / 2
+            if owned_start <= midpoint and (midpoint < owned_end or is_last):
+                kept.append((index, phrase))
+
+    kept.sort(key=lambda item: item[1].get("offsetInTicks", 0))
+
+    stitched = []
+    for index, phrase in kept:
+        if stitched and stitched[-1][0] != index and _overlap_ratio(stitched[-1][1], phrase) > 0.5:
+            if phrase.get("durationInTicks", 0) > stitched[-1][1].get("durationInTicks", 0):
+                stitched[-1] = (index, phrase)
+            continue
+        stitched.append((index, phrase))
+
+    total_ticks = round(segments[-1].end / sample_rate * TICKS_PER_SECOND) if segments else 0
+    return {
+        "durationInTicks": total_ticks,
+        "recognizedPhrases": [phrase for _, phrase in stitched],
+    }
+
+
+def transcribe_in_segments(wav_path: str, transcribe_segment: Callable[[str], dict]) -> dict:
+    """
+    Transcribe a long WAV as concurrent overlapping segments.
+
+    Segment length, overlap and concurrency come from CHUNK_SECONDS (default
+    300), CHUNK_OVERLAP_SECONDS (default 2) and CHUNK_WORKERS (default 4).
+
+    Args:
+        wav_path: 16 kHz mono WAV of the whole recording
+        transcribe_segment: Callable that transcribes one segment WAV path and returns its batch result
+
+    Returns:
+        Stitched batch transcription result
+    """
+    samples, sample_rate = read_mono(wav_path)
+    segments = plan_segments(
+        samples,
+        sample_rate,
+        segment_seconds=float(os.environ.get("CHUNK_SECONDS", "300")),
+        overlap_seconds=float(os.environ.get("CHUNK_OVERLAP_SECONDS", "2")),
+    )
+    logging.info(f"Transcribing {len(samples) / sample_rate:.1f}s of audio in {len(segments)} segments")
+
+    segment_paths = []
+    try:
+        for segment in segments:
+            path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.wav")
+            write_wav(path, samples[segment.start:segment.end], sample_rate)
+            segment_paths.append(path)
+
+        with ThreadPoolExecutor(max_workers=int(os.environ.get("CHUNK_WORKERS", "4"))) as executor:
+            results = list(executor.map(transcribe_segment, segment_paths))
+    finally:
+        for path in segment_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    return stitch_results(results, segments, sample_rate)
@@ -0,0 +1,208 @@
+"""
+ffmpeg binary provisioning.
+Resolves ffmpeg from an explicit path, the bundled TranscribeAudio/ffmpeg/ folder
+or the system PATH, and only as a last resort downloads the static Linux build
+into a cache directory guarded by a file lock. The download is only installed
+when it matches FFMPEG_SHA256, or, when no digest is configured, the checksum
+the build host publishes next to the archive.
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import re
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+from typing import Optional
+
+from .http_session import get_session
+
+try:
+    import fcntl
+except ImportError:  # Windows local development
+    fcntl = None
+
+FFMPEG_URL = "https://www.johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
+BUNDLED_FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg", "ffmpeg")
+
+_resolved_path: Optional[str] = None
+_resolve_lock = threading.Lock()
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def get_cache_dir() -> str:
+    """Directory holding the downloaded binary, configurable through FFMPEG_CACHE_DIR"""
+    return os.environ.get("FFMPEG_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ffmpeg-cache"))
+
+
+@contextlib.contextmanager
+def _file_lock(lock_path: str):
+    """Exclusive lock shared by every worker process on the instance"""
+    with open(lock_path, "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _download_archive(url: str, archive_path: str) -> dict[str, str]:
+    """Stream the archive to disk and return its hex digests keyed by algorithm"""
+    digests = {"sha256": hashlib.sha256(), "md5": hashlib.md5()}
+    with get_session().get(url, stream=True) as r:
+        r.raise_for_status()
+        with open(archive_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=1024 * 1024):
+                for digest in digests.values():
+                    digest.update(chunk)
+                f.write(chunk)
+    return {name: digest.hexdigest() for name, digest in digests.items()}
+
+
+def _published_checksum(url: str) -> str:
+    """
+    MD5 the build host publishes as {url}.md5.
+
+    Raises:
+        Exception: If the checksum file is missing or malformed
+    """
+    response = get_session().get(f"{url}.md5")
+    if response.status_code != 200:
+        raise Exception(f"No FFMPEG_SHA256 configured and no published checksum at {url}.md5 (status {response.status_code})")
+    match = re.match(r"\s*([0-9a-fA-F]{32})\b", response.text)
+    if not match:
+        raise Exception(f"Malformed ffmpeg checksum file at {url}.md5")
+    return match.group(1)
+
+
+def download_ffmpeg(cache_dir: str = None, url: str = None, sha256: str = None) -> str:
+    """
+    Get the cached static ffmpeg build, downloading it once per instance.
+
+    Concurrent workers serialise on a lock file in the cache directory; the
+    first one downloads, verifies and atomically installs the binary and the
+    rest reuse it. The archive is verified against FFMPEG_SHA256 when it is
+    set (pin it together with a versioned FFMPEG_DOWNLOAD_URL); otherwise
+    against the MD5 published next to the archive, which FFMPEG_URL provides.
+    Nothing is installed unless one of them matches.
+
+    Args:
+        cache_dir: Cache directory (defaults to FFMPEG_CACHE_DIR)
+        url: Archive URL (defaults to FFMPEG_URL, or the FFMPEG_DOWNLOAD_URL setting)
+        sha256: Expected archive digest (defaults to the FFMPEG_SHA256 setting)
+
+    Returns:
+        Path to the cached ffmpeg binary
+
+    Raises:
+        Exception: If no checksum can be obtained, the archive digest does
+            not match or the archive holds no ffmpeg binary
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    url = url or os.environ.get("FFMPEG_DOWNLOAD_URL", FFMPEG_URL)
+    sha256 = sha256 or os.environ.get("FFMPEG_SHA256")
+    binary_path = os.path.join(cache_dir, "ffmpeg")
+
+    if _is_executable(binary_path):
+        return binary_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with _file_lock(os.path.join(cache_dir, ".lock")):
+        # Another worker may have finished the download while we waited
+        if _is_executable(binary_path):
+            return binary_path
+
+        logging.info(f"Downloading ffmpeg static build from {url}")
+        archive_path = os.path.join(cache_dir, f"ffmpeg-{os.getpid()}.tar.xz")
+        staging_path = os.path.join(cache_dir, f"ffmpeg-{os.getpid()}.partial")
+        try:
+            algorithm, expected = ("sha256", sha256) if sha256 else ("md5", _published_checksum(url))
+            digest = _download_archive(url, archive_path)[algorithm]
+            if digest.lower() != expected.lower():
+                raise Exception(f"ffmpeg archive {algorithm} checksum mismatch: expected {expected}, got {digest}")
+
+            with tarfile.open(archive_path, mode="r:xz") as tar:
+                member = next(
+                    (m for m in tar.getmembers() if m.isfile() and os.path.basename(m.name) == "ffmpeg"),
+                    None
+                )
+                if member is None:
+                    raise Exception("ffmpeg binary not found in archive")
+                with tar.extractfile(member) as src, open(staging_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+
+            os.chmod(staging_path, os.stat(staging_path).st_mode | stat.S_IEXEC)
+            os.replace(staging_path, binary_path)
+        finally:
+            for path in (archive_path, staging_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    return binary_path
+
+
+def resolve_ffmpeg_path() -> str:
+    """
+    Find an ffmpeg binary, preferring ones that need no download.
+
+    Order: FFMPEG_PATH setting, bundled TranscribeAudio/ffmpeg/ffmpeg, ffmpeg on
+    the PATH, then the cached download. The result is memoised per process.
+
+    Returns:
+        Path to an executable ffmpeg binary
+    """
+    global _resolved_path
+    if _resolved_path:
+        return _resolved_path
+
+    with _resolve_lock:
+        if not _resolved_path:
+            for candidate in (os.environ.get("FFMPEG_PATH"), BUNDLED_FFMPEG_PATH, shutil.which("ffmpeg")):
+                if _is_executable(candidate):
+                    _resolved_path = candidate
+                    break
+            else:
+                _resolved_path = download_ffmpeg()
+            logging.info(f"Using ffmpeg at {_resolved_path}")
+
+    return _resolved_path
+
+
+def prewarm_ffmpeg(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Resolve (and if needed download) ffmpeg ahead of the first request.
+
+    In the foreground a failure is raised, so the Warmup function fails
+    before the instance takes traffic instead of on the first request.
+
+    Args:
+        background: Resolve on a daemon thread instead of blocking the caller
+
+    Returns:
+        The started thread when running in the background
+
+    Raises:
+        Exception: In the foreground, if no ffmpeg binary can be provisioned
+    """
+    if not background:
+        resolve_ffmpeg_path()
+        return None
+
+    def warm() -> None:
+        try:
+            resolve_ffmpeg_path()
+        except Exception as e:
+            logging.error(f"ffmpeg pre-warm failed: {str(e)}")
+
+    thread = threading.Thread(target=warm, daemon=True, name="ffmpeg-prewarm")
+    thread.start()
+    return thread
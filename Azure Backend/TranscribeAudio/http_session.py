@@ -0,0 +1,101 @@
+"""
+Shared HTTP session for outbound REST calls.
+One pooled requests.Session per worker process keeps TCP+TLS connections to
+Speech, Translator, storage and Bubble alive across calls and invocations,
+applies default connect/read timeouts and retries idempotent requests on
+transient server errors.
+"""
+
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Methods that are safe to repeat after a failed attempt
+RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+# 429 is left to callers, which honour Retry-After themselves
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when the caller does not pass one"""
+
+    def __init__(self, *args, timeout: tuple[float, float] = (5.0, 60.0), **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    connect_timeout: float = 5.0,
+    read_timeout: float = 60.0,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+) -> requests.Session:
+    """
+    Build a session with keep-alive pooling, default timeouts and retries.
+
+    Args:
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Connections kept open per host, sized for concurrent segment and upload workers
+        connect_timeout: Seconds to wait for a connection
+        read_timeout: Seconds to wait between bytes of the response
+        retries: Retries for idempotent requests on connection errors and 5xx responses
+        backoff_factor: Exponential backoff between retries
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=(connect_timeout, read_timeout),
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide session, created on first use.
+
+    Configured through HTTP_POOL_CONNECTIONS (default 10), HTTP_POOL_MAXSIZE
+    (default 10), HTTP_CONNECT_TIMEOUT (default 5), HTTP_READ_TIMEOUT
+    (default 60) and HTTP_RETRIES (default 3).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(
+                pool_connections=int(os.environ.get("HTTP_POOL_CONNECTIONS", "10")),
+                pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", "10")),
+                connect_timeout=float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.environ.get("HTTP_READ_TIMEOUT", "60")),
+                retries=int(os.environ.get("HTTP_RETRIES", "3")),
+            )
+        return _session
@@ -0,0 +1,271 @@
+"""
+Asynchronous transcription job tracking.
+Jobs are accepted by the EnqueueTranscription function, drained from the
+transcription queue by TranscriptionWorker and reported by TranscriptionStatus.
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from .checkpoints import get_job_checkpoint
+from .storage import get_container_client
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_RETRYING = "retrying"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Name of the storage queue shared by the enqueue and worker bindings
+JOB_QUEUE_NAME = "transcription-jobs"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def new_job_record(job_id: str, request: dict) -> dict:
+    """Build the initial status record for a freshly enqueued job"""
+    return {
+        "job_id": job_id,
+        "status": JOB_QUEUED,
+        "stage": JOB_QUEUED,
+        "request": request,
+        "result": None,
+        "error": None,
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+class BlobJobStore:
+    """Stores job status records as JSON blobs under jobs/{job_id}.json"""
+
+    def __init__(self, connect_str: str, container_name: str):
+        self._container = get_container_client(connect_str, container_name)
+
+    def _blob_name(self, job_id: str) -> str:
+        return f"jobs/{job_id}.json"
+
+    def save(self, record: dict) -> None:
+        blob_client = self._container.get_blob_client(self._blob_name(record["job_id"]))
+        blob_client.upload_blob(json.dumps(record), overwrite=True)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        blob_client = self._container.get_blob_client(self._blob_name(job_id))
+        try:
+            return json.loads(blob_client.download_blob().readall())
+        except ResourceNotFoundError:
+            return None
+
+
+class SQLiteJobStore:
+    """Local job store backed by SQLite, used for local runs and tests"""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+            self._conn.commit()
+
+    def save(self, record: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, record) VALUES (?, ?)",
+                (record["job_id"], json.dumps(record))
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def update_job(store, job_id: str, **fields) -> dict:
+    """
+    Merge fields into a stored job record.
+
+    Args:
+        store: Job store holding the record
+        job_id: Identifier of the job to update
+        **fields: Record fields to overwrite (status, stage, result, error)
+
+    Returns:
+        The updated record
+    """
+    record = store.get(job_id)
+    if record is None:
+        raise KeyError(f"Unknown job: {job_id}")
+    record.update(fields)
+    record["updated_at"] = _now()
+    store.save(record)
+    return record
+
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store():
+    """
+    Get the process-wide job store.
+
+    JOB_STORE selects the backend: "blob" (default) stores records in the
+    transcript container, "sqlite" uses a local database at JOB_STORE_PATH.
+    """
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            backend = os.environ.get("JOB_STORE", "blob").lower()
+            if backend == "sqlite":
+                path = os.environ.get("JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "transcription_jobs.sqlite3"))
+                _job_store = SQLiteJobStore(path)
+            elif backend == "blob":
+                _job_store = BlobJobStore(
+                    os.environ["AZURE_STORAGE_CONNECTION_STRING"],
+                    os.environ["AZURE_STORAGE_CONTAINER"]
+                )
+            else:
+                raise ValueError(f"Unsupported JOB_STORE: {backend}. Use 'blob' or 'sqlite'")
+        return _job_store
+
+
+def enqueue_job(store, request: dict, send: Callable[[str], None]) -> dict:
+    """
+    Record a new job and hand its message to the queue.
+
+    Args:
+        store: Job store to record the job in
+        request: Validated request fields (file_url, country and pipeline options)
+        send: Callable that puts the serialized message on the queue
+
+    Returns:
+        The initial job record
+    """
+    job_id = str(uuid.uuid4())
+    record = new_job_record(job_id, request)
+    store.save(record)
+    send(json.dumps({"job_id": job_id, **request}))
+    return record
+
+
+def run_job(message: str, store, process: Callable[..., dict], attempt: int = 1, max_attempts: int = 1) -> dict:
+    """
+    Run one queued job and record its outcome.
+
+    A failed attempt before the last is recorded as retrying and its
+    exception re-raised, so the queue redelivers the message and the
+    pipeline resumes from the job's checkpoints. When the last attempt fails
+    the job's checkpoints are deleted.
+
+    Args:
+        message: Queue message produced by enqueue_job
+        store: Job store holding the job record
+        process: Pipeline callable taking (file_url, country, on_stage=..., on_partial=..., job_id=..., **options)
+            and returning the result dict
+        attempt: Delivery count of the message, starting at 1
+        max_attempts: Deliveries before the job is marked failed
+
+    Returns:
+        The final job record
+    """
+    job = json.loads(message)
+    job_id = job.pop("job_id")
+    file_url = job.pop("file_url")
+    country = job.pop("country")
+    update_job(store, job_id, status=JOB_RUNNING, stage="started", attempt=attempt)
+    # Stage and progress updates arrive from different threads
+    record_lock = threading.Lock()
+
+    def on_stage(stage: str) -> None:
+        logging.info(f"Job {job_id} stage: {stage}")
+        with record_lock:
+            update_job(store, job_id, stage=stage)
+
+    def on_partial(update: dict) -> None:
+        # Transcript versions are readable from the status endpoint as soon as they exist
+        with record_lock:
+            partial = store.get(job_id).get("partial") or {}
+            partial[update["field"]] = update["text"]
+            update_job(store, job_id, partial=partial)
+
+    try:
+        # Remaining message fields are per-request pipeline options
+        result = process(file_url, country, on_stage=on_stage, on_partial=on_partial, job_id=job_id, **job)
+    except Exception as e:
+        if attempt < max_attempts:
+            logging.warning(f"Job {job_id} attempt {attempt} of {max_attempts} failed, retrying: {str(e)}")
+            update_job(store, job_id, status=JOB_RETRYING, error=str(e))
+            raise
+        logging.error(f"Job {job_id} failed: {str(e)}")
+        # No attempt will resume from the checkpoints now
+        checkpoint = get_job_checkpoint(job_id)
+        if checkpoint:
+            checkpoint.clear()
+        return update_job(store, job_id, status=JOB_FAILED, error=str(e))
+
+    return update_job(store, job_id, status=JOB_SUCCEEDED, stage="completed", result=result)
+
+
+class LocalJobQueue:
+    """In-process stand-in for the storage queue, drained by worker threads"""
+
+    def __init__(self, handler: Callable[[str], object], workers: int = 1):
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._handler = handler
+        self._threads = [
+            threading.Thread(target=self._drain, daemon=True, name=f"local-job-worker-{i}")
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            message = self._queue.get()
+            try:
+                if message is None:
+                    return
+                self._handler(message)
+            except Exception as e:
+                logging.error(f"Local job worker error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def put(self, message: str) -> None:
+        self._queue.put(message)
+
+    def join(self) -> None:
+        """Block until every queued message has been handled"""
+        self._queue.join()
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+_local_queue: Optional[LocalJobQueue] = None
+
+
+def get_local_queue(handler: Callable[[str], object]) -> LocalJobQueue:
+    """Get the process-wide local queue, starting JOB_QUEUE_WORKERS threads on first use"""
+    global _local_queue
+    with _job_store_lock:
+        if _local_queue is None:
+            _local_queue = LocalJobQueue(handler, workers=int(os.environ.get("JOB_QUEUE_WORKERS", "2")))
+        return _local_queue
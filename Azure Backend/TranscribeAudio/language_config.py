@@ -1,12 +1,17 @@
 """
 Language and country configuration for speech recognition and translation.
 Maps countries to their corresponding Azure Speech locale and translation source language.
+Lookups go through an immutable index built at import, so resolving a
+country costs the same however many countries are configured.
 """
 
-from typing import Dict, NamedTuple
+import functools
+import re
+from types import MappingProxyType
+from typing import Dict, Mapping
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True)
 class LanguageConfig:
     """Configuration for a country's language settings"""
     country_name: str
@@ -15,6 +20,7 @@ class LanguageConfig:
     translate_from: str  # Source language code for translation
     translate_to: str = "en"  # Target language (default to English)
     language_name: str = ""  # Human-readable language name
+    aliases: tuple[str, ...] = ()  # Other names the country is requested by
 
 # Language configuration lookup table
 LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
@@ -23,77 +29,167 @@ LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
         country_code="IN",
         speech_locale="hi-IN",
         translate_from="hi",
-        language_name="Hindi"
+        language_name="Hindi",
+        aliases=("Bharat", "Hindustan")
     ),
     "usa": LanguageConfig(
         country_name="United States",
         country_code="US",
         speech_locale="en-US",
         translate_from="en",
-        language_name="English"
+        language_name="English",
+        aliases=("United States of America", "America", "U.S.", "U.S.A.")
     ),
     "spain": LanguageConfig(
         country_name="Spain",
         country_code="ES",
         speech_locale="es-ES",
         translate_from="es",
-        language_name="Spanish"
+        language_name="Spanish",
+        aliases=("España",)
     ),
     "france": LanguageConfig(
         country_name="France",
         country_code="FR",
         speech_locale="fr-FR",
         translate_from="fr",
-        language_name="French"
+        language_name="French",
+        aliases=("République française",)
     ),
     "germany": LanguageConfig(
         country_name="Germany",
         country_code="DE",
         speech_locale="de-DE",
         translate_from="de",
-        language_name="German"
+        language_name="German",
+        aliases=("Deutschland",)
     ),
     "italy": LanguageConfig(
         country_name="Italy",
         country_code="IT",
         speech_locale="it-IT",
         translate_from="it",
-        language_name="Italian"
+        language_name="Italian",
+        aliases=("Italia",)
     ),
     "japan": LanguageConfig(
         country_name="Japan",
         country_code="JP",
         speech_locale="ja-JP",
         translate_from="ja",
-        language_name="Japanese"
+        language_name="Japanese",
+        aliases=("Nippon", "Nihon")
     ),
     "china": LanguageConfig(
         country_name="China",
         country_code="CN",
         speech_locale="zh-CN",
         translate_from="zh",
-        language_name="Chinese (Simplified)"
+        language_name="Chinese (Simplified)",
+        aliases=("People's Republic of China", "PRC")
     ),
     "brazil": LanguageConfig(
         country_name="Brazil",
         country_code="BR",
         speech_locale="pt-BR",
         translate_from="pt",
-        language_name="Portuguese (Brazil)"
+        language_name="Portuguese (Brazil)",
+        aliases=("Brasil",)
     ),
     "russia": LanguageConfig(
         country_name="Russia",
         country_code="RU",
         speech_locale="ru-RU",
         translate_from="ru",
-        language_name="Russian"
+        language_name="Russian",
+        aliases=("Russian Federation",)
     )
 }
 
+# Match kinds in order of precedence when two countries claim the same key
+_KEY_PRIORITY = ("name", "code", "alias", "locale", "language")
+
+
+def _normalize(value: str) -> str:
+    """Lookup form of a country, code or locale: case-folded, single-spaced, "_" read as "-" """
+    return re.sub(r"\s+", " ", value.strip().casefold()).replace("_", "-")
+
+
+def _index_keys(key: str, config: LanguageConfig) -> list[tuple[str, str]]:
+    return [
+        ("name", key),
+        ("name", config.country_name),
+        ("code", config.country_code),
+        *(("alias", alias) for alias in config.aliases),
+        ("locale", config.speech_locale),
+        ("language", config.translate_from),
+        ("language", config.language_name),
+    ]
+
+
+def _build_index(configs: Mapping[str, LanguageConfig]) -> Mapping[str, LanguageConfig]:
+    """
+    Map every name, ISO code, alias, speech locale and language of each country to its config.
+
+    A key claimed by several countries goes to the higher-priority kind of
+    match (a country code beats a language code), then to the country
+    declared first. A language shared by countries with no stronger claim
+    on it would be ambiguous and is left out.
+    """
+    claims: dict[str, list[tuple[int, int, LanguageConfig]]] = {}
+    for order, (key, config) in enumerate(configs.items()):
+        for kind, value in _index_keys(key, config):
+            if value:
+                claims.setdefault(_normalize(value), []).append((_KEY_PRIORITY.index(kind), order, config))
+
+    index = {}
+    for key, key_claims in claims.items():
+        priority, _, config = min(key_claims, key=lambda claim: claim[:2])
+        contenders = {id(claim[2]) for claim in key_claims if claim[0] == priority}
+        if _KEY_PRIORITY[priority] == "language" and len(contenders) > 1:
+            continue
+        index[key] = config
+    return MappingProxyType(index)
+
+
+def _build_name_table(configs: Mapping[str, LanguageConfig]) -> tuple[tuple[str, int, LanguageConfig], ...]:
+    """Every country name and alias with its declaration order, for partial matching"""
+    return tuple(
+        (_normalize(name), order, config)
+        for order, config in enumerate(configs.values())
+        for name in (config.country_name, *config.aliases)
+    )
+
+
+_INDEX = _build_index(LANGUAGE_CONFIGS)
+_NAMES = _build_name_table(LANGUAGE_CONFIGS)
+_SUPPORTED_COUNTRIES = tuple(config.country_name for config in LANGUAGE_CONFIGS.values())
+_SUPPORTED_CODES = tuple(config.country_code for config in LANGUAGE_CONFIGS.values())
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve(country: str) -> LanguageConfig:
+    config = _INDEX.get(country)
+    if config is not None:
+        return config
+
+    # Partial match on names and aliases: prefixes first, then the closest
+    # (shortest) name, then the country declared first
+    candidates = [(not name.startswith(country), len(name), order, config) for name, order, config in _NAMES if country and country in name]
+    if candidates:
+        return min(candidates, key=lambda candidate: candidate[:3])[3]
+
+    raise ValueError(country)
+
+
 def get_language_config(country: str) -> LanguageConfig:
     """
     Get language configuration for a given country.
     
+    Accepts the country name, ISO code, an alias, the speech locale or the
+    source language (code or name), case-insensitively, and falls back to a
+    partial match on the country names. Results are memoized.
+    
     Args:
         country: Country name (case-insensitive) or country code
         
@@ -103,32 +199,18 @@ def get_language_config(country: str) -> LanguageConfig:
     Raises:
         ValueError: If country is not supported
     """
-    country_lower = country.lower()
-    
-    # Try exact match first
-    if country_lower in LANGUAGE_CONFIGS:
-        return LANGUAGE_CONFIGS[country_lower]
-    
-    # Try matching by country code
-    for config in LANGUAGE_CONFIGS.values():
-        if config.country_code.lower() == country_lower:
-            return config
-    
-    # Try partial match on country name
-    for config in LANGUAGE_CONFIGS.values():
-        if country_lower in config.country_name.lower():
-            return config
-    
-    supported_countries = [config.country_name for config in LANGUAGE_CONFIGS.values()]
-    raise ValueError(f"Unsupported country: {country}. Supported countries: {', '.join(supported_countries)}")
+    try:
+        return _resolve(_normalize(country))
+    except ValueError:
+        raise ValueError(f"Unsupported country: {country}. Supported countries: {', '.join(_SUPPORTED_COUNTRIES)}") from None
 
 def get_supported_countries() -> list[str]:
     """Get list of all supported country names"""
-    return [config.country_name for config in LANGUAGE_CONFIGS.values()]
+    return list(_SUPPORTED_COUNTRIES)
 
 def get_supported_country_codes() -> list[str]:
     """Get list of all supported country codes"""
-    return [config.country_code for config in LANGUAGE_CONFIGS.values()]
+    return list(_SUPPORTED_CODES)
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""
+Shared Azure OpenAI clients for the LLM helpers.
+LangChain clients are built once per deployment and client kind and reused,
+so each prompt only pays for its HTTP request over the client's kept-alive
+connection. Responses can be streamed token by token for progressive
+results. Tests can swap in FakeLLM through set_llm_factory.
+"""
+
+import itertools
+import os
+import re
+import threading
+from typing import Callable, Iterable, Optional
+
+LLM_CLIENT_KINDS = ("completion", "chat")
+
+_clients: dict = {}
+_clients_lock = threading.Lock()
+_factory: Optional[Callable[[str, str], object]] = None
+
+
+def _missing_config() -> Exception:
+    return Exception(
+        "Missing Azure OpenAI configuration. Please set AZURE_OPENAI_KEY and "
+        "AZURE_OPENAI_ENDPOINT environment variables."
+    )
+
+
+def create_azure_llm(kind: str, deployment_name: str):
+    """
+    Build a LangChain Azure OpenAI client.
+
+    Args:
+        kind: "completion" for AzureOpenAI or "chat" for AzureChatOpenAI
+        deployment_name: Azure OpenAI deployment to call
+
+    Returns:
+        LangChain model exposing invoke()
+    """
+    api_key = os.environ.get("AZURE_OPENAI_KEY")
+    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    if not api_key or not azure_endpoint:
+        raise _missing_config()
+
+    if kind == "chat":
+        from langchain_openai import AzureChatOpenAI
+        return AzureChatOpenAI(deployment_name=deployment_name, api_key=api_key, azure_endpoint=azure_endpoint)
+    if kind == "completion":
+        from langchain.llms import AzureOpenAI
+        return AzureOpenAI(deployment_name=deployment_name, api_key=api_key, azure_endpoint=azure_endpoint)
+    raise ValueError(f"Unsupported LLM client kind: {kind}. Use 'completion' or 'chat'")
+
+
+def set_llm_factory(factory: Optional[Callable[[str, str], object]]) -> None:
+    """
+    Replace the client factory and drop cached clients.
+
+    Args:
+        factory: Callable taking (kind, deployment_name) and returning a model
+            with invoke(), or None to restore the Azure OpenAI factory
+    """
+    global _factory
+    with _clients_lock:
+        _factory = factory
+        _clients.clear()
+
+
+def get_llm(deployment_name: str = None, kind: str = None):
+    """
+    Get the cached client for a deployment.
+
+    Args:
+        deployment_name: Deployment to call (defaults to AZURE_OPENAI_DEPLOYMENT)
+        kind: "completion" or "chat" (defaults to AZURE_OPENAI_CLIENT_KIND, else "completion")
+
+    Returns:
+        Shared LangChain model
+    """
+    deployment_name = deployment_name or os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
+    kind = (kind or os.environ.get("AZURE_OPENAI_CLIENT_KIND", "completion")).lower()
+    key = (kind, deployment_name)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = (_factory or create_azure_llm)(kind, deployment_name)
+            _clients[key] = client
+        return client
+
+
+def _text(chunk) -> str:
+    # Chat models return messages, completion models plain strings
+    return getattr(chunk, "content", chunk)
+
+
+def complete(prompt: str, deployment_name: str = None, kind: str = None, on_text: Callable[[str], None] = None) -> str:
+    """
+    Send one prompt and return the response text.
+
+    Args:
+        prompt: Prompt text
+        deployment_name: Deployment to call (defaults to AZURE_OPENAI_DEPLOYMENT)
+        kind: Client kind (defaults to AZURE_OPENAI_CLIENT_KIND)
+        on_text: Optional callback; when given the response is streamed and
+            on_text receives the text received so far after every token
+
+    Returns:
+        Completion text; chat responses are unwrapped from their message
+    """
+    client = get_llm(deployment_name, kind)
+    if on_text is None:
+        return _text(client.invoke(prompt))
+    parts = []
+    for chunk in client.stream(prompt):
+        parts.append(_text(chunk))
+        on_text("".join(parts))
+    return "".join(parts)
+
+
+class FakeLLM:
+    """
+    Local stand-in for a LangChain model.
+
+    Answers with handler(prompt) when a handler is given, otherwise cycles
+    through the scripted responses. Every prompt is recorded.
+    """
+
+    def __init__(self, responses: Iterable[str] = ("",), handler: Callable[[str], str] = None):
+        self._responses = itertools.cycle(list(responses))
+        self._handler = handler
+        self.prompts: list[str] = []
+
+    def invoke(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        if self._handler:
+            return self._handler(prompt)
+        return next(self._responses)
+
+    def stream(self, prompt: str) -> Iterable[str]:
+        """Yield the response a word at a time"""
+        yield from re.findall(r"\S+\s*|\s+", self.invoke(prompt))
+
+    def factory(self, kind: str, deployment_name: str) -> "FakeLLM":
+        return self
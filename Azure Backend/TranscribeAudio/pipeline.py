@@ -0,0 +1,145 @@
+"""
+Small dependency-graph executor for the transcription pipeline.
+Stages declare the stages whose outputs they consume; every stage whose
+inputs are ready runs on a thread pool, so independent work such as
+persisting the original transcript and refining it overlaps. Per-stage
+timings are recorded for each run, and completed stages can be checkpointed
+so a later run resumes after them.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+
+    Args:
+        name: Unique stage name; also the keyword its output is passed under
+        run: Called with one keyword argument per input stage
+        inputs: Names of the stages whose outputs this stage needs
+        checkpoint: Whether the output is checkpointed and restored on resume;
+            must be JSON-serialisable when True
+    """
+    name: str
+    run: Callable[..., object]
+    inputs: tuple[str, ...] = ()
+    checkpoint: bool = True
+
+
+@dataclass
+class PipelineRun:
+    """Outputs and wall-clock seconds of every completed stage, and the stages restored from checkpoints"""
+    outputs: dict = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    restored: list[str] = field(default_factory=list)
+
+
+def _execution_order(stages: list[Stage]) -> list[str]:
+    """Topological order of the stages; raises ValueError for unknown inputs or cycles"""
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for name in stage.inputs:
+            if name not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage: {name}")
+
+    order, done = [], set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if set(stage.inputs) <= done]
+        if not ready:
+            raise ValueError(f"Pipeline stages form a cycle: {[stage.name for stage in remaining]}")
+        for stage in ready:
+            order.append(stage.name)
+            done.add(stage.name)
+        remaining = [stage for stage in remaining if stage.name not in done]
+    return order
+
+
+class Pipeline:
+    """
+    Runs stages as soon as their inputs are available.
+
+    When a stage fails no further stages are started, the stages already
+    running are allowed to finish, and the failed stage's exception is
+    re-raised unchanged so callers can keep handling specific errors.
+
+    Args:
+        stages: Stage declarations
+        workers: Stages running at once (defaults to PIPELINE_WORKERS, else 4)
+    """
+
+    def __init__(self, stages: list[Stage], workers: int = None):
+        self._order = _execution_order(stages)
+        self._stages = {stage.name: stage for stage in stages}
+        self._workers = workers or int(os.environ.get("PIPELINE_WORKERS", "4"))
+
+    @staticmethod
+    def _timed(stage: Stage, inputs: dict) -> tuple[object, float]:
+        start = time.perf_counter()
+        output = stage.run(**inputs)
+        return output, time.perf_counter() - start
+
+    def run(self, checkpoint=None) -> PipelineRun:
+        """
+        Execute every stage.
+
+        Args:
+            checkpoint: Optional JobCheckpoint; checkpointed stages it already
+                holds are not run again, and each newly completed one is saved
+
+        Returns:
+            PipelineRun with each stage's output and duration
+        """
+        result = PipelineRun()
+        pending = list(self._order)
+        running = {}
+        error = None
+
+        if checkpoint is not None:
+            saved = checkpoint.load()
+            for name in list(pending):
+                if self._stages[name].checkpoint and name in saved:
+                    result.outputs[name] = saved[name]
+                    result.restored.append(name)
+                    pending.remove(name)
+            if result.restored:
+                logging.info(f"Resuming after checkpointed stages: {result.restored}")
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name in [name for name in pending if set(self._stages[name].inputs) <= result.outputs.keys()]:
+                        pending.remove(name)
+                        stage = self._stages[name]
+                        inputs = {input_name: result.outputs[input_name] for input_name in stage.inputs}
+                        running[executor.submit(self._timed, stage, inputs)] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result.outputs[name], result.timings[name] = future.result()
+                    except Exception as e:
+                        logging.error(f"Pipeline stage {name} failed: {str(e)}")
+                        if error is None:
+                            error = e
+                        continue
+                    if checkpoint is not None and self._stages[name].checkpoint:
+                        checkpoint.save(name, result.outputs[name])
+
+        if error is not None:
+            raise error
+        return result
@@ -0,0 +1,145 @@
+"""
+Adaptive polling for long-running Azure Speech batch transcription jobs.
+Waits roughly as long as the job is expected to take, then polls with short
+intervals that back off exponentially, honouring Retry-After and a deadline.
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+# Stays below the 10 minute functionTimeout in host.json, leaving time for the
+# rest of the pipeline once the transcript is ready
+DEFAULT_TIMEOUT_SECONDS = 480.0
+
+
+class ThrottledError(Exception):
+    """Raised when a status request is rejected with 429 Too Many Requests"""
+
+    def __init__(self, retry_after: Optional[float]):
+        super().__init__(f"Throttled; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class PollMetrics:
+    """Counters for one polling loop"""
+    polls: int = 0
+    waited_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    retry_after_honoured: int = 0
+    estimated_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {key: round(value, 3) if isinstance(value, float) else value for key, value in asdict(self).items()}
+
+
+class AdaptivePoller:
+    """
+    Decides how long to sleep between status checks.
+
+    The first wait is half the estimated completion time, so short jobs are
+    checked soon and long jobs are not polled pointlessly early; it is not
+    limited by max_interval. Later intervals continue growing from it by
+    backoff, up to max_interval. No wait extends past the deadline, so the
+    last check happens at the deadline.
+    """
+
+    def __init__(
+        self,
+        audio_seconds: Optional[float] = None,
+        initial_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        deadline_seconds: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+        base_latency: float = 10.0,
+        realtime_factor: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.deadline_seconds = deadline_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._started = clock()
+        self._waits = 0
+        self.metrics = PollMetrics(estimated_seconds=base_latency + realtime_factor * (audio_seconds or 0.0))
+
+    @classmethod
+    def from_env(cls, audio_seconds: Optional[float] = None) -> "AdaptivePoller":
+        """
+        Build a poller from TRANSCRIPTION_POLL_INITIAL_SECONDS (default 1),
+        TRANSCRIPTION_POLL_MAX_SECONDS (default 30) and
+        TRANSCRIPTION_TIMEOUT_SECONDS (default 480)
+        """
+        return cls(
+            audio_seconds=audio_seconds,
+            initial_interval=float(os.environ.get("TRANSCRIPTION_POLL_INITIAL_SECONDS", "1")),
+            max_interval=float(os.environ.get("TRANSCRIPTION_POLL_MAX_SECONDS", "30")),
+            deadline_seconds=float(os.environ.get("TRANSCRIPTION_TIMEOUT_SECONDS", str(DEFAULT_TIMEOUT_SECONDS))),
+        )
+
+    def next_delay(self, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the next status check"""
+        first = max(self.metrics.estimated_seconds / 2, self.initial_interval)
+        if self._waits == 0:
+            delay = first
+        else:
+            delay = min(first * self.backoff ** self._waits, max(self.max_interval, self.initial_interval))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def record_poll(self) -> None:
+        self.metrics.polls += 1
+        self.metrics.elapsed_seconds = self._clock() - self._started
+
+    def wait(self, retry_after: Optional[float] = None) -> None:
+        """
+        Sleep until the next status check.
+
+        Raises:
+            TimeoutError: If the deadline has passed
+        """
+        delay = self.next_delay(retry_after)
+        if retry_after is not None and retry_after >= delay:
+            self.metrics.retry_after_honoured += 1
+        if self.deadline_seconds is not None:
+            remaining = self.deadline_seconds - (self._clock() - self._started)
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Transcription did not finish within {self.deadline_seconds:.0f}s "
+                    f"({self.metrics.polls} status checks)"
+                )
+            delay = min(delay, remaining)
+
+        self._sleep(delay)
+        self._waits += 1
+        self.metrics.waited_seconds += delay
+
+    def finish(self) -> PollMetrics:
+        """Record the total elapsed time and log the metrics"""
+        self.metrics.elapsed_seconds = self._clock() - self._started
+        logging.info(f"Transcription polling metrics: {self.metrics.to_dict()}")
+        return self.metrics
@@ -0,0 +1,101 @@
+"""
+Progressive result publishing.
+Each transcript version is published as soon as it is ready (original,
+English, polished, summary), and streamed LLM output is published while it
+is generated, so clients see text long before the pipeline finishes.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+
+# Transcript fields in the order they become available
+PROGRESS_FIELDS = ("original_text", "english_text", "polished_english_text", "summary_text")
+
+
+class ProgressPublisher:
+    """
+    Delivers progress updates to sinks on a background thread.
+
+    Updates reach every sink in the order they were published, without
+    holding up the pipeline. Partial updates of a field are throttled to one
+    per min_interval seconds; final updates are always delivered. Sink errors
+    are logged and never fail the request.
+
+    Each update is a dict with request_id, sequence, field, text, final and
+    timestamp.
+
+    Args:
+        request_id: Identifier shared by every update of one request
+        sinks: Callables receiving each update dict
+        min_interval: Seconds between partial updates of the same field
+        clock: Monotonic clock used for throttling
+    """
+
+    def __init__(self, request_id: str, sinks: list[Callable[[dict], None]], min_interval: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.request_id = request_id
+        self._sinks = list(sinks)
+        self._min_interval = min_interval
+        self._clock = clock
+        self._last_partial: dict[str, float] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _deliver(self, update: dict) -> None:
+        for sink in self._sinks:
+            try:
+                sink(update)
+            except Exception as e:
+                logging.warning(f"Progress update for {update['field']} failed: {str(e)}")
+
+    def _publish(self, field: str, text: str, final: bool) -> None:
+        with self._lock:
+            self._sequence += 1
+            update = {
+                "request_id": self.request_id,
+                "sequence": self._sequence,
+                "field": field,
+                "text": text,
+                "final": final,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+            self._executor.submit(self._deliver, update)
+
+    def partial(self, field: str, text: str) -> None:
+        """Publish text generated so far for a field, unless one was published too recently"""
+        now = self._clock()
+        with self._lock:
+            last = self._last_partial.get(field)
+            if last is not None and now - last < self._min_interval:
+                return
+            self._last_partial[field] = now
+        self._publish(field, text, final=False)
+
+    def complete(self, field: str, text: str) -> None:
+        """Publish the finished text of a field"""
+        self._publish(field, text, final=True)
+
+    def streamer(self, field: str) -> Callable[[str], None]:
+        """Callback publishing partial text of one field"""
+        return lambda text: self.partial(field, text)
+
+    def close(self) -> None:
+        """Wait until every published update has been delivered"""
+        self._executor.shutdown(wait=True)
+
+
+def create_progress_publisher(request_id: str, sinks: list[Callable[[dict], None]]) -> Optional[ProgressPublisher]:
+    """
+    Build a publisher for one request, or None when there is nobody to notify.
+
+    Partial updates are throttled to PROGRESS_MIN_INTERVAL seconds (default 1).
+    """
+    sinks = [sink for sink in sinks if sink]
+    if not sinks:
+        return None
+    return ProgressPublisher(request_id, sinks, min_interval=float(os.environ.get("PROGRESS_MIN_INTERVAL", "1.0")))
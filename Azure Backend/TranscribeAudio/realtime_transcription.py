@@ -0,0 +1,239 @@
+"""
+Low-latency transcription with the Speech SDK's continuous recognition.
+PCM from the converted audio is pushed straight into the recognizer, and
+partial and final phrases are emitted as they arrive instead of waiting for
+the batch REST API's queue.
+"""
+
+import logging
+import os
+import struct
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+import azure.cognitiveservices.speech as speechsdk
+from azure.cognitiveservices.speech import SpeechConfig
+
+# Format of the PCM pushed to the recognizer, matching the converted WAV
+SAMPLE_RATE = 16000
+BITS_PER_SAMPLE = 16
+CHANNELS = 1
+
+
+def iter_wav_pcm(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Strip the RIFF header from a stream of WAV bytes and yield the raw PCM.
+
+    Args:
+        chunks: WAV bytes, e.g. from iter_converted_wav or a file read in chunks
+
+    Yields:
+        PCM sample data
+    """
+    buffer = bytearray()
+    chunk_iter = iter(chunks)
+    offset = 12
+    for chunk in chunk_iter:
+        buffer.extend(chunk)
+        if len(buffer) < 12:
+            continue
+        if buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+            raise ValueError("Stream does not start with a RIFF/WAVE header")
+        # Walk chunks until the data chunk header is buffered
+        while offset + 8 <= len(buffer):
+            chunk_id = bytes(buffer[offset:offset + 4])
+            chunk_size = struct.unpack_from("<I", buffer, offset + 4)[0]
+            if chunk_id == b"data":
+                yield bytes(buffer[offset + 8:])
+                yield from chunk_iter
+                return
+            offset += 8 + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV data chunk not found")
+
+
+def iter_file_chunks(path: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Read a file in fixed-size chunks"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def create_speech_recognizer(locale: str):
+    """
+    Build a Speech SDK recognizer fed from a push stream.
+
+    Args:
+        locale: Recognition locale, e.g. "hi-IN"
+
+    Returns:
+        Tuple of (SpeechRecognizer, PushAudioInputStream)
+    """
+    speech_config = SpeechConfig(
+        subscription=os.environ["AZURE_SPEECH_KEY"],
+        region=os.environ["AZURE_SPEECH_REGION"]
+    )
+    speech_config.speech_recognition_language = locale
+    stream_format = speechsdk.audio.AudioStreamFormat(
+        samples_per_second=SAMPLE_RATE,
+        bits_per_sample=BITS_PER_SAMPLE,
+        channels=CHANNELS
+    )
+    push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+    audio_config = speechsdk.audio.AudioConfig(stream=push_stream)
+    recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+    return recognizer, push_stream
+
+
+def transcribe_realtime(
+    pcm_chunks: Iterable[bytes],
+    locale: str,
+    on_partial: Optional[Callable[[str], None]] = None,
+    on_final: Optional[Callable[[str], None]] = None,
+    recognizer_factory: Callable = create_speech_recognizer,
+    timeout: float = 600.0,
+) -> dict:
+    """
+    Transcribe PCM audio with continuous recognition.
+
+    Args:
+        pcm_chunks: 16 kHz 16-bit mono PCM
+        locale: Recognition locale
+        on_partial: Called with the hypothesis text while a phrase is being recognised
+        on_final: Called with each finished phrase
+        recognizer_factory: Builds (recognizer, push_stream); swap in FakeRecognizer for tests
+        timeout: Seconds to wait for the session to end after the audio is pushed
+
+    Returns:
+        Result dict in the batch transcription shape ({"recognizedPhrases": [...]})
+
+    Raises:
+        Exception: If recognition is cancelled with an error or times out
+    """
+    recognizer, push_stream = recognizer_factory(locale)
+    phrases = []
+    errors = []
+    done = threading.Event()
+
+    def recognizing(evt) -> None:
+        if on_partial and evt.result.text:
+            on_partial(evt.result.text)
+
+    def recognized(evt) -> None:
+        if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech or not evt.result.text:
+            return
+        phrases.append({
+            "offsetInTicks": evt.result.offset,
+            "durationInTicks": evt.result.duration,
+            "nBest": [{"display": evt.result.text}],
+        })
+        if on_final:
+            on_final(evt.result.text)
+
+    def canceled(evt) -> None:
+        if evt.reason == speechsdk.CancellationReason.Error:
+            errors.append(evt.error_details)
+        done.set()
+
+    recognizer.recognizing.connect(recognizing)
+    recognizer.recognized.connect(recognized)
+    recognizer.canceled.connect(canceled)
+    recognizer.session_stopped.connect(lambda evt: done.set())
+
+    recognizer.start_continuous_recognition()
+    try:
+        try:
+            for chunk in pcm_chunks:
+                push_stream.write(chunk)
+        finally:
+            push_stream.close()
+        finished = done.wait(timeout)
+    finally:
+        # Also stops the session when reading the audio failed
+        recognizer.stop_continuous_recognition()
+
+    if errors:
+        raise Exception(f"Real-time transcription failed: {errors[0]}")
+    if not finished:
+        raise Exception(f"Real-time transcription did not finish within {timeout:.0f}s")
+
+    logging.info(f"Real-time transcription recognised {len(phrases)} phrases")
+    return {"recognizedPhrases": phrases}
+
+
+class _FakeSignal:
+    def __init__(self):
+        self._callbacks = []
+
+    def connect(self, callback) -> None:
+        self._callbacks.append(callback)
+
+    def fire(self, evt) -> None:
+        for callback in self._callbacks:
+            callback(evt)
+
+
+class _FakeResult:
+    def __init__(self, text: str, reason, offset: int = 0, duration: int = 0):
+        self.text = text
+        self.reason = reason
+        self.offset = offset
+        self.duration = duration
+
+
+class _FakeEvent:
+    def __init__(self, result=None, reason=None, error_details=""):
+        self.result = result
+        self.reason = reason
+        self.error_details = error_details
+
+
+class FakeRecognizer:
+    """
+    Local stand-in for SpeechRecognizer and its push stream.
+
+    Emits a word-by-word partial for each scripted phrase and then the final
+    phrase once all audio has been pushed. Offsets are spread evenly over the
+    pushed audio.
+    """
+
+    def __init__(self, phrases: list[str], error: str = None):
+        self.phrases = phrases
+        self.error = error
+        self.bytes_received = 0
+        self.stopped = False
+        self.recognizing = _FakeSignal()
+        self.recognized = _FakeSignal()
+        self.canceled = _FakeSignal()
+        self.session_stopped = _FakeSignal()
+
+    def factory(self, locale: str):
+        self.locale = locale
+        return self, self
+
+    def start_continuous_recognition(self) -> None:
+        pass
+
+    def stop_continuous_recognition(self) -> None:
+        self.stopped = True
+
+    def write(self, chunk: bytes) -> None:
+        self.bytes_received += len(chunk)
+
+    def close(self) -> None:
+        if self.error:
+            self.canceled.fire(_FakeEvent(reason=speechsdk.CancellationReason.Error, error_details=self.error))
+            return
+
+        ticks = self.bytes_received * 10_000_000 // (SAMPLE_RATE * BITS_PER_SAMPLE // 8)
+        step = ticks // max(len(self.phrases), 1)
+        for index, text in enumerate(self.phrases):
+            words = text.split()
+            for count in range(1, len(words)):
+                partial = _FakeResult(" ".join(words[:count]), speechsdk.ResultReason.RecognizingSpeech)
+                self.recognizing.fire(_FakeEvent(partial))
+            final = _FakeResult(text, speechsdk.ResultReason.RecognizedSpeech, index * step, step)
+            self.recognized.fire(_FakeEvent(final))
+        self.session_stopped.fire(_FakeEvent())
@@ -0,0 +1,212 @@
+"""
+Content-addressed cache of pipeline stage outputs.
+The transcript is keyed on a SHA-256 of the decoded PCM plus the country and
+transcription settings; every later stage is keyed on its parent's key, its
+own version and parameters. A resubmitted memo reuses every stage, and
+bumping one stage's version only re-runs that stage and the ones after it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from typing import Callable, Iterable, Iterator, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from .realtime_transcription import iter_file_chunks, iter_wav_pcm
+from .storage import get_container_client
+
+# Salt for every key; bump to invalidate the whole cache
+PIPELINE_VERSION = "1"
+
+# Bump a stage's version when its prompt or logic changes
+STAGE_VERSIONS = {
+    "transcribe": "1",
+    "clean": "1",
+    "translate": "1",
+    "polish": "1",
+    "summarize": "1",
+    "refine_english": "1",
+    "refine_translated": "1",
+    "file_id": "2",
+    "save_original": "1",
+    "save": "2",
+}
+
+
+def _sha256(*parts: str) -> str:
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def hash_wav_file(path: str) -> str:
+    """SHA-256 of a WAV file's PCM samples, ignoring header metadata"""
+    digest = hashlib.sha256()
+    for pcm in iter_wav_pcm(iter_file_chunks(path)):
+        digest.update(pcm)
+    return digest.hexdigest()
+
+
+def hash_wav_stream(chunks: Iterable[bytes], digest) -> Iterator[bytes]:
+    """
+    Pass WAV bytes through unchanged while hashing their PCM samples.
+
+    The digest matches hash_wav_file for the same audio once the stream is exhausted.
+
+    Args:
+        chunks: WAV bytes
+        digest: hashlib object updated with the PCM
+    """
+    consumed = []
+
+    def record() -> Iterator[bytes]:
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    for pcm in iter_wav_pcm(record()):
+        digest.update(pcm)
+        yield from consumed
+        consumed.clear()
+    yield from consumed
+
+
+def transcript_key(audio_hash: str, country: str, *params) -> str:
+    """Key of the transcript for one decoded recording"""
+    version = os.environ.get("RESULT_CACHE_VERSION", "")
+    return _sha256(PIPELINE_VERSION, version, "transcribe", STAGE_VERSIONS["transcribe"], audio_hash, country, *map(str, params))
+
+
+def stage_key(parent_key: str, stage: str, *params) -> str:
+    """Key of a stage's output, derived from the key of its input"""
+    return _sha256(parent_key, stage, STAGE_VERSIONS[stage], *map(str, params))
+
+
+class LocalResultCache:
+    """Stores entries as JSON files in a directory"""
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, entry: dict) -> None:
+        tmp_path = os.path.join(self._directory, f".{uuid.uuid4()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+
+
+class BlobResultCache:
+    """Stores entries as JSON blobs under cache/{key}.json"""
+
+    def __init__(self, container_client, prefix: str = "cache/"):
+        self._container = container_client
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            return json.loads(self._container.get_blob_client(f"{self._prefix}{key}.json").download_blob().readall())
+        except ResourceNotFoundError:
+            return None
+
+    def put(self, key: str, entry: dict) -> None:
+        blob_client = self._container.get_blob_client(f"{self._prefix}{key}.json")
+        blob_client.upload_blob(json.dumps(entry, ensure_ascii=False), overwrite=True)
+
+
+class ResultCache:
+    """
+    Front for a cache backend that counts hits and misses.
+
+    Backend errors are logged and treated as misses so the cache can never
+    fail a request.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        try:
+            entry = self._backend.get(key)
+        except Exception as e:
+            logging.warning(f"Result cache read failed: {str(e)}")
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["value"]
+
+    def put(self, key: str, value) -> None:
+        try:
+            self._backend.put(key, {"value": value})
+        except Exception as e:
+            logging.warning(f"Result cache write failed: {str(e)}")
+
+
+def cached_stage(cache: Optional[ResultCache], parent_key: Optional[str], stage: str, compute: Callable[[], object], *params) -> tuple[object, Optional[str]]:
+    """
+    Return a stage's cached output, computing and storing it on a miss.
+
+    Args:
+        cache: Result cache, or None to always compute
+        parent_key: Key of the stage's input, or None if it is not cacheable
+        stage: Stage name from STAGE_VERSIONS
+        compute: Produces the JSON-serialisable stage output
+        *params: Settings that change the output (language, deployment, ...)
+
+    Returns:
+        Tuple of (output, key of the output or None when uncached)
+    """
+    if cache is None or parent_key is None:
+        return compute(), None
+    key = stage_key(parent_key, stage, *params)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.put(key, value)
+    else:
+        logging.info(f"Result cache hit for stage {stage}")
+    return value, key
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the process-wide result cache, or None when caching is off.
+
+    RESULT_CACHE selects "off" (default), "blob" (the transcript container) or
+    "local" (JSON files in RESULT_CACHE_DIR).
+    """
+    global _cache
+    backend = os.environ.get("RESULT_CACHE", "off").lower()
+    if backend == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            if backend == "blob":
+                _cache = ResultCache(BlobResultCache(get_container_client()))
+            elif backend == "local":
+                directory = os.environ.get("RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "transcription-cache"))
+                _cache = ResultCache(LocalResultCache(directory))
+            else:
+                raise ValueError(f"Unsupported RESULT_CACHE: {backend}. Use 'off', 'blob', or 'local'")
+        return _cache
@@ -0,0 +1,178 @@
+"""
+Local SAS link signing for blobs in the transcript container.
+Signing is an HMAC over the blob path, so once the signing key is cached a
+link costs microseconds and never calls the storage account. Keys come either
+from the connection string's account key or from a user delegation key that a
+background timer refreshes well before it expires.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from urllib.parse import quote
+
+from azure.storage.blob import BlobSasPermissions, generate_blob_sas
+
+from .storage import get_blob_service_client, get_container_client
+
+
+class LinkSigner:
+    """
+    Signs read-only SAS URLs for blobs in one container.
+
+    Exactly one of account_key or delegation_key_source must be given. With a
+    delegation key source the key is fetched once up front and then refreshed
+    every refresh_seconds on a daemon timer; links never outlive the key.
+    """
+
+    def __init__(
+        self,
+        account_name: str,
+        container_name: str,
+        container_url: str,
+        account_key: Optional[str] = None,
+        delegation_key_source: Optional[Callable[[datetime, datetime], object]] = None,
+        key_lifetime: timedelta = timedelta(hours=48),
+        refresh_seconds: float = 3600.0,
+    ):
+        if (account_key is None) == (delegation_key_source is None):
+            raise ValueError("Provide either account_key or delegation_key_source")
+        self.account_name = account_name
+        self.container_name = container_name
+        self.container_url = container_url.rstrip("/")
+        self._account_key = account_key
+        self._delegation_key_source = delegation_key_source
+        self._key_lifetime = key_lifetime
+        self._refresh_seconds = refresh_seconds
+        self._delegation_key = None
+        self._key_expiry: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        if delegation_key_source is not None:
+            self.refresh_delegation_key()
+
+    def refresh_delegation_key(self) -> None:
+        """Fetch a new user delegation key and schedule the next refresh"""
+        start = datetime.utcnow() - timedelta(minutes=5)
+        expiry = start + self._key_lifetime
+        try:
+            key = self._delegation_key_source(start, expiry)
+        except Exception as e:
+            if self._delegation_key is None:
+                raise
+            # Keep signing with the current key and try again sooner
+            logging.warning(f"User delegation key refresh failed: {str(e)}")
+            self._schedule_refresh(min(self._refresh_seconds, 60.0))
+            return
+        with self._lock:
+            self._delegation_key = key
+            self._key_expiry = expiry
+        logging.info(f"Refreshed user delegation key valid until {expiry.isoformat()}")
+        self._schedule_refresh(self._refresh_seconds)
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._timer:
+            self._timer.cancel()
+        timer = threading.Timer(delay, self.refresh_delegation_key)
+        timer.daemon = True
+        timer.start()
+        self._timer = timer
+
+    def close(self) -> None:
+        """Stop the refresh timer"""
+        if self._timer:
+            self._timer.cancel()
+
+    def sign(self, blob_name: str, expiry: datetime) -> str:
+        """
+        Build a read-only SAS URL for one blob.
+
+        Args:
+            blob_name: Blob path inside the container
+            expiry: UTC expiry of the link; capped to the delegation key's expiry
+
+        Returns:
+            Blob URL with SAS token
+        """
+        with self._lock:
+            delegation_key = self._delegation_key
+            if self._key_expiry is not None:
+                expiry = min(expiry, self._key_expiry)
+        sas_token = generate_blob_sas(
+            account_name=self.account_name,
+            container_name=self.container_name,
+            blob_name=blob_name,
+            account_key=self._account_key,
+            user_delegation_key=delegation_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=expiry,
+        )
+        return f"{self.container_url}/{quote(blob_name)}?{sas_token}"
+
+    def sign_all(self, blob_names: Iterable[str], expires_in: timedelta) -> dict[str, str]:
+        """
+        Sign several blobs with one shared expiry.
+
+        Args:
+            blob_names: Blob paths inside the container
+            expires_in: Link lifetime
+
+        Returns:
+            Dict mapping each blob name to its SAS URL
+        """
+        expiry = datetime.utcnow() + expires_in
+        return {blob_name: self.sign(blob_name, expiry) for blob_name in blob_names}
+
+
+def _user_delegation_key_source(account_url: str) -> Callable[[datetime, datetime], object]:
+    """Fetch delegation keys with DefaultAzureCredential (needs azure-identity)"""
+    try:
+        from azure.identity import DefaultAzureCredential
+    except ImportError as e:
+        raise Exception("SAS_SIGNING_MODE=user_delegation requires the azure-identity package") from e
+
+    from azure.storage.blob import BlobServiceClient
+
+    service_client = BlobServiceClient(account_url, credential=DefaultAzureCredential())
+    return lambda start, expiry: service_client.get_user_delegation_key(start, expiry)
+
+
+_signer: Optional[LinkSigner] = None
+_signer_lock = threading.Lock()
+
+
+def get_link_signer() -> LinkSigner:
+    """
+    Get the process-wide signer for the transcript container.
+
+    SAS_SIGNING_MODE selects "account_key" (default, the key from
+    AZURE_STORAGE_CONNECTION_STRING) or "user_delegation" (Azure AD, against
+    AZURE_STORAGE_ACCOUNT_URL or the connection string's endpoint), refreshed
+    every SAS_DELEGATION_REFRESH_MINUTES (default 60).
+    """
+    global _signer
+    with _signer_lock:
+        if _signer is None:
+            container_client = get_container_client()
+            mode = os.environ.get("SAS_SIGNING_MODE", "account_key").lower()
+            if mode == "account_key":
+                _signer = LinkSigner(
+                    container_client.account_name,
+                    container_client.container_name,
+                    container_client.url,
+                    account_key=container_client.credential.account_key,
+                )
+            elif mode == "user_delegation":
+                account_url = os.environ.get("AZURE_STORAGE_ACCOUNT_URL", get_blob_service_client().url)
+                _signer = LinkSigner(
+                    container_client.account_name,
+                    container_client.container_name,
+                    container_client.url,
+                    delegation_key_source=_user_delegation_key_source(account_url),
+                    refresh_seconds=float(os.environ.get("SAS_DELEGATION_REFRESH_MINUTES", "60")) * 60,
+                )
+            else:
+                raise ValueError(f"Unsupported SAS_SIGNING_MODE: {mode}. Use 'account_key' or 'user_delegation'")
+        return _signer
@@ -0,0 +1,227 @@
+"""
+Energy-based silence trimming for the converted WAV.
+Long silent stretches are compressed before upload so Azure Speech bills
+fewer seconds, and an offset map translates timestamps in the trimmed audio
+back to the original timeline.
+"""
+
+import bisect
+import copy
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from .wav_audio import read_mono, write_wav
+
+# Azure Speech reports offsets in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+
+@dataclass
+class TrimResult:
+    """Outcome of trimming one file"""
+    original_duration: float
+    trimmed_duration: float
+    # (trimmed_start, original_start, duration) in seconds for every kept region
+    offset_map: list[tuple[float, float, float]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._trimmed_starts = [segment[0] for segment in self.offset_map]
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.original_duration - self.trimmed_duration
+
+    def to_original(self, seconds: float) -> float:
+        """Map a time in the trimmed audio to the original audio"""
+        if not self.offset_map:
+            return seconds
+        index = max(bisect.bisect_right(self._trimmed_starts, seconds) - 1, 0)
+        trimmed_start, original_start, duration = self.offset_map[index]
+        return original_start + min(max(seconds - trimmed_start, 0.0), duration)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrimResult":
+        """Rebuild a TrimResult from to_dict output"""
+        return cls(
+            original_duration=data["original_duration"],
+            trimmed_duration=data["trimmed_duration"],
+            offset_map=[tuple(segment) for segment in data["offset_map"]],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "original_duration": round(self.original_duration, 3),
+            "trimmed_duration": round(self.trimmed_duration, 3),
+            "seconds_saved": round(self.seconds_saved, 3),
+            "offset_map": [[round(value, 3) for value in segment] for segment in self.offset_map],
+        }
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int, frame_ms: int = 30) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames, in dBFS"""
+    frame_length = max(int(sample_rate * frame_ms / 1000), 1)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of runs of True"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 30,
+    min_silence_ms: int = 700,
+    pad_ms: int = 200,
+    margin_db: float = 12.0,
+    floor_db: float = -50.0,
+    ceiling_db: float = -35.0,
+) -> list[tuple[int, int]]:
+    """
+    Find the regions of a recording to keep.
+
+    A frame is voiced when its energy is margin_db above the noise floor
+    (10th percentile of frame energies). The threshold is clamped to
+    [floor_db, ceiling_db] so near-digital silence does not turn hiss into
+    speech and recordings with no pauses are never trimmed. Voiced regions are
+    padded by pad_ms on each side, and silences shorter than min_silence_ms
+    are kept so natural pauses survive.
+
+    Returns:
+        List of (start_sample, end_sample) regions to keep
+    """
+    frame_length = max(int(sample_rate * frame_ms / 1000), 1)
+    energy = frame_energy_db(samples, sample_rate, frame_ms)
+    if len(energy) == 0:
+        return [(0, len(samples))] if len(samples) else []
+
+    threshold = np.clip(np.percentile(energy, 10) + margin_db, floor_db, ceiling_db)
+    voiced = energy > threshold
+
+    # Hangover padding around speech
+    pad_frames = int(np.ceil(pad_ms / frame_ms))
+    if pad_frames and voiced.any():
+        voiced = np.convolve(voiced, np.ones(2 * pad_frames + 1, dtype=bool), mode="same") > 0
+
+    # Keep short pauses
+    min_silence_frames = int(np.ceil(min_silence_ms / frame_ms))
+    silence_starts, silence_ends = _runs(~voiced)
+    for start, end in zip(silence_starts, silence_ends):
+        if end - start < min_silence_frames and start > 0 and end < len(voiced):
+            voiced[start:end] = True
+
+    starts, ends = _runs(voiced)
+    regions = [(int(start * frame_length), int(end * frame_length)) for start, end in zip(starts, ends)]
+    # The partial frame at the end belongs to the last region when it reaches the end
+    if regions and regions[-1][1] == len(energy) * frame_length:
+        regions[-1] = (regions[-1][0], len(samples))
+    return regions
+
+
+def trim_silence(wav_path: str, out_path: str) -> Optional[TrimResult]:
+    """
+    Write a copy of a 16 kHz mono WAV with long silences compressed.
+
+    Audio with no detectable speech is left as it is rather than trimmed to
+    nothing, so Speech still receives the recording.
+
+    Thresholds come from SILENCE_MIN_MS (default 700), SILENCE_PAD_MS
+    (default 200) and SILENCE_MARGIN_DB (default 12).
+
+    Args:
+        wav_path: Converted WAV to trim
+        out_path: Where to write the trimmed WAV (may equal wav_path)
+
+    Returns:
+        TrimResult with the offset map and seconds saved, or None when no
+        speech was detected and out_path holds the untrimmed audio
+    """
+    samples, sample_rate = read_mono(wav_path)
+    regions = detect_speech(
+        samples,
+        sample_rate,
+        min_silence_ms=int(os.environ.get("SILENCE_MIN_MS", "700")),
+        pad_ms=int(os.environ.get("SILENCE_PAD_MS", "200")),
+        margin_db=float(os.environ.get("SILENCE_MARGIN_DB", "12")),
+    )
+
+    if not regions:
+        logging.info("No speech detected; leaving the audio untrimmed")
+        if os.path.abspath(out_path) != os.path.abspath(wav_path):
+            shutil.copyfile(wav_path, out_path)
+        return None
+
+    offset_map = []
+    trimmed_start = 0
+    for start, end in regions:
+        offset_map.append((trimmed_start / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        trimmed_start += end - start
+
+    trimmed = np.concatenate([samples[start:end] for start, end in regions])
+    write_wav(out_path, trimmed, sample_rate)
+
+    result = TrimResult(
+        original_duration=len(samples) / sample_rate,
+        trimmed_duration=len(trimmed) / sample_rate,
+        offset_map=offset_map,
+    )
+    logging.info(
+        f"Silence trimming saved {result.seconds_saved:.1f}s "
+        f"({result.original_duration:.1f}s -> {result.trimmed_duration:.1f}s)"
+    )
+    return result
+
+
+def iso_duration(seconds: float) -> str:
+    """Format seconds the way Azure Speech reports offsets, e.g. PT1.25S"""
+    return f"PT{seconds:.2f}S"
+
+
+def _remap_timed(item: dict, trim: TrimResult) -> None:
+    """Rewrite one phrase or word's offset and duration onto the original timeline"""
+    if "offsetInTicks" not in item:
+        return
+    start = item["offsetInTicks"] / TICKS_PER_SECOND
+    end = start + item.get("durationInTicks", 0) / TICKS_PER_SECOND
+    original_start = trim.to_original(start)
+    original_end = max(trim.to_original(end), original_start)
+
+    item["offsetInTicks"] = round(original_start * TICKS_PER_SECOND)
+    item["durationInTicks"] = round((original_end - original_start) * TICKS_PER_SECOND)
+    if "offset" in item:
+        item["offset"] = iso_duration(original_start)
+    if "duration" in item:
+        item["duration"] = iso_duration(original_end - original_start)
+
+
+def remap_transcription_result(result: dict, trim: TrimResult) -> dict:
+    """
+    Map phrase and word timestamps of a batch transcription result made on
+    trimmed audio back to the original recording.
+
+    Args:
+        result: Azure Speech batch transcription result
+        trim: TrimResult from trimming the audio that was transcribed
+
+    Returns:
+        A copy of the result with original-timeline timestamps
+    """
+    remapped = copy.deepcopy(result)
+    for phrase in remapped.get("recognizedPhrases", []):
+        _remap_timed(phrase, trim)
+        for candidate in phrase.get("nBest", []):
+            for word in candidate.get("words", []):
+                _remap_timed(word, trim)
+    return remapped
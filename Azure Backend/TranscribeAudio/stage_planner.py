@@ -0,0 +1,57 @@
+"""
+Per-request stage planning.
+Derives the minimal set of refinement stages from the language configuration
+and the transcript: translation is skipped when source and target languages
+match, and the LLM passes are skipped for trivially short transcripts.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from .language_config import LanguageConfig
+
+REFINEMENT_STAGES = ("clean", "translate", "polish", "summarize")
+
+
+@dataclass
+class StagePlan:
+    """Which refinement stages to run, with the reason each skipped stage was dropped"""
+    stages: list[str]
+    skipped: dict[str, str] = field(default_factory=dict)
+
+    def runs(self, stage: str) -> bool:
+        return stage in self.stages
+
+
+def get_llm_min_chars() -> int:
+    """Transcripts shorter than this (ignoring whitespace) skip the LLM passes; LLM_MIN_CHARS, default 20"""
+    return int(os.environ.get("LLM_MIN_CHARS", "20"))
+
+
+def plan_stages(lang_config: LanguageConfig, text: str, llm_min_chars: int = None) -> StagePlan:
+    """
+    Plan the refinement stages for one transcript.
+
+    Args:
+        lang_config: Language configuration of the source country
+        text: Original transcript
+        llm_min_chars: Minimum length for the LLM passes (defaults to LLM_MIN_CHARS)
+
+    Returns:
+        StagePlan listing the stages to run in order
+    """
+    llm_min_chars = get_llm_min_chars() if llm_min_chars is None else llm_min_chars
+    skipped = {}
+
+    if not text.strip():
+        skipped = {stage: "empty transcript" for stage in REFINEMENT_STAGES}
+        return StagePlan([], skipped)
+
+    if lang_config.translate_from == lang_config.translate_to:
+        skipped["translate"] = f"source language is already {lang_config.translate_to}"
+
+    if len("".join(text.split())) < llm_min_chars:
+        for stage in ("clean", "polish", "summarize"):
+            skipped[stage] = f"transcript shorter than {llm_min_chars} characters"
+
+    return StagePlan([stage for stage in REFINEMENT_STAGES if stage not in skipped], skipped)
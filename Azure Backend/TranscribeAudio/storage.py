@@ -0,0 +1,56 @@
+"""
+Process-wide Azure Blob Storage clients.
+Parsing the connection string and building a client pipeline once per worker
+lets warm invocations reuse the same pooled connections to storage.
+"""
+
+import os
+import threading
+
+from azure.storage.blob import BlobServiceClient, ContainerClient
+
+_service_clients: dict[str, BlobServiceClient] = {}
+_container_clients: dict[tuple[str, str], ContainerClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_blob_service_client(connect_str: str = None) -> BlobServiceClient:
+    """
+    Get the cached BlobServiceClient for a connection string.
+
+    Args:
+        connect_str: Storage connection string (defaults to AZURE_STORAGE_CONNECTION_STRING)
+
+    Returns:
+        Shared BlobServiceClient
+    """
+    connect_str = connect_str or os.environ["AZURE_STORAGE_CONNECTION_STRING"]
+    with _clients_lock:
+        client = _service_clients.get(connect_str)
+        if client is None:
+            client = BlobServiceClient.from_connection_string(connect_str)
+            _service_clients[connect_str] = client
+        return client
+
+
+def get_container_client(connect_str: str = None, container_name: str = None) -> ContainerClient:
+    """
+    Get the cached ContainerClient for the transcript container.
+
+    Args:
+        connect_str: Storage connection string (defaults to AZURE_STORAGE_CONNECTION_STRING)
+        container_name: Container name (defaults to AZURE_STORAGE_CONTAINER)
+
+    Returns:
+        Shared ContainerClient built on the shared service client
+    """
+    connect_str = connect_str or os.environ["AZURE_STORAGE_CONNECTION_STRING"]
+    container_name = container_name or os.environ["AZURE_STORAGE_CONTAINER"]
+    key = (connect_str, container_name)
+    with _clients_lock:
+        client = _container_clients.get(key)
+        if client is not None:
+            return client
+    service_client = get_blob_service_client(connect_str)
+    with _clients_lock:
+        return _container_clients.setdefault(key, service_client.get_container_client(container_name))
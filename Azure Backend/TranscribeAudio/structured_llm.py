@@ -0,0 +1,87 @@
+"""
+Structured single-call LLM refinement.
+Instead of separate clean, polish and summarize round-trips, one prompt asks
+the model for a JSON object holding every output at once. Responses are
+validated against the expected fields so callers can fall back to the
+sequential prompts when the model does not return usable JSON.
+"""
+
+import json
+from typing import Callable
+
+LLM_PIPELINE_MODES = ("sequential", "structured")
+
+# Fields returned for an English source: cleaned, polished and summarized in one call
+ENGLISH_FIELDS = ("cleaned_text", "polished_text", "summary")
+# Fields returned after translation: polished and summarized in one call
+TRANSLATED_FIELDS = ("polished_text", "summary")
+
+
+class StructuredResponseError(ValueError):
+    """Raised when a structured LLM response does not match the expected schema"""
+
+
+def build_english_prompt(text: str) -> str:
+    """Prompt for cleaning, polishing and summarizing an English transcript in one call"""
+    return (
+        "You are given a raw English voice memo transcription. Return a JSON object with exactly these keys:\n"
+        '- "cleaned_text": the transcription with filler words and repeated words removed and grammar and punctuation fixed\n'
+        '- "polished_text": the cleaned text polished for clarity, grammar, and natural flow\n'
+        '- "summary": a 2-3 sentence summary of the polished text, highlighting the main points and any action items\n'
+        "Output only the JSON object.\n\n"
+        f"Transcription:\n{text}\n\nJSON:"
+    )
+
+
+def build_translated_prompt(text: str) -> str:
+    """Prompt for polishing and summarizing a translated English transcript in one call"""
+    return (
+        "You are given an English translation of a voice memo. Return a JSON object with exactly these keys:\n"
+        '- "polished_text": the text polished for clarity, grammar, and natural flow\n'
+        '- "summary": a 2-3 sentence summary of the polished text, highlighting the main points and any action items\n'
+        "Output only the JSON object.\n\n"
+        f"Text:\n{text}\n\nJSON:"
+    )
+
+
+def parse_structured_response(raw: str, fields: tuple[str, ...]) -> dict:
+    """
+    Extract and validate the JSON object in an LLM response.
+
+    Markdown code fences and text around the object are ignored.
+
+    Args:
+        raw: Model output
+        fields: Keys that must be present with string values
+
+    Returns:
+        Dict with exactly the requested fields, whitespace-stripped
+
+    Raises:
+        StructuredResponseError: If no JSON object is found or a field is missing or not a string
+    """
+    start = raw.find("{")
+    end = raw.rfind("}")
+    if start == -1 or end < start:
+        raise StructuredResponseError("No JSON object in LLM response")
+    try:
+        data = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise StructuredResponseError(f"Invalid JSON in LLM response: {str(e)}")
+    if not isinstance(data, dict):
+        raise StructuredResponseError("LLM response is not a JSON object")
+
+    missing = [field for field in fields if not isinstance(data.get(field), str)]
+    if missing:
+        raise StructuredResponseError(f"LLM response is missing string fields: {', '.join(missing)}")
+    return {field: data[field].strip() for field in fields}
+
+
+def refine_english(text: str, llm: Callable[[str], str]) -> dict:
+    """Clean, polish and summarize an English transcript with one LLM call"""
+    return parse_structured_response(llm(build_english_prompt(text)), ENGLISH_FIELDS)
+
+
+def refine_translated(text: str, llm: Callable[[str], str]) -> dict:
+    """Polish and summarize a translated transcript with one LLM call"""
+    return parse_structured_response(llm(build_translated_prompt(text)), TRANSLATED_FIELDS)
@@ -0,0 +1,143 @@
+"""
+Tests for streamed WAV uploads.
+Run with: python -m pytest test_audio_stream.py
+"""
+
+import io
+import struct
+import wave
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio.audio_stream import IngestError, patch_wav_header, stage_wav_stream
+
+
+class FakeBlobClient:
+    """Records staged blocks and assembles them on commit"""
+
+    blob_name = "audio/test.wav"
+
+    def __init__(self):
+        self.blocks = {}
+        self.data = None
+
+    def stage_block(self, block_id, data):
+        self.blocks[block_id] = data
+
+    def commit_block_list(self, block_ids):
+        self.data = b"".join(self.blocks[block_id] for block_id in block_ids)
+
+
+def piped_wav(num_frames: int) -> bytes:
+    """Build a WAV stream the way ffmpeg writes it to a pipe, with unknown sizes"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x01\x00" * num_frames)
+    data = bytearray(buffer.getvalue())
+    struct.pack_into("<I", data, 4, 0xFFFFFFFF)
+    struct.pack_into("<I", data, 40, 0xFFFFFFFF)
+    return bytes(data)
+
+
+def test_patch_wav_header_sets_sizes():
+    stream = piped_wav(100)
+    patched = patch_wav_header(stream[:44], len(stream))
+    assert struct.unpack_from("<I", patched, 4)[0] == len(stream) - 8
+    assert struct.unpack_from("<I", patched, 40)[0] == 200
+
+
+def test_stage_wav_stream_produces_valid_wav():
+    """Blocks are committed in order and the held-back header is patched"""
+    stream = piped_wav(16000)
+    chunks = [stream[i:i + 1000] for i in range(0, len(stream), 1000)]
+    blob_client = FakeBlobClient()
+
+    total = stage_wav_stream(blob_client, chunks, block_size=4096)
+
+    assert total == len(stream)
+    assert len(blob_client.blocks) > 1
+    with wave.open(io.BytesIO(blob_client.data)) as wav:
+        assert wav.getnframes() == 16000
+        assert wav.getframerate() == 16000
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    """Stream mode with the download and ffmpeg replaced by an in-memory WAV"""
+    monkeypatch.setenv("INGEST_MODE", "stream")
+    monkeypatch.setattr(TranscribeAudio, "resolve_ffmpeg_path", lambda: "ffmpeg")
+    monkeypatch.setattr(TranscribeAudio, "iter_converted_wav", lambda file_url, ffmpeg_path: iter([piped_wav(160)]))
+    monkeypatch.setattr(TranscribeAudio, "get_result_cache", lambda: None)
+
+
+def test_upload_error_is_not_retried_as_buffered(streaming, monkeypatch):
+    """Only conversion failures fall back; other errors would transcribe the memo twice"""
+    def failing_upload(chunks):
+        list(chunks)
+        raise RuntimeError("storage unavailable")
+
+    def unexpected_download(file_url, path):
+        raise AssertionError("fell back to the buffered download")
+
+    monkeypatch.setattr(TranscribeAudio, "upload_wav_stream", failing_upload)
+    monkeypatch.setattr(TranscribeAudio, "download_to_file", unexpected_download)
+
+    with pytest.raises(RuntimeError, match="storage unavailable"):
+        TranscribeAudio.transcribe_source("https://example.com/memo.mp4", "India", lambda stage: None)
+
+
+def test_conversion_error_falls_back_to_buffered(streaming, monkeypatch):
+    def failing_conversion(file_url, ffmpeg_path):
+        raise IngestError("moov atom not found")
+        yield
+
+    def buffered_download(file_url, path):
+        raise RuntimeError("buffered download")
+
+    monkeypatch.setattr(TranscribeAudio, "iter_converted_wav", failing_conversion)
+    monkeypatch.setattr(TranscribeAudio, "upload_wav_stream", lambda chunks: list(chunks))
+    monkeypatch.setattr(TranscribeAudio, "download_to_file", buffered_download)
+
+    with pytest.raises(RuntimeError, match="buffered download"):
+        TranscribeAudio.transcribe_source("https://example.com/memo.mp4", "India", lambda stage: None)
+
+
+def test_realtime_phrases_are_reported_as_they_arrive(streaming, monkeypatch):
+    def fake_realtime(pcm_chunks, locale, on_partial=None, on_final=None):
+        list(pcm_chunks)
+        on_partial("hello")
+        on_final("hello there")
+        on_partial("second")
+        on_final("second phrase")
+        return {"recognizedPhrases": [{"nBest": [{"display": "hello there"}]}, {"nBest": [{"display": "second phrase"}]}]}
+
+    monkeypatch.setattr(TranscribeAudio, "transcribe_realtime", fake_realtime)
+    texts = []
+
+    original_text, _, _ = TranscribeAudio.transcribe_source(
+        "https://example.com/memo.mp4", "India", lambda stage: None, mode="realtime", on_text=texts.append
+    )
+
+    assert texts == ["hello", "hello there", "hello there second", "hello there second phrase"]
+    assert original_text == "hello there second phrase"
+
+
+def test_realtime_ingest_error_after_recognition_started_is_raised(streaming, monkeypatch):
+    """Falling back would recognise the audio already pushed a second time"""
+    def failing_realtime(pcm_chunks, locale, on_partial=None, on_final=None):
+        next(iter(pcm_chunks))
+        on_final("hello attempt")
+        raise IngestError("ffmpeg exited")
+
+    def unexpected_download(file_url, path):
+        raise AssertionError("fell back to the buffered download")
+
+    monkeypatch.setattr(TranscribeAudio, "transcribe_realtime", failing_realtime)
+    monkeypatch.setattr(TranscribeAudio, "download_to_file", unexpected_download)
+
+    with pytest.raises(IngestError):
+        TranscribeAudio.transcribe_source("https://example.com/memo.mp4", "India", lambda stage: None, mode="realtime")
@@ -0,0 +1,319 @@
+"""
+Tests for the Bubble webhook outbox and dispatcher.
+Run with: python -m pytest test_bubble_outbox.py
+"""
+
+import threading
+import time
+
+import pytest
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+import TranscribeAudio
+from TranscribeAudio.bubble_outbox import (
+    DELIVERY_DEAD, DELIVERY_DELIVERED, DELIVERY_PENDING, BatchEnvelope, BlobOutboxStore, BubbleDispatcher,
+    SQLiteOutboxStore, new_delivery
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = f"status {status_code}"
+
+
+class FakeEndpoint:
+    """Answers with scripted status codes and records every request"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.requests.append((url, json, headers))
+        status = self.statuses.pop(0) if self.statuses else 200
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(*status) if isinstance(status, tuple) else FakeResponse(status)
+
+
+class FakeBlob:
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+
+    def upload_blob(self, data, overwrite=False):
+        if not overwrite and self.name in self.container.blobs:
+            raise ResourceExistsError("exists")
+        self.container.blobs[self.name] = data
+
+    def download_blob(self):
+        if self.name not in self.container.blobs:
+            raise ResourceNotFoundError("missing")
+        self.container.downloads.append(self.name)
+        data = self.container.blobs[self.name]
+        return type("Download", (), {"readall": lambda _: data})()
+
+
+class FakeContainer:
+    """In-memory container that lists blobs in name order, as Azure does"""
+
+    def __init__(self):
+        self.blobs = {}
+        self.downloads = []
+
+    def get_blob_client(self, name):
+        return FakeBlob(self, name)
+
+    def delete_blob(self, name):
+        if self.blobs.pop(name, None) is None:
+            raise ResourceNotFoundError("missing")
+
+    def list_blobs(self, name_starts_with=""):
+        return [FakeBlob(self, name) for name in sorted(self.blobs) if name.startswith(name_starts_with)]
+
+
+@pytest.fixture(params=["sqlite", "blob"])
+def outbox_store(request):
+    return SQLiteOutboxStore() if request.param == "sqlite" else BlobOutboxStore(FakeContainer())
+
+
+def dispatcher(store, endpoint, now, **kwargs):
+    return BubbleDispatcher(store, post=endpoint.post, clock=lambda: now[0], jitter=lambda a, b: b, **kwargs)
+
+
+def test_delivery_sends_idempotency_key():
+    store, endpoint, now = SQLiteOutboxStore(), FakeEndpoint(200), [100.0]
+    store.add(new_delivery("https://bubble/hook", {"file_id": "f1"}, "f1-abc", now=now[0]))
+
+    assert dispatcher(store, endpoint, now).dispatch_due() == {DELIVERY_DELIVERED: 1, DELIVERY_PENDING: 0, DELIVERY_DEAD: 0}
+    assert endpoint.requests[0][2]["Idempotency-Key"] == "f1-abc"
+    assert store.get("f1-abc")["status"] == DELIVERY_DELIVERED
+
+
+def test_duplicate_delivery_recorded_once(outbox_store):
+    assert outbox_store.add(new_delivery("https://bubble/hook", {}, "f1-abc"))
+    assert not outbox_store.add(new_delivery("https://bubble/hook", {}, "f1-abc"))
+
+
+def test_delivered_key_is_not_recorded_again(outbox_store):
+    now = [100.0]
+    outbox_store.add(new_delivery("https://bubble/hook", {}, "f1-abc", now=now[0]))
+    dispatcher(outbox_store, FakeEndpoint(200), now).dispatch_due()
+
+    assert not outbox_store.add(new_delivery("https://bubble/hook", {}, "f1-abc", now=now[0]))
+    assert outbox_store.get("f1-abc")["status"] == DELIVERY_DELIVERED
+    assert outbox_store.due(now[0] + 1000, 10) == []
+
+
+def test_due_returns_only_due_records_in_order(outbox_store):
+    for key, at in (("late", 300.0), ("second", 150.0), ("first", 100.0), ("third", 200.0)):
+        outbox_store.add(new_delivery("https://bubble/hook", {}, key, now=at))
+
+    assert [record["delivery_id"] for record in outbox_store.due(200.0, 10)] == ["first", "second", "third"]
+    assert [record["delivery_id"] for record in outbox_store.due(200.0, 2)] == ["first", "second"]
+
+
+def test_blob_due_skips_records_that_are_not_due():
+    container = FakeContainer()
+    store = BlobOutboxStore(container)
+    for i in range(20):
+        store.add(new_delivery("https://bubble/hook", {}, f"later-{i}", now=500.0 + i))
+    store.add(new_delivery("https://bubble/hook", {}, "now", now=100.0))
+
+    container.downloads.clear()
+    assert [record["delivery_id"] for record in store.due(100.0, 10)] == ["now"]
+    assert container.downloads == ["outbox/records/now.json"]
+
+
+def test_blob_save_moves_the_due_marker():
+    container = FakeContainer()
+    store = BlobOutboxStore(container)
+    record = new_delivery("https://bubble/hook", {}, "f1", now=100.0)
+    store.add(record)
+    store.save({**record, "next_attempt_at": 250.0})
+
+    assert store.due(200.0, 10) == []
+    assert [name for name in container.blobs if "/due/" in name] == ["outbox/due/000000000250000-f1"]
+    store.save({**record, "status": DELIVERY_DEAD})
+    assert not [name for name in container.blobs if "/due/" in name]
+    assert store.dead_letters()[0]["delivery_id"] == "f1"
+
+
+def test_failures_back_off_then_dead_letter(outbox_store):
+    store, now = outbox_store, [100.0]
+    endpoint = FakeEndpoint(503, ConnectionError("reset"), (429, {"Retry-After": "7"}))
+    store.add(new_delivery("https://bubble/hook", {}, "f1", now=now[0]))
+    worker = dispatcher(store, endpoint, now, max_attempts=3, base_delay=2)
+
+    worker.dispatch_due()
+    record = store.get("f1")
+    assert record["status"] == DELIVERY_PENDING
+    assert record["next_attempt_at"] == 104.0  # jitter upper bound of 2 * 2**1
+
+    assert worker.dispatch_due()[DELIVERY_PENDING] == 0  # not due yet
+    now[0] = 104.0
+    worker.dispatch_due()
+    assert store.get("f1")["next_attempt_at"] == 112.0
+
+    now[0] = 112.0
+    worker.dispatch_due()
+    assert store.get("f1")["status"] == DELIVERY_DEAD
+    assert store.dead_letters()[0]["attempts"] == 3
+
+
+def test_client_errors_dead_letter_immediately():
+    store, endpoint, now = SQLiteOutboxStore(), FakeEndpoint(400), [0.0]
+    store.add(new_delivery("https://bubble/hook", {}, "f1", now=0.0))
+    dispatcher(store, endpoint, now).dispatch_due()
+    assert store.get("f1")["status"] == DELIVERY_DEAD
+
+
+def test_concurrency_limited_per_endpoint():
+    store, now = SQLiteOutboxStore(), [0.0]
+    active, peak = {}, {}
+    lock = threading.Lock()
+
+    def post(url, json=None, headers=None, timeout=None):
+        with lock:
+            active[url] = active.get(url, 0) + 1
+            peak[url] = max(peak.get(url, 0), active[url])
+        time.sleep(0.02)
+        with lock:
+            active[url] -= 1
+        return FakeResponse(200)
+
+    for i in range(6):
+        store.add(new_delivery("https://bubble/a", {}, f"a{i}", now=0.0))
+        store.add(new_delivery("https://bubble/b", {}, f"b{i}", now=0.0))
+    worker = BubbleDispatcher(store, endpoint_concurrency=2, post=post, clock=lambda: now[0])
+
+    assert worker.dispatch_due(workers=12)[DELIVERY_DELIVERED] == 12
+    assert peak == {"https://bubble/a": 2, "https://bubble/b": 2}
+
+
+def test_notify_bubble_records_delivery_and_returns(monkeypatch):
+    store = SQLiteOutboxStore()
+    monkeypatch.setattr(TranscribeAudio, "get_outbox_store", lambda: store)
+    monkeypatch.setattr(TranscribeAudio, "send_to_bubble", lambda *args, **kwargs: pytest.fail("posted inline"))
+    monkeypatch.setenv("BUBBLE_WEBHOOK_URL", "https://bubble/hook")
+    monkeypatch.delenv("BUBBLE_DELIVERY", raising=False)
+    monkeypatch.delenv("BUBBLE_DISPATCH", raising=False)
+
+    assert TranscribeAudio.notify_bubble("f1", "https://blob/f1", "polished", "summary", request_id="r1")
+    (record,) = store.due(time.time() + 1, 10)
+    assert record["delivery_id"].startswith("f1-")
+    assert record["payload"]["polished_text"] == "polished"
+    assert record["payload"]["request_id"] == "r1"
+
+
+class BatchEndpoint:
+    """Bulk endpoint answering with per-item results"""
+
+    def __init__(self, status=200, reject=()):
+        self.status = status
+        self.reject = set(reject)
+        self.requests = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.requests.append(json)
+        response = FakeResponse(self.status)
+        items = json.get("memos", [])
+        response.json = lambda: {"acks": [
+            {"key": item["key"], "status": 422 if item["key"] in self.reject else "ok", "error": "bad"}
+            for item in items
+        ]}
+        return response
+
+
+def batch_dispatcher(store, endpoint, now, **kwargs):
+    envelope = BatchEnvelope(items_key="memos", id_key="key", results_key="acks", extra={"source": "onow"})
+    return BubbleDispatcher(store, batch=envelope, post=endpoint.post, clock=lambda: now[0], jitter=lambda a, b: b, **kwargs)
+
+
+def test_batches_coalesce_with_per_item_acks():
+    store, endpoint, now = SQLiteOutboxStore(), BatchEndpoint(reject={"f2"}), [10.0]
+    for i in range(5):
+        store.add(new_delivery("https://bubble/bulk", {"file_id": f"f{i}"}, f"f{i}", now=10.0))
+    worker = batch_dispatcher(store, endpoint, now, batch_size=3, batch_window=5)
+
+    # The full batch goes out at once; the partial one waits for the window
+    assert worker.dispatch_due() == {DELIVERY_DELIVERED: 2, DELIVERY_PENDING: 0, DELIVERY_DEAD: 1}
+    assert endpoint.requests[0]["source"] == "onow"
+    assert [item["key"] for item in endpoint.requests[0]["memos"]] == ["f0", "f1", "f2"]
+    assert store.get("f2")["status"] == DELIVERY_DEAD
+
+    now[0] = 15.0
+    assert worker.dispatch_due()[DELIVERY_DELIVERED] == 2
+    assert len(endpoint.requests) == 2
+
+
+def test_rejected_batches_fall_back_to_single_sends():
+    store, now = SQLiteOutboxStore(), [0.0]
+    requests = []
+
+    def post(url, json=None, headers=None, timeout=None):
+        requests.append(json)
+        return FakeResponse(404 if "memos" in json else 200)
+
+    for i in range(3):
+        store.add(new_delivery("https://bubble/hook", {"file_id": f"f{i}"}, f"f{i}", now=0.0))
+    envelope = BatchEnvelope(items_key="memos", id_key="key")
+    worker = BubbleDispatcher(store, batch=envelope, batch_window=0, post=post, clock=lambda: now[0])
+
+    assert worker.dispatch_due()[DELIVERY_DELIVERED] == 3
+    assert [record["attempts"] for record in map(store.get, ["f0", "f1", "f2"])] == [1, 1, 1]
+    # Later passes skip the batch attempt for this endpoint
+    store.add(new_delivery("https://bubble/hook", {"file_id": "f3"}, "f3", now=0.0))
+    requests.clear()
+    worker.dispatch_due()
+    assert requests == [{"file_id": "f3"}]
+
+
+def test_failed_batch_retries_every_item():
+    store, endpoint, now = SQLiteOutboxStore(), BatchEndpoint(status=503), [0.0]
+    for i in range(2):
+        store.add(new_delivery("https://bubble/bulk", {}, f"f{i}", now=0.0))
+    batch_dispatcher(store, endpoint, now, batch_window=0).dispatch_due()
+    assert [store.get(f"f{i}")["status"] for i in range(2)] == [DELIVERY_PENDING, DELIVERY_PENDING]
+
+
+def test_invalid_batch_is_split_without_disabling_batching():
+    """One malformed item must not switch the endpoint to single sends for good"""
+    store, now = SQLiteOutboxStore(), [0.0]
+    requests = []
+
+    def post(url, json=None, headers=None, timeout=None):
+        requests.append(json)
+        if "memos" in json:
+            return FakeResponse(422)
+        return FakeResponse(422 if json["file_id"] == "bad" else 200)
+
+    for file_id in ("f0", "bad", "f1"):
+        store.add(new_delivery("https://bubble/hook", {"file_id": file_id}, file_id, now=0.0))
+    envelope = BatchEnvelope(items_key="memos", id_key="key")
+    worker = BubbleDispatcher(store, batch=envelope, batch_window=0, post=post, clock=lambda: now[0])
+
+    assert worker.dispatch_due() == {DELIVERY_DELIVERED: 2, DELIVERY_PENDING: 0, DELIVERY_DEAD: 1}
+    store.add(new_delivery("https://bubble/hook", {"file_id": "f2"}, "f2", now=0.0))
+    requests.clear()
+    worker.dispatch_due()
+    assert "memos" in requests[0]
+
+
+def test_malformed_acknowledgements_are_retried():
+    """Non-dict result entries count as missing instead of crashing the pass"""
+    store, now = SQLiteOutboxStore(), [0.0]
+
+    def post(url, json=None, headers=None, timeout=None):
+        response = FakeResponse(200)
+        response.json = lambda: {"results": ["ok", {"idempotency_key": "f1", "status": "ok"}, {"idempotency_key": ["f0"]}]}
+        return response
+
+    for i in range(2):
+        store.add(new_delivery("https://bubble/bulk", {}, f"f{i}", now=0.0))
+    worker = BubbleDispatcher(store, batch=BatchEnvelope(), batch_window=0, post=post, clock=lambda: now[0], jitter=lambda a, b: b)
+
+    assert worker.dispatch_due() == {DELIVERY_DELIVERED: 1, DELIVERY_PENDING: 1, DELIVERY_DEAD: 0}
+    assert store.get("f0")["last_error"].endswith("missing from batch results")
@@ -0,0 +1,121 @@
+"""
+Tests for durable pipeline checkpoints and job resumption.
+Run with: python -m pytest test_checkpoints.py
+"""
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio import checkpoints
+from TranscribeAudio.checkpoints import JobCheckpoint, LocalCheckpointStore
+from TranscribeAudio.jobs import JOB_FAILED, JOB_RETRYING, SQLiteJobStore, enqueue_job, run_job
+from TranscribeAudio.pipeline import Pipeline, Stage
+
+
+def test_local_store_round_trip(tmp_path):
+    store = LocalCheckpointStore(str(tmp_path))
+    store.save("job", "transcribe", {"text": "नमस्ते"})
+    store.save("job", "refine", ["a", "b"])
+    assert store.load("job") == {"transcribe": {"text": "नमस्ते"}, "refine": ["a", "b"]}
+    assert store.load("other") == {}
+    store.clear("job")
+    assert store.load("job") == {}
+
+
+def test_pipeline_resumes_after_checkpointed_stages(tmp_path):
+    checkpoint = JobCheckpoint(LocalCheckpointStore(str(tmp_path)), "job")
+    calls = []
+
+    def stages(fail):
+        def second(first):
+            calls.append("second")
+            if fail:
+                raise TimeoutError("LLM timed out")
+            return first + 1
+
+        return [
+            Stage("first", lambda: calls.append("first") or 1),
+            Stage("second", second, ("first",)),
+            Stage("volatile", lambda first: calls.append("volatile") or first, ("first",), checkpoint=False),
+        ]
+
+    with pytest.raises(TimeoutError):
+        Pipeline(stages(fail=True), workers=1).run(checkpoint)
+    calls.clear()
+
+    run = Pipeline(stages(fail=False)).run(checkpoint)
+    assert run.outputs == {"first": 1, "second": 2, "volatile": 1}
+    assert run.restored == ["first"]
+    assert sorted(calls) == ["second", "volatile"]
+
+
+def test_retried_job_skips_transcription(monkeypatch, tmp_path):
+    monkeypatch.setenv("CHECKPOINT_STORE", "local")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(checkpoints, "_store", None)
+    monkeypatch.setattr(TranscribeAudio, "get_result_cache", lambda: None)
+    transcriptions, refine_failures = [], [TimeoutError("LLM timed out")]
+
+    def transcribe(*args, **kwargs):
+        transcriptions.append(1)
+        return "namaste", None, None
+
+    def refine(*args, **kwargs):
+        if refine_failures:
+            raise refine_failures.pop()
+        return "clean", "english", "polished", "summary"
+
+    monkeypatch.setattr(TranscribeAudio, "transcribe_source", transcribe)
+    monkeypatch.setattr(TranscribeAudio, "refine_transcript", refine)
+    monkeypatch.setattr(TranscribeAudio, "save_original_transcript", lambda *args: None)
+    monkeypatch.setattr(TranscribeAudio, "save_transcript_to_blob", lambda *args, **kwargs: None)
+    monkeypatch.setattr(TranscribeAudio, "generate_transcript_links", lambda file_id: {"polished": "https://blob"})
+    monkeypatch.setattr(TranscribeAudio, "notify_bubble", lambda *args, **kwargs: True)
+
+    store = SQLiteJobStore()
+    sent = []
+    job_id = enqueue_job(store, {"file_url": "https://example.com/a.mp4", "country": "India"}, sent.append)["job_id"]
+
+    with pytest.raises(TimeoutError):
+        run_job(sent[0], store, TranscribeAudio.process_transcription, attempt=1, max_attempts=3)
+    assert store.get(job_id)["status"] == JOB_RETRYING
+
+    job = run_job(sent[0], store, TranscribeAudio.process_transcription, attempt=2, max_attempts=3)
+    assert job["result"]["polished_english_text"] == "polished"
+    assert "transcribe" in job["result"]["resumed_stages"]
+    assert transcriptions == [1]
+    assert not (tmp_path / job_id).exists()
+
+
+def test_last_attempt_marks_job_failed():
+    store = SQLiteJobStore()
+    sent = []
+    enqueue_job(store, {"file_url": "https://example.com/a.mp4", "country": "India"}, sent.append)
+
+    def failing(*args, **kwargs):
+        raise Exception("Speech service unavailable")
+
+    job = run_job(sent[0], store, failing, attempt=3, max_attempts=3)
+    assert job["status"] == JOB_FAILED
+    assert job["attempt"] == 3
+
+
+def test_last_attempt_clears_checkpoints(monkeypatch, tmp_path):
+    monkeypatch.setenv("CHECKPOINT_STORE", "local")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(checkpoints, "_store", None)
+    store = SQLiteJobStore()
+    sent = []
+    job_id = enqueue_job(store, {"file_url": "https://example.com/a.mp4", "country": "India"}, sent.append)["job_id"]
+
+    def failing(*args, **kwargs):
+        checkpoints.get_job_checkpoint(job_id).save("transcribe", {"text": "namaste"})
+        raise Exception("Speech service unavailable")
+
+    with pytest.raises(Exception):
+        run_job(sent[0], store, failing, attempt=2, max_attempts=3)
+    assert (tmp_path / job_id).exists()
+
+    job = run_job(sent[0], store, failing, attempt=3, max_attempts=3)
+    assert job["status"] == JOB_FAILED
+    assert not (tmp_path / job_id).exists()
@@ -0,0 +1,80 @@
+"""
+Tests for chunked transcription planning and stitching.
+Run with: python -m pytest test_chunked_transcription.py
+"""
+
+import numpy as np
+
+import TranscribeAudio
+from TranscribeAudio.chunked_transcription import Segment, plan_segments, stitch_results
+from TranscribeAudio.silence import TICKS_PER_SECOND
+from TranscribeAudio.wav_audio import write_wav
+
+RATE = 16000
+
+
+def phrase(text: str, start: float, duration: float, speaker: int = 1) -> dict:
+    return {
+        "speaker": speaker,
+        "offsetInTicks": int(start * TICKS_PER_SECOND),
+        "durationInTicks": int(duration * TICKS_PER_SECOND),
+        "nBest": [{"display": text, "words": [{"word": text, "offsetInTicks": int(start * TICKS_PER_SECOND)}]}],
+    }
+
+
+def test_segments_are_cut_at_quiet_points():
+    """A pause near the 10s target becomes the cut point"""
+    t = np.arange(RATE * 25) / RATE
+    samples = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    samples[int(11.0 * RATE):int(11.5 * RATE)] = 0.0
+
+    segments = plan_segments(samples, RATE, segment_seconds=10, overlap_seconds=1, search_seconds=3)
+
+    assert segments[0].owned_start == 0
+    assert segments[-1].owned_end == len(samples)
+    assert 11.0 <= segments[1].owned_start / RATE <= 11.5
+    assert segments[1].start == segments[1].owned_start - RATE
+    for previous, current in zip(segments, segments[1:]):
+        assert previous.owned_end == current.owned_start
+
+
+def test_short_recording_is_one_segment():
+    samples = np.zeros(RATE * 5, dtype=np.float32)
+    assert plan_segments(samples, RATE, segment_seconds=10) == [Segment(0, RATE * 5, 0, RATE * 5)]
+
+
+def test_stitch_shifts_and_deduplicates_overlap():
+    segments = [Segment(0, 12 * RATE, 0, 10 * RATE), Segment(8 * RATE, 20 * RATE, 10 * RATE, 20 * RATE)]
+    results = [
+        {"recognizedPhrases": [phrase("one", 1, 2), phrase("two", 8.5, 1, speaker=2)]},
+        # "two" is recognised again in the overlap, 0.5s into the second segment
+        {"recognizedPhrases": [phrase("two", 0.5, 1, speaker=1), phrase("three", 4, 2)]},
+    ]
+
+    stitched = stitch_results(results, segments, RATE)
+    phrases = stitched["recognizedPhrases"]
+
+    assert [p["nBest"][0]["display"] for p in phrases] == ["one", "two", "three"]
+    assert phrases[1]["speaker"] == 2
+    assert phrases[2]["offsetInTicks"] == 12 * TICKS_PER_SECOND
+    assert phrases[2]["nBest"][0]["words"][0]["offsetInTicks"] == 12 * TICKS_PER_SECOND
+
+
+def test_segments_are_transcribed_without_diarization(tmp_path, monkeypatch):
+    """Speaker numbers restart in every segment, so chunked jobs do not ask for them"""
+    monkeypatch.setenv("CHUNK_SECONDS", "40")
+    wav_path = str(tmp_path / "memo.wav")
+    write_wav(wav_path, np.zeros(RATE * 60, dtype=np.float32))
+    calls = []
+
+    def fake_batch(file_url, country, audio_seconds=None, diarization=True):
+        calls.append(diarization)
+        return {"recognizedPhrases": [phrase("hello", 5, 1)]}
+
+    monkeypatch.setattr(TranscribeAudio, "upload_to_blob", lambda path: path)
+    monkeypatch.setattr(TranscribeAudio, "run_batch_transcription", fake_batch)
+
+    text = TranscribeAudio.transcribe_audio_chunked(wav_path, "India")
+
+    assert len(calls) == 2 and not any(calls)
+    assert text == "hello hello"
@@ -0,0 +1,106 @@
+"""
+Tests for ffmpeg binary provisioning.
+Run with: python -m pytest test_ffmpeg_binary.py
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tarfile
+
+import pytest
+
+from TranscribeAudio import ffmpeg_binary
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """Serve a fake static build archive instead of downloading one"""
+    script = b"#!/bin/sh\necho ffmpeg\n"
+    archive_path = tmp_path / "ffmpeg.tar.xz"
+    with tarfile.open(archive_path, mode="w:xz") as tar:
+        info = tarfile.TarInfo("ffmpeg-7.0-amd64-static/ffmpeg")
+        info.size = len(script)
+        tar.addfile(info, io.BytesIO(script))
+
+    data = archive_path.read_bytes()
+
+    def fake_download(url, destination):
+        shutil.copyfile(archive_path, destination)
+        return {"sha256": hashlib.sha256(data).hexdigest(), "md5": hashlib.md5(data).hexdigest()}
+
+    monkeypatch.setattr(ffmpeg_binary, "_download_archive", fake_download)
+    monkeypatch.setattr(ffmpeg_binary, "_published_checksum", lambda url: hashlib.md5(data).hexdigest())
+    monkeypatch.delenv("FFMPEG_SHA256", raising=False)
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_download_installs_verified_binary(tmp_path, archive):
+    cache_dir = str(tmp_path / "cache")
+    binary = ffmpeg_binary.download_ffmpeg(cache_dir=cache_dir, sha256=archive)
+
+    assert binary == os.path.join(cache_dir, "ffmpeg")
+    assert os.access(binary, os.X_OK)
+    assert sorted(os.listdir(cache_dir)) == [".lock", "ffmpeg"]
+
+
+def test_checksum_mismatch_leaves_no_binary(tmp_path, archive):
+    cache_dir = str(tmp_path / "cache")
+    with pytest.raises(Exception, match="checksum mismatch"):
+        ffmpeg_binary.download_ffmpeg(cache_dir=cache_dir, sha256="0" * 64)
+
+    assert not os.path.exists(os.path.join(cache_dir, "ffmpeg"))
+
+
+def test_resolve_prefers_configured_path(tmp_path, monkeypatch):
+    binary = tmp_path / "ffmpeg"
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    monkeypatch.setenv("FFMPEG_PATH", str(binary))
+    monkeypatch.setattr(ffmpeg_binary, "_resolved_path", None)
+
+    assert ffmpeg_binary.resolve_ffmpeg_path() == str(binary)
+
+
+def test_default_download_is_verified_against_published_checksum(tmp_path, archive):
+    """Without FFMPEG_SHA256 the default build still installs, checked against its .md5"""
+    binary = ffmpeg_binary.download_ffmpeg(cache_dir=str(tmp_path / "cache"))
+    assert os.access(binary, os.X_OK)
+
+
+def test_published_checksum_mismatch_is_rejected(tmp_path, archive, monkeypatch):
+    monkeypatch.setattr(ffmpeg_binary, "_published_checksum", lambda url: "0" * 32)
+    cache_dir = str(tmp_path / "cache")
+    with pytest.raises(Exception, match="md5 checksum mismatch"):
+        ffmpeg_binary.download_ffmpeg(cache_dir=cache_dir)
+
+    assert not os.path.exists(os.path.join(cache_dir, "ffmpeg"))
+
+
+def test_warmup_fails_loudly_without_ffmpeg(tmp_path, monkeypatch):
+    """The default resolve path runs at Warmup and raises there, not on the first request"""
+    def unavailable(url):
+        raise Exception("No FFMPEG_SHA256 configured and no published checksum")
+
+    monkeypatch.setattr(ffmpeg_binary, "_published_checksum", unavailable)
+    monkeypatch.setattr(ffmpeg_binary, "_resolved_path", None)
+    monkeypatch.setattr(ffmpeg_binary, "BUNDLED_FFMPEG_PATH", str(tmp_path / "missing"))
+    monkeypatch.setattr(ffmpeg_binary.shutil, "which", lambda name: None)
+    monkeypatch.setenv("FFMPEG_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("FFMPEG_PATH", raising=False)
+    monkeypatch.delenv("FFMPEG_SHA256", raising=False)
+
+    with pytest.raises(Exception, match="no published checksum"):
+        ffmpeg_binary.prewarm_ffmpeg(background=False)
+
+
+def test_warmup_resolves_default_path(tmp_path, archive, monkeypatch):
+    monkeypatch.setattr(ffmpeg_binary, "_resolved_path", None)
+    monkeypatch.setattr(ffmpeg_binary, "BUNDLED_FFMPEG_PATH", str(tmp_path / "missing"))
+    monkeypatch.setattr(ffmpeg_binary.shutil, "which", lambda name: None)
+    monkeypatch.setenv("FFMPEG_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("FFMPEG_PATH", raising=False)
+
+    ffmpeg_binary.prewarm_ffmpeg(background=False)
+    assert ffmpeg_binary._resolved_path == str(tmp_path / "cache" / "ffmpeg")
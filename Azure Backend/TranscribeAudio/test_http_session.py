@@ -0,0 +1,63 @@
+"""
+Tests for the shared pooled HTTP session.
+Run with: python -m pytest test_http_session.py
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from TranscribeAudio import http_session
+from TranscribeAudio.http_session import TimeoutHTTPAdapter, create_session
+
+
+@pytest.fixture
+def server():
+    """Local server that fails the first GET with 503 and counts connections"""
+    state = {"requests": 0, "connections": set()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            state["requests"] += 1
+            state["connections"].add(self.client_address)
+            status = 503 if state["requests"] == 1 else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_session_retries_and_reuses_connection(server):
+    url, state = server
+    session = create_session(backoff_factor=0)
+
+    assert session.get(url).status_code == 200
+    assert session.get(url).status_code == 200
+    assert state["requests"] == 3
+    assert len(state["connections"]) == 1
+
+
+def test_default_timeout_applied():
+    session = create_session(connect_timeout=2, read_timeout=7)
+    adapter = session.get_adapter("https://example.com")
+    assert isinstance(adapter, TimeoutHTTPAdapter)
+    assert adapter.timeout == (2, 7)
+    assert adapter.max_retries.allowed_methods == http_session.RETRY_METHODS
+
+
+def test_get_session_is_shared(monkeypatch):
+    monkeypatch.setattr(http_session, "_session", None)
+    assert http_session.get_session() is http_session.get_session()
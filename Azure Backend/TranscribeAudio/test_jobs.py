@@ -0,0 +1,70 @@
+"""
+Tests for asynchronous job tracking using the SQLite store and local queue.
+Run with: python -m pytest test_jobs.py
+"""
+
+from TranscribeAudio.jobs import (
+    JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, LocalJobQueue, SQLiteJobStore, enqueue_job, run_job
+)
+
+
+def test_enqueue_and_run_job():
+    """A queued job moves through its stages and stores the pipeline result"""
+    store = SQLiteJobStore()
+    stages = []
+
+    def fake_process(file_url, country, on_stage=None, on_partial=None, job_id=None):
+        on_stage("transcribing")
+        stages.append(store.get(job_id)["stage"])
+        return {"file_id": "abc", "original_text": f"{file_url} {country}"}
+
+    local_queue = LocalJobQueue(lambda message: run_job(message, store, fake_process))
+    record = enqueue_job(store, {"file_url": "https://example.com/a.mp4", "country": "India"}, local_queue.put)
+    job_id = record["job_id"]
+    assert record["status"] == JOB_QUEUED
+
+    local_queue.join()
+    local_queue.close()
+
+    job = store.get(job_id)
+    assert stages == ["transcribing"]
+    assert job["status"] == JOB_SUCCEEDED
+    assert job["result"]["original_text"] == "https://example.com/a.mp4 India"
+
+
+def test_failed_job_records_error():
+    """Pipeline exceptions mark the job failed instead of escaping the worker"""
+    store = SQLiteJobStore()
+
+    def failing_process(file_url, country, on_stage=None, on_partial=None, job_id=None):
+        raise Exception("Failed to download file")
+
+    sent = []
+    record = enqueue_job(store, {"file_url": "https://example.com/a.mp4", "country": "Spain"}, sent.append)
+    job = run_job(sent[0], store, failing_process)
+
+    assert job["job_id"] == record["job_id"]
+    assert job["status"] == JOB_FAILED
+    assert job["error"] == "Failed to download file"
+
+
+def test_unknown_job_returns_none():
+    assert SQLiteJobStore().get("missing") is None
+
+
+def test_progress_updates_are_visible_while_running():
+    """Partial transcripts are stored on the job record before the job finishes"""
+    store = SQLiteJobStore()
+    seen = []
+
+    def fake_process(file_url, country, on_stage=None, on_partial=None, job_id=None):
+        on_partial({"field": "original_text", "text": "namaste", "final": True})
+        on_partial({"field": "polished_english_text", "text": "Hel", "final": False})
+        seen.append(store.get(job_id)["partial"])
+        return {"file_id": "abc"}
+
+    sent = []
+    job_id = enqueue_job(store, {"file_url": "https://example.com/a.mp4", "country": "India"}, sent.append)["job_id"]
+    run_job(sent[0], store, fake_process)
+
+    assert seen == [{"original_text": "namaste", "polished_english_text": "Hel"}]
@@ -0,0 +1,61 @@
+"""
+Tests for the precomputed country lookup index.
+Run with: python -m pytest test_language_index.py
+"""
+
+import dataclasses
+
+import pytest
+
+from TranscribeAudio import language_config
+from TranscribeAudio.language_config import LanguageConfig, _build_index, get_language_config
+
+
+@pytest.mark.parametrize("query, country", [
+    ("India", "India"), ("  INDIA ", "India"), ("in", "India"), ("hi-IN", "India"), ("hi_in", "India"),
+    ("Hindi", "India"), ("Bharat", "India"),
+    ("usa", "United States"), ("US", "United States"), ("united  states", "United States"),
+    ("United States of America", "United States"), ("en", "United States"),
+    ("es", "Spain"), ("España", "Spain"), ("pt-BR", "Brazil"), ("zh", "China"),
+])
+def test_exact_lookups(query, country):
+    assert get_language_config(query).country_name == country
+
+
+def test_partial_matches_are_deterministic():
+    assert get_language_config("Unit").country_name == "United States"
+    # "an" is inside France, Japan and Germany: the shortest name wins
+    assert get_language_config("an").country_name == "Japan"
+
+
+def test_unknown_country_lists_supported():
+    with pytest.raises(ValueError, match="Unsupported country: Atlantis. Supported countries: India"):
+        get_language_config("Atlantis")
+    with pytest.raises(ValueError):
+        get_language_config("")
+
+
+def test_index_and_configs_are_immutable():
+    with pytest.raises(TypeError):
+        language_config._INDEX["atlantis"] = None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        get_language_config("India").speech_locale = "en-US"
+
+
+def test_conflicting_keys_resolved_by_priority():
+    spain = LanguageConfig("Spain", "ES", "es-ES", "es", language_name="Spanish")
+    mexico = LanguageConfig("Mexico", "MX", "es-MX", "es", language_name="Spanish")
+    colombia = LanguageConfig("Colombia", "CO", "es-CO", "es", language_name="Spanish")
+    index = _build_index({"spain": spain, "mexico": mexico, "colombia": colombia})
+    # "es" is Spain's country code, which outranks the shared language code
+    assert index["es"] is spain
+    # The shared language name has no stronger claim and is ambiguous
+    assert "spanish" not in index
+    assert index["mx"] is mexico and index["es-co"] is colombia
+
+
+def test_lookups_are_memoized():
+    language_config._resolve.cache_clear()
+    get_language_config("Germany")
+    get_language_config("germany ")
+    assert language_config._resolve.cache_info().hits == 1
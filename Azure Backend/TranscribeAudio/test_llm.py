@@ -0,0 +1,53 @@
+"""
+Tests for the shared LLM client factory.
+Run with: python -m pytest test_llm.py
+"""
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio import llm
+from TranscribeAudio.llm import FakeLLM, complete, get_llm, set_llm_factory
+
+
+@pytest.fixture(autouse=True)
+def reset_factory():
+    yield
+    set_llm_factory(None)
+
+
+def test_clients_cached_per_deployment_and_kind():
+    built = []
+
+    def factory(kind, deployment_name):
+        built.append((kind, deployment_name))
+        return FakeLLM()
+
+    set_llm_factory(factory)
+    assert get_llm("gpt-4o", "chat") is get_llm("gpt-4o", "chat")
+    assert get_llm("gpt-4o", "completion") is not get_llm("gpt-4o", "chat")
+    get_llm("gpt-35-turbo", "chat")
+    assert built == [("chat", "gpt-4o"), ("completion", "gpt-4o"), ("chat", "gpt-35-turbo")]
+
+
+def test_complete_unwraps_chat_messages():
+    class Message:
+        content = "from chat"
+
+    set_llm_factory(FakeLLM(handler=lambda prompt: Message()).factory)
+    assert complete("hi", kind="chat") == "from chat"
+
+
+def test_helpers_use_fake_model():
+    fake = FakeLLM(handler=lambda prompt: prompt.rsplit("\n", 1)[-1])
+    set_llm_factory(fake.factory)
+
+    assert TranscribeAudio.summarize_transcript("memo") == "Summary:"
+    assert TranscribeAudio.polish_english_text("text") == "Polished:"
+    assert "memo" in fake.prompts[0]
+
+
+def test_missing_configuration(monkeypatch):
+    monkeypatch.delenv("AZURE_OPENAI_KEY", raising=False)
+    with pytest.raises(Exception, match="AZURE_OPENAI_KEY"):
+        llm.create_azure_llm("completion", "gpt-35-turbo")
@@ -0,0 +1,105 @@
+"""
+Tests for the stage graph executor and the orchestrated transcription pipeline.
+Run with: python -m pytest test_pipeline.py
+"""
+
+import threading
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio.pipeline import Pipeline, Stage
+from TranscribeAudio.result_cache import LocalResultCache, ResultCache
+
+
+def test_outputs_flow_to_dependent_stages():
+    run = Pipeline([
+        Stage("double", lambda source: source * 2, ("source",)),
+        Stage("source", lambda: 21),
+    ]).run()
+    assert run.outputs == {"source": 21, "double": 42}
+    assert set(run.timings) == {"source", "double"}
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2)
+
+    def meet():
+        barrier.wait(timeout=5)
+        return True
+
+    run = Pipeline([Stage("a", meet), Stage("b", meet), Stage("both", lambda a, b: a and b, ("a", "b"))], workers=2).run()
+    assert run.outputs["both"] is True
+
+
+def test_failure_stops_dependents_and_reraises():
+    ran = []
+
+    def fail():
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError, match="boom"):
+        Pipeline([
+            Stage("fail", fail),
+            Stage("after", lambda fail: ran.append("after"), ("fail",)),
+        ]).run()
+    assert ran == []
+
+
+@pytest.mark.parametrize("stages", [
+    [Stage("a", lambda b: b, ("b",)), Stage("b", lambda a: a, ("a",))],
+    [Stage("a", lambda missing: missing, ("missing",))],
+    [Stage("a", lambda: 1), Stage("a", lambda: 2)],
+])
+def test_invalid_graphs_rejected(stages):
+    with pytest.raises(ValueError):
+        Pipeline(stages)
+
+
+def test_original_transcript_saved_while_refining(monkeypatch):
+    saved_original = threading.Event()
+    events = []
+    monkeypatch.setattr(TranscribeAudio, "get_result_cache", lambda: None)
+    monkeypatch.setattr(TranscribeAudio, "transcribe_source", lambda *args, **kwargs: ("namaste", None, None))
+
+    def refine(original_text, country, report, **kwargs):
+        # Blocks until the original transcript has been stored
+        assert saved_original.wait(timeout=5)
+        events.append("refined")
+        return "clean", "english", "polished", "summary"
+
+    def save_original(text, file_id):
+        events.append("original saved")
+        saved_original.set()
+
+    monkeypatch.setattr(TranscribeAudio, "refine_transcript", refine)
+    monkeypatch.setattr(TranscribeAudio, "save_original_transcript", save_original)
+    monkeypatch.setattr(TranscribeAudio, "save_transcript_to_blob", lambda *args, **kwargs: events.append("saved"))
+    monkeypatch.setattr(TranscribeAudio, "generate_transcript_links", lambda file_id: {"polished": f"https://blob/{file_id}"})
+    monkeypatch.setattr(TranscribeAudio, "notify_bubble", lambda file_id, url, *args, **kwargs: events.append(("bubble", url)))
+    monkeypatch.setenv("TRANSCRIPT_STORAGE_MODE", "files")
+
+    result = TranscribeAudio.process_transcription("https://example.com/a.mp4", "India")
+
+    assert events == ["original saved", "refined", "saved", ("bubble", f"https://blob/{result['file_id']}")]
+    assert result["polished_english_text"] == "polished"
+    assert {"transcribe", "refine", "save", "notify"} <= set(result["stage_timings"])
+    assert all(seconds == round(seconds, 3) for seconds in result["stage_timings"].values())
+
+
+def test_changed_transcripts_get_a_new_file_id(tmp_path, monkeypatch):
+    """With the result cache, a re-run whose texts changed must not overwrite the linked transcripts"""
+    cache = ResultCache(LocalResultCache(str(tmp_path / "cache")))
+    polished = ["polished", "polished", "polished v2"]
+    monkeypatch.setattr(TranscribeAudio, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(TranscribeAudio, "transcribe_source", lambda *args, **kwargs: ("namaste", None, "transcript-key"))
+    monkeypatch.setattr(TranscribeAudio, "refine_transcript", lambda *args, **kwargs: ("clean", "english", polished.pop(0), "summary"))
+    monkeypatch.setattr(TranscribeAudio, "save_original_transcript", lambda *args: None)
+    monkeypatch.setattr(TranscribeAudio, "save_transcript_to_blob", lambda *args, **kwargs: None)
+    monkeypatch.setattr(TranscribeAudio, "generate_transcript_links", lambda file_id: {"polished": f"https://blob/{file_id}"})
+    monkeypatch.setattr(TranscribeAudio, "notify_bubble", lambda *args, **kwargs: True)
+
+    file_ids = [TranscribeAudio.process_transcription("https://example.com/a.mp4", "India")["file_id"] for _ in range(3)]
+
+    assert file_ids[0] == file_ids[1]
+    assert file_ids[2] != file_ids[1]
@@ -0,0 +1,124 @@
+"""
+Tests for adaptive transcription polling.
+Run with: python -m pytest test_polling.py
+"""
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio.polling import AdaptivePoller, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_poller(clock, **kwargs):
+    return AdaptivePoller(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_first_wait_follows_estimate_then_backs_off():
+    clock = FakeClock()
+    poller = make_poller(clock, audio_seconds=600, initial_interval=1, max_interval=60, backoff=2)
+
+    delays = []
+    for _ in range(6):
+        before = clock.now
+        poller.wait()
+        delays.append(clock.now - before)
+
+    # Estimate is 10s + 10% of 600s = 70s; first wait is half of it, then backoff continues from there
+    assert poller.metrics.estimated_seconds == 70
+    assert delays == [35, 60, 60, 60, 60, 60]
+    assert poller.metrics.waited_seconds == sum(delays)
+
+
+def test_long_audio_is_not_polled_before_its_estimate():
+    """The first wait is not cut short by max_interval"""
+    clock = FakeClock()
+    poller = make_poller(clock, audio_seconds=1800, initial_interval=1, max_interval=30, deadline_seconds=None)
+
+    checks = []
+    while clock.now < poller.metrics.estimated_seconds:
+        poller.wait()
+        checks.append(clock.now)
+
+    assert checks == [95, 125, 155, 185, 215]
+
+
+def test_short_audio_backs_off_from_first_wait():
+    clock = FakeClock()
+    poller = make_poller(clock, audio_seconds=10, initial_interval=1, max_interval=30, backoff=2)
+
+    delays = []
+    for _ in range(4):
+        before = clock.now
+        poller.wait()
+        delays.append(clock.now - before)
+
+    assert delays == [5.5, 11, 22, 30]
+
+
+def test_short_audio_is_checked_early():
+    clock = FakeClock()
+    poller = make_poller(clock, audio_seconds=10, initial_interval=1)
+    poller.wait()
+    assert clock.now == 5.5
+
+
+def test_retry_after_extends_wait():
+    clock = FakeClock()
+    poller = make_poller(clock, audio_seconds=0, initial_interval=1)
+    poller.wait(retry_after=12)
+    assert clock.now == 12
+    assert poller.metrics.retry_after_honoured == 1
+
+
+def test_deadline_raises_timeout():
+    clock = FakeClock()
+    poller = make_poller(clock, audio_seconds=0, initial_interval=1, max_interval=30, deadline_seconds=20)
+    with pytest.raises(TimeoutError):
+        for _ in range(100):
+            poller.record_poll()
+            poller.wait()
+    # The last wait is shortened so the final check lands on the deadline
+    assert clock.now == 20
+    assert poller.metrics.polls > 1
+
+
+def test_default_timeout_fits_function_timeout(monkeypatch):
+    """host.json allows a function 10 minutes"""
+    monkeypatch.delenv("TRANSCRIPTION_TIMEOUT_SECONDS", raising=False)
+    assert AdaptivePoller.from_env().deadline_seconds < 600
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.parametrize("status, error", [("Running", TimeoutError), ("Failed", Exception)])
+def test_unfinished_job_is_deleted(monkeypatch, status, error):
+    """A job that times out or fails is deleted rather than left running"""
+    clock = FakeClock()
+    deleted = []
+    monkeypatch.setattr(TranscribeAudio, "create_transcription", lambda *args, **kwargs: "https://speech/transcriptions/1")
+    monkeypatch.setattr(TranscribeAudio, "fetch_transcription_status", lambda url: ({"status": status}, None))
+    monkeypatch.setattr(TranscribeAudio, "delete_transcription", deleted.append)
+    monkeypatch.setattr(TranscribeAudio.AdaptivePoller, "from_env", classmethod(
+        lambda cls, audio_seconds=None: make_poller(clock, audio_seconds=audio_seconds, deadline_seconds=60)
+    ))
+
+    with pytest.raises(error):
+        TranscribeAudio.run_batch_transcription("https://blob/memo.wav", "India", audio_seconds=30)
+
+    assert deleted == ["https://speech/transcriptions/1"]
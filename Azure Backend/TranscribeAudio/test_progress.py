@@ -0,0 +1,72 @@
+"""
+Tests for streamed LLM output and progressive result publishing.
+Run with: python -m pytest test_progress.py
+"""
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio.llm import FakeLLM, complete, set_llm_factory
+from TranscribeAudio.progress import ProgressPublisher, create_progress_publisher
+
+
+@pytest.fixture(autouse=True)
+def reset_factory():
+    yield
+    set_llm_factory(None)
+
+
+def test_complete_streams_accumulated_text():
+    set_llm_factory(FakeLLM(["Hello there, world."]).factory)
+    seen = []
+    assert complete("hi", on_text=seen.append) == "Hello there, world."
+    assert seen == ["Hello ", "Hello there, ", "Hello there, world."]
+
+
+def test_partial_updates_are_throttled_but_finals_delivered():
+    now = [0.0]
+    updates = []
+    publisher = ProgressPublisher("req", [updates.append], min_interval=1.0, clock=lambda: now[0])
+    publisher.partial("summary_text", "a")
+    publisher.partial("summary_text", "ab")
+    now[0] = 1.5
+    publisher.partial("summary_text", "abc")
+    publisher.complete("summary_text", "abcd")
+    publisher.close()
+
+    assert [(u["text"], u["final"]) for u in updates] == [("a", False), ("abc", False), ("abcd", True)]
+    assert [u["sequence"] for u in updates] == [1, 2, 3]
+    assert {u["request_id"] for u in updates} == {"req"}
+
+
+def test_sink_errors_do_not_propagate():
+    def broken(update):
+        raise Exception("webhook down")
+
+    delivered = []
+    publisher = ProgressPublisher("req", [broken, delivered.append])
+    publisher.complete("original_text", "namaste")
+    publisher.close()
+    assert delivered[0]["text"] == "namaste"
+
+
+def test_no_sinks_means_no_publisher():
+    assert create_progress_publisher("req", [None]) is None
+
+
+def test_refinement_publishes_versions_in_order(monkeypatch):
+    monkeypatch.setenv("LLM_MIN_CHARS", "0")
+    monkeypatch.setenv("PROGRESS_MIN_INTERVAL", "0")
+    monkeypatch.delenv("LLM_PIPELINE_MODE", raising=False)
+    monkeypatch.setattr(TranscribeAudio, "translate_to_english", lambda text, country: f"en({text})")
+    set_llm_factory(FakeLLM(handler=lambda prompt: "Clean." if "Clean up" in prompt else "Polished text here.").factory)
+
+    updates = []
+    publisher = create_progress_publisher("req", [updates.append])
+    TranscribeAudio.refine_transcript("namaste ji", "India", lambda stage: None, progress=publisher)
+    publisher.close()
+
+    finals = [u["field"] for u in updates if u["final"]]
+    assert finals == ["english_text", "polished_english_text", "summary_text"]
+    streamed = [u["text"] for u in updates if u["field"] == "polished_english_text" and not u["final"]]
+    assert streamed[0] == "Polished " and streamed[-1] == "Polished text here."
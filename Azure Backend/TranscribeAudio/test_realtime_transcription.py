@@ -0,0 +1,73 @@
+"""
+Tests for the real-time Speech SDK transcription path.
+Run with: python -m pytest test_realtime_transcription.py
+"""
+
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from TranscribeAudio.realtime_transcription import FakeRecognizer, iter_wav_pcm, transcribe_realtime
+
+
+def _wav_bytes(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    samples = (np.sin(np.arange(int(seconds * rate)) / 10) * 8000).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def test_iter_wav_pcm_strips_header_across_small_chunks():
+    data = _wav_bytes(0.1)
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+    pcm = b"".join(iter_wav_pcm(chunks))
+    assert pcm == data[44:]
+
+
+def test_iter_wav_pcm_rejects_non_wav():
+    with pytest.raises(ValueError):
+        list(iter_wav_pcm([b"ID3" + b"\x00" * 64]))
+
+
+def test_transcribe_realtime_emits_partials_and_finals():
+    recognizer = FakeRecognizer(["hello there world", "second phrase"])
+    partials, finals = [], []
+    pcm = iter_wav_pcm([_wav_bytes(2.0)])
+
+    result = transcribe_realtime(
+        pcm, "en-US", on_partial=partials.append, on_final=finals.append,
+        recognizer_factory=recognizer.factory,
+    )
+
+    assert recognizer.locale == "en-US"
+    assert partials == ["hello", "hello there", "second"]
+    assert finals == ["hello there world", "second phrase"]
+    phrases = result["recognizedPhrases"]
+    assert [phrase["nBest"][0]["display"] for phrase in phrases] == finals
+    # Two seconds of audio split evenly between the phrases, in 100 ns ticks
+    assert phrases[1]["offsetInTicks"] == 10_000_000
+    assert phrases[0]["durationInTicks"] == 10_000_000
+
+
+def test_transcribe_realtime_raises_on_cancellation():
+    recognizer = FakeRecognizer(["unused"], error="Authentication failed")
+    with pytest.raises(Exception, match="Authentication failed"):
+        transcribe_realtime([b"\x00" * 320], "hi-IN", recognizer_factory=recognizer.factory)
+
+
+def test_transcribe_realtime_stops_recognizer_when_audio_fails():
+    recognizer = FakeRecognizer(["hello"])
+
+    def failing_pcm():
+        yield b"\x00" * 320
+        raise IOError("ffmpeg exited")
+
+    with pytest.raises(IOError, match="ffmpeg exited"):
+        transcribe_realtime(failing_pcm(), "hi-IN", recognizer_factory=recognizer.factory, timeout=1)
+    assert recognizer.stopped
@@ -0,0 +1,104 @@
+"""
+Tests for the content-addressed result cache.
+Run with: python -m pytest test_result_cache.py
+"""
+
+import hashlib
+import io
+import wave
+
+import numpy as np
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio import result_cache
+from TranscribeAudio.result_cache import (
+    LocalResultCache, ResultCache, cached_stage, hash_wav_file, hash_wav_stream, transcript_key,
+)
+
+
+def _wav_bytes(samples: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_stream_hash_matches_file_hash(tmp_path):
+    data = _wav_bytes(np.arange(5000) % 300)
+    path = tmp_path / "audio.wav"
+    path.write_bytes(data)
+
+    digest = hashlib.sha256()
+    chunks = [data[i:i + 999] for i in range(0, len(data), 999)]
+    assert b"".join(hash_wav_stream(chunks, digest)) == data
+    assert digest.hexdigest() == hash_wav_file(str(path))
+
+
+def test_transcript_key_depends_on_settings():
+    assert transcript_key("abc", "India", "batch") == transcript_key("abc", "India", "batch")
+    assert transcript_key("abc", "India", "batch") != transcript_key("abc", "Spain", "batch")
+    assert transcript_key("abc", "India", "batch") != transcript_key("abc", "India", "realtime")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(LocalResultCache(str(tmp_path / "cache")))
+
+
+def test_cached_stage_computes_once(cache):
+    calls = []
+    compute = lambda: calls.append(1) or {"text": "done"}
+
+    first, key = cached_stage(cache, "parent", "clean", compute, "hi")
+    second, same_key = cached_stage(cache, "parent", "clean", compute, "hi")
+
+    assert first == second == {"text": "done"}
+    assert key == same_key
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_backend_errors_are_misses():
+    class Broken:
+        def get(self, key):
+            raise OSError("storage down")
+
+        def put(self, key, entry):
+            raise OSError("storage down")
+
+    value, _ = cached_stage(ResultCache(Broken()), "parent", "clean", lambda: "text")
+    assert value == "text"
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setenv("LLM_MIN_CHARS", "0")
+    calls = []
+    monkeypatch.setattr(TranscribeAudio, "clean_transcription", lambda text, language: calls.append("clean") or f"clean({text})")
+    monkeypatch.setattr(TranscribeAudio, "translate_to_english", lambda text, country: calls.append("translate") or f"en({text})")
+    monkeypatch.setattr(TranscribeAudio, "polish_english_text", lambda text, on_progress=None: calls.append("polish") or f"polish({text})")
+    monkeypatch.setattr(TranscribeAudio, "summarize_transcript", lambda text, on_progress=None: calls.append("summarize") or f"sum({text})")
+    monkeypatch.delenv("LLM_PIPELINE_MODE", raising=False)
+    return calls
+
+
+def test_repeat_refinement_is_served_from_cache(cache, calls):
+    first = TranscribeAudio.refine_transcript("namaste", "India", lambda stage: None, cache=cache, parent_key="k")
+    second = TranscribeAudio.refine_transcript("namaste", "India", lambda stage: None, cache=cache, parent_key="k")
+
+    assert first == second
+    assert calls == ["clean", "translate", "polish", "summarize"]
+
+
+def test_prompt_version_bump_reruns_later_stages_only(cache, calls, monkeypatch):
+    TranscribeAudio.refine_transcript("namaste", "India", lambda stage: None, cache=cache, parent_key="k")
+    calls.clear()
+
+    monkeypatch.setitem(result_cache.STAGE_VERSIONS, "polish", "2")
+    TranscribeAudio.refine_transcript("namaste", "India", lambda stage: None, cache=cache, parent_key="k")
+
+    assert calls == ["polish", "summarize"]
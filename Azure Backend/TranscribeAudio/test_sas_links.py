@@ -0,0 +1,91 @@
+"""
+Tests for local SAS link signing.
+Run with: python -m pytest test_sas_links.py
+"""
+
+import base64
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from azure.storage.blob import UserDelegationKey
+
+from TranscribeAudio.sas_links import LinkSigner
+
+ACCOUNT_KEY = base64.b64encode(b"test-key").decode()
+CONTAINER_URL = "https://onowtest.blob.core.windows.net/audio"
+
+
+def _query(url: str) -> dict:
+    return {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+
+
+def test_sign_all_shares_expiry():
+    signer = LinkSigner("onowtest", "audio", CONTAINER_URL, account_key=ACCOUNT_KEY)
+    names = [f"transcripts/abc_{variant}.txt" for variant in ("original", "polished", "summary")]
+
+    links = signer.sign_all(names, timedelta(hours=24))
+
+    assert list(links) == names
+    assert links[names[1]].startswith(f"{CONTAINER_URL}/transcripts/abc_polished.txt?")
+    queries = [_query(url) for url in links.values()]
+    assert {query["se"] for query in queries} == {queries[0]["se"]}
+    assert all(query["sp"] == "r" for query in queries)
+    assert len({query["sig"] for query in queries}) == len(names)
+
+
+def _delegation_key(start: datetime, expiry: datetime) -> UserDelegationKey:
+    key = UserDelegationKey()
+    key.signed_oid = "00000000-0000-0000-0000-000000000000"
+    key.signed_tid = "00000000-0000-0000-0000-000000000000"
+    key.signed_start = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+    key.signed_expiry = expiry.strftime("%Y-%m-%dT%H:%M:%SZ")
+    key.signed_service = "b"
+    key.signed_version = "2020-02-10"
+    key.value = ACCOUNT_KEY
+    return key
+
+
+def test_delegation_key_fetched_once_and_caps_expiry():
+    calls = []
+
+    def source(start, expiry):
+        calls.append((start, expiry))
+        return _delegation_key(start, expiry)
+
+    signer = LinkSigner(
+        "onowtest", "audio", CONTAINER_URL,
+        delegation_key_source=source, key_lifetime=timedelta(hours=1), refresh_seconds=3600,
+    )
+    try:
+        links = signer.sign_all(["a.txt", "b.txt"], timedelta(days=7))
+        links.update(signer.sign_all(["c.txt"], timedelta(hours=2)))
+    finally:
+        signer.close()
+
+    assert len(calls) == 1
+    query = _query(links["a.txt"])
+    assert query["skoid"] == "00000000-0000-0000-0000-000000000000"
+    expiry = datetime.strptime(query["se"], "%Y-%m-%dT%H:%M:%SZ")
+    assert expiry <= calls[0][1]
+
+
+def test_failed_refresh_keeps_current_key():
+    keys = iter([None])
+
+    def source(start, expiry):
+        if next(keys, "fail") == "fail":
+            raise RuntimeError("AAD unavailable")
+        return _delegation_key(start, expiry)
+
+    signer = LinkSigner("onowtest", "audio", CONTAINER_URL, delegation_key_source=source, refresh_seconds=3600)
+    try:
+        signer.refresh_delegation_key()
+        assert "sig" in _query(signer.sign("a.txt", datetime.utcnow() + timedelta(hours=1)))
+    finally:
+        signer.close()
+
+
+def test_requires_exactly_one_key():
+    with pytest.raises(ValueError):
+        LinkSigner("onowtest", "audio", CONTAINER_URL)
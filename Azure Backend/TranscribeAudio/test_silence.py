@@ -0,0 +1,89 @@
+"""
+Tests for silence trimming and timestamp remapping.
+Run with: python -m pytest test_silence.py
+"""
+
+import numpy as np
+
+from TranscribeAudio.silence import TICKS_PER_SECOND, remap_transcription_result, trim_silence
+from TranscribeAudio.wav_audio import read_mono, write_wav
+
+RATE = 16000
+
+
+def speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(RATE * seconds)) * 1e-4).astype(np.float32)
+
+
+def test_long_silence_is_compressed(tmp_path):
+    """1s speech, 5s silence, 1s speech: the gap shrinks to the padding on each side"""
+    wav_path = str(tmp_path / "memo.wav")
+    write_wav(wav_path, np.concatenate([speech(1), silence(5), speech(1)]))
+
+    trim = trim_silence(wav_path, wav_path)
+    samples, _ = read_mono(wav_path)
+
+    assert abs(trim.original_duration - 7.0) < 1e-6
+    assert 4.0 < trim.seconds_saved < 5.0
+    assert abs(len(samples) / RATE - trim.trimmed_duration) < 1e-6
+    assert len(trim.offset_map) == 2
+
+    # The second utterance starts at 6s in the original recording
+    second_start = trim.offset_map[1][0] + (6.0 - trim.offset_map[1][1])
+    assert abs(trim.to_original(second_start) - 6.0) < 1e-6
+
+
+def test_short_pauses_are_kept(tmp_path):
+    wav_path = str(tmp_path / "memo.wav")
+    write_wav(wav_path, np.concatenate([speech(1), silence(0.3), speech(1)]))
+
+    trim = trim_silence(wav_path, wav_path)
+
+    assert trim.seconds_saved < 0.05
+    assert len(trim.offset_map) == 1
+
+
+def test_digital_silence_is_left_untouched(tmp_path):
+    wav_path = str(tmp_path / "memo.wav")
+    write_wav(wav_path, np.zeros(RATE * 10, dtype=np.float32))
+
+    assert trim_silence(wav_path, wav_path) is None
+    samples, _ = read_mono(wav_path)
+    assert len(samples) == RATE * 10
+
+
+def test_remap_transcription_result(tmp_path):
+    wav_path = str(tmp_path / "memo.wav")
+    write_wav(wav_path, np.concatenate([speech(1), silence(5), speech(1)]))
+    trim = trim_silence(wav_path, wav_path)
+
+    trimmed_offset = trim.offset_map[1][0] + 0.5
+    result = {
+        "recognizedPhrases": [{
+            "offsetInTicks": int(trimmed_offset * TICKS_PER_SECOND),
+            "durationInTicks": int(0.25 * TICKS_PER_SECOND),
+            "offset": "PT0S",
+            "nBest": [{"display": "hello", "words": [{
+                "word": "hello",
+                "offsetInTicks": int(trimmed_offset * TICKS_PER_SECOND),
+                "durationInTicks": int(0.25 * TICKS_PER_SECOND),
+            }]}],
+        }]
+    }
+
+    remapped = remap_transcription_result(result, trim)
+    phrase = remapped["recognizedPhrases"][0]
+    expected = trim.offset_map[1][1] + 0.5
+
+    assert abs(phrase["offsetInTicks"] / TICKS_PER_SECOND - expected) < 1e-3
+    assert abs(phrase["durationInTicks"] / TICKS_PER_SECOND - 0.25) < 1e-3
+    assert phrase["nBest"][0]["words"][0]["offsetInTicks"] == phrase["offsetInTicks"]
+    assert phrase["offset"] == f"PT{expected:.2f}S"
+    # The input is left untouched
+    assert result["recognizedPhrases"][0]["offset"] == "PT0S"
@@ -0,0 +1,55 @@
+"""
+Tests for per-request stage planning.
+Run with: python -m pytest test_stage_planner.py
+"""
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio.language_config import get_language_config
+from TranscribeAudio.stage_planner import plan_stages
+
+LONG_TEXT = "This recording is long enough to be worth cleaning and polishing."
+
+
+def test_english_source_skips_translation():
+    plan = plan_stages(get_language_config("United States"), LONG_TEXT, llm_min_chars=20)
+    assert plan.stages == ["clean", "polish", "summarize"]
+    assert "translate" in plan.skipped
+
+
+def test_short_transcript_skips_llm_passes():
+    plan = plan_stages(get_language_config("India"), "haan ji", llm_min_chars=20)
+    assert plan.stages == ["translate"]
+    assert set(plan.skipped) == {"clean", "polish", "summarize"}
+
+
+def test_empty_transcript_skips_everything():
+    plan = plan_stages(get_language_config("India"), "  \n ", llm_min_chars=0)
+    assert plan.stages == []
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(TranscribeAudio, "clean_transcription", lambda text, language: calls.append("clean") or text)
+    monkeypatch.setattr(TranscribeAudio, "translate_to_english", lambda text, country: calls.append("translate") or text)
+    monkeypatch.setattr(TranscribeAudio, "polish_english_text", lambda text, on_progress=None: calls.append("polish") or text)
+    monkeypatch.setattr(TranscribeAudio, "summarize_transcript", lambda text, on_progress=None: calls.append("summarize") or text)
+    return calls
+
+
+def test_short_english_transcript_passes_through(monkeypatch, calls):
+    monkeypatch.delenv("LLM_PIPELINE_MODE", raising=False)
+    monkeypatch.setenv("LLM_MIN_CHARS", "20")
+    reported = []
+    result = TranscribeAudio.refine_transcript("ok thanks", "United States", reported.append)
+    assert result == ("ok thanks",) * 4
+    assert calls == [] and reported == []
+
+
+def test_structured_mode_falls_back_to_sequential_when_polish_skipped(monkeypatch, calls):
+    monkeypatch.setenv("LLM_PIPELINE_MODE", "structured")
+    monkeypatch.setattr(TranscribeAudio, "call_llm", lambda prompt: pytest.fail("structured call for a short transcript"))
+    TranscribeAudio.refine_transcript("namaste", "India", lambda stage: None, plan=plan_stages(get_language_config("India"), "namaste", llm_min_chars=20))
+    assert calls == ["translate"]
@@ -0,0 +1,38 @@
+"""
+Tests for the shared blob storage clients.
+Run with: python -m pytest test_storage.py
+"""
+
+import base64
+import threading
+
+from TranscribeAudio.storage import get_blob_service_client, get_container_client
+
+CONNECT_STR = (
+    "DefaultEndpointsProtocol=https;AccountName=onowtest;"
+    f"AccountKey={base64.b64encode(b'test-key').decode()};EndpointSuffix=core.windows.net"
+)
+
+
+def test_clients_are_cached_per_container(monkeypatch):
+    monkeypatch.setenv("AZURE_STORAGE_CONNECTION_STRING", CONNECT_STR)
+    monkeypatch.setenv("AZURE_STORAGE_CONTAINER", "audio")
+
+    container = get_container_client()
+    assert container is get_container_client(CONNECT_STR, "audio")
+    assert container.container_name == "audio"
+    assert get_container_client(CONNECT_STR, "jobs") is not container
+    assert get_blob_service_client() is get_blob_service_client(CONNECT_STR)
+
+
+def test_concurrent_first_use_builds_one_client():
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(get_container_client(CONNECT_STR, "concurrent")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
@@ -0,0 +1,83 @@
+"""
+Tests for the structured single-call LLM pipeline.
+Run with: python -m pytest test_structured_llm.py
+"""
+
+import json
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio.structured_llm import ENGLISH_FIELDS, StructuredResponseError, parse_structured_response
+
+
+def test_parse_accepts_fenced_json():
+    raw = '```json\n{"cleaned_text": " a ", "polished_text": "b", "summary": "c", "extra": 1}\n```'
+    assert parse_structured_response(raw, ENGLISH_FIELDS) == {"cleaned_text": "a", "polished_text": "b", "summary": "c"}
+
+
+@pytest.mark.parametrize("raw", [
+    "Sorry, I cannot help with that.",
+    '{"cleaned_text": "a", "polished_text": "b"',
+    '{"cleaned_text": "a", "polished_text": "b", "summary": null}',
+    '["cleaned_text"]',
+])
+def test_parse_rejects_invalid_responses(raw):
+    with pytest.raises(StructuredResponseError):
+        parse_structured_response(raw, ENGLISH_FIELDS)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record LLM and translator calls instead of hitting Azure"""
+    monkeypatch.setenv("LLM_MIN_CHARS", "0")
+    calls = []
+    monkeypatch.setattr(TranscribeAudio, "clean_transcription", lambda text, language: calls.append("clean") or f"clean({text})")
+    monkeypatch.setattr(TranscribeAudio, "translate_to_english", lambda text, country: calls.append("translate") or f"en({text})")
+    monkeypatch.setattr(TranscribeAudio, "polish_english_text", lambda text, on_progress=None: calls.append("polish") or f"polish({text})")
+    monkeypatch.setattr(TranscribeAudio, "summarize_transcript", lambda text, on_progress=None: calls.append("summarize") or f"sum({text})")
+    return calls
+
+
+def _llm(calls, response):
+    def call_llm(prompt):
+        calls.append("structured")
+        return response
+    return call_llm
+
+
+def test_english_source_uses_one_call(monkeypatch, calls):
+    response = json.dumps({"cleaned_text": "clean", "polished_text": "polished", "summary": "summary"})
+    monkeypatch.setattr(TranscribeAudio, "call_llm", _llm(calls, response))
+
+    result = TranscribeAudio.refine_transcript("um hello", "United States", lambda stage: None, llm_mode="structured")
+
+    assert result == ("clean", "clean", "polished", "summary")
+    assert calls == ["structured"]
+
+
+def test_translated_source_straddles_translation(monkeypatch, calls):
+    response = json.dumps({"polished_text": "polished", "summary": "summary"})
+    monkeypatch.setattr(TranscribeAudio, "call_llm", _llm(calls, response))
+
+    result = TranscribeAudio.refine_transcript("namaste", "India", lambda stage: None, llm_mode="structured")
+
+    assert result == ("clean(namaste)", "en(clean(namaste))", "polished", "summary")
+    assert calls == ["clean", "translate", "structured"]
+
+
+def test_invalid_response_falls_back_to_sequential(monkeypatch, calls):
+    monkeypatch.setattr(TranscribeAudio, "call_llm", _llm(calls, "not json"))
+    stages = []
+
+    result = TranscribeAudio.refine_transcript("namaste", "India", stages.append, llm_mode="structured")
+
+    assert result[2] == "polish(en(clean(namaste)))"
+    assert calls == ["clean", "translate", "structured", "polish", "summarize"]
+    assert stages == ["cleaning", "translating", "refining", "polishing", "summarizing"]
+
+
+def test_sequential_mode_is_default(monkeypatch, calls):
+    monkeypatch.delenv("LLM_PIPELINE_MODE", raising=False)
+    TranscribeAudio.refine_transcript("hello", "United States", lambda stage: None)
+    assert calls == ["clean", "polish", "summarize"]
@@ -0,0 +1,100 @@
+"""
+Tests for token-aware chunking and map-reduce summarization.
+Run with: python -m pytest test_text_chunking.py
+"""
+
+import threading
+import time
+
+import TranscribeAudio
+from TranscribeAudio.llm import FakeLLM, set_llm_factory
+from TranscribeAudio.text_chunking import chunk_text, count_tokens, map_chunks, map_reduce_summary, transform_in_chunks
+
+SENTENCES = [f"Sentence number {i} talks about the harvest." for i in range(40)]
+LONG_TEXT = " ".join(SENTENCES)
+
+
+def test_count_tokens_is_positive_for_text():
+    assert count_tokens("") == 0
+    assert count_tokens("hello world") > 0
+
+
+def test_count_tokens_does_not_underestimate_devanagari():
+    """cl100k needs about a token per Devanagari character or more"""
+    text = "नमस्ते दोस्तों, आज की बैठक में हम नई योजना पर चर्चा करेंगे।"
+    assert count_tokens(text) >= len(text)
+
+
+def test_chunks_respect_budget_and_keep_every_sentence():
+    chunks = chunk_text(LONG_TEXT, 50)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == LONG_TEXT
+
+
+def test_oversized_sentence_is_split():
+    sentence = " ".join(["word"] * 400) + "."
+    chunks = chunk_text(sentence, 30)
+    assert all(count_tokens(chunk) <= 30 for chunk in chunks)
+    assert " ".join(chunks) == sentence
+
+
+def test_map_chunks_preserves_order_and_bounds_concurrency():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_upper(chunk):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return chunk.upper()
+
+    chunks = [f"chunk {i}" for i in range(12)]
+    assert map_chunks(slow_upper, chunks, workers=3) == [chunk.upper() for chunk in chunks]
+    assert peak[0] <= 3
+
+
+def test_short_text_is_sent_whole():
+    prompts = []
+    assert transform_in_chunks("short text", lambda t: prompts.append(t) or t.upper(), max_tokens=100) == "SHORT TEXT"
+    assert prompts == ["short text"]
+
+
+def test_long_text_is_transformed_in_order():
+    result = transform_in_chunks(LONG_TEXT, lambda t: f"[{t}]", max_tokens=50, workers=4)
+    assert result.count("[") > 1
+    assert result.replace("[", "").replace("]", "") == LONG_TEXT
+
+
+def test_map_reduce_summary_combines_partials_in_order():
+    parts = []
+
+    def summarize_part(chunk):
+        parts.append(chunk)
+        return chunk.split()[2]
+
+    summary = map_reduce_summary(
+        LONG_TEXT,
+        summarize=lambda t: "whole",
+        summarize_part=summarize_part,
+        combine=lambda partials: f"combined({partials.replace(chr(10) * 2, ',')})",
+        max_tokens=50,
+    )
+    assert summary.startswith("combined(0,")
+    assert len(parts) > 1
+
+
+def test_summarize_transcript_uses_map_reduce_for_long_text(monkeypatch):
+    monkeypatch.setenv("LLM_CHUNK_TOKENS", "60")
+    llm = FakeLLM(handler=lambda prompt: "combined" if "Part summaries" in prompt else "part")
+    set_llm_factory(llm.factory)
+    try:
+        assert TranscribeAudio.summarize_transcript(LONG_TEXT) == "combined"
+    finally:
+        set_llm_factory(None)
+    part_prompts = [p for p in llm.prompts if "one part of a longer" in p]
+    assert len(part_prompts) > 1
+    assert len(llm.prompts) == len(part_prompts) + 1
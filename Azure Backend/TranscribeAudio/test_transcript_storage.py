@@ -0,0 +1,76 @@
+"""
+Tests for transcript artifact writes.
+Run with: python -m pytest test_transcript_storage.py
+"""
+
+import json
+import threading
+
+import pytest
+
+import TranscribeAudio
+from TranscribeAudio import save_transcript_to_blob, transcript_blob_name
+
+
+class FakeBlob:
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+
+    def upload_blob(self, data, overwrite=False, content_settings=None):
+        # Hold every upload until all of them have started
+        self.container.barrier.wait(timeout=5)
+        with self.container.lock:
+            self.container.blobs[self.name] = data
+
+
+class FakeContainer:
+    def __init__(self, parties):
+        self.blobs = {}
+        self.lock = threading.Lock()
+        self.barrier = threading.Barrier(parties)
+
+    def get_blob_client(self, name):
+        return FakeBlob(self, name)
+
+
+TEXTS = ("मूल", "cleaned", "english", "polished", "summary")
+
+
+@pytest.mark.parametrize("mode, count", [("files", 5), ("bundle", 1), ("both", 6)])
+def test_uploads_run_in_one_parallel_wave(monkeypatch, mode, count):
+    container = FakeContainer(count)
+    monkeypatch.setattr(TranscribeAudio, "get_container_client", lambda: container)
+    monkeypatch.setenv("TRANSCRIPT_STORAGE_MODE", mode)
+
+    save_transcript_to_blob(*TEXTS, "abc")
+
+    assert len(container.blobs) == count
+    if mode != "bundle":
+        assert container.blobs["transcripts/abc_polished.txt"] == "polished"
+    if mode != "files":
+        bundle = json.loads(container.blobs["transcripts/abc.json"])
+        assert bundle["transcripts"]["original"] == "मूल"
+        assert list(bundle["transcripts"]) == list(TranscribeAudio.TRANSCRIPT_VARIANTS)
+
+
+def test_unknown_variant_rejected():
+    with pytest.raises(ValueError):
+        transcript_blob_name("abc", "french")
+
+
+def test_unknown_storage_mode_rejected(monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_STORAGE_MODE", "zip")
+    with pytest.raises(ValueError):
+        save_transcript_to_blob(*TEXTS, "abc")
+
+
+def test_skip_original_leaves_bundle_complete(monkeypatch):
+    container = FakeContainer(5)
+    monkeypatch.setattr(TranscribeAudio, "get_container_client", lambda: container)
+    monkeypatch.setenv("TRANSCRIPT_STORAGE_MODE", "both")
+
+    save_transcript_to_blob(*TEXTS, "abc", skip_original=True)
+
+    assert "transcripts/abc_original.txt" not in container.blobs
+    assert json.loads(container.blobs["transcripts/abc.json"])["transcripts"]["original"] == "मूल"
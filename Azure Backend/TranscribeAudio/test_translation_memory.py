@@ -0,0 +1,71 @@
+"""
+Tests for the sentence-level translation memory.
+Run with: python -m pytest test_translation_memory.py
+"""
+
+from TranscribeAudio.translation_memory import (
+    SQLiteTranslationStore, TranslationMemory, normalize_segment, split_segments,
+)
+
+
+class FakeTranslator:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, segments):
+        self.batches.append(list(segments))
+        return [f"<{segment}>" for segment in segments]
+
+
+def test_split_segments_handles_danda_and_cjk():
+    assert split_segments("नमस्ते। आप कैसे हैं?  ठीक") == [("नमस्ते।", " "), ("आप कैसे हैं?", "  "), ("ठीक", "")]
+    assert split_segments("你好。再见！") == [("你好。", ""), ("再见！", "")]
+    assert split_segments("") == []
+
+
+def test_normalize_collapses_whitespace():
+    assert normalize_segment("  नमस्ते\n  दोस्तों ") == "नमस्ते दोस्तों"
+
+
+def test_only_misses_are_sent_in_one_batch():
+    memory = TranslationMemory()
+    translator = FakeTranslator()
+
+    memory.translate("नमस्ते। पहला संदेश। नमस्ते।", "hi", "en", translator)
+    result = memory.translate("नमस्ते। दूसरा संदेश।", "hi", "en", translator)
+
+    assert result == "<नमस्ते।> <दूसरा संदेश।>"
+    assert translator.batches == [["नमस्ते।", "पहला संदेश।"], ["दूसरा संदेश।"]]
+    assert memory.metrics.segments == 5
+    assert memory.metrics.memory_hits == 1
+    # Misses match the sentences sent; the repeated greeting rode along with the first batch
+    assert memory.metrics.misses == 3
+    assert memory.metrics.repeats == 1
+    assert memory.metrics.hit_rate == 0.4
+
+
+def test_language_pairs_are_separate():
+    memory = TranslationMemory()
+    translator = FakeTranslator()
+    memory.translate("Hola.", "es", "en", translator)
+    memory.translate("Hola.", "pt", "en", translator)
+    assert len(translator.batches) == 2
+
+
+def test_cjk_translations_are_spaced():
+    memory = TranslationMemory()
+    assert memory.translate("你好。再见！", "zh-Hans", "en", FakeTranslator()) == "<你好。> <再见！>"
+
+
+def test_persistent_store_survives_lru_eviction(tmp_path):
+    store = SQLiteTranslationStore(str(tmp_path / "tm.sqlite3"))
+    memory = TranslationMemory(store, capacity=1)
+    translator = FakeTranslator()
+
+    memory.translate("एक। दो।", "hi", "en", translator)
+    reloaded = TranslationMemory(SQLiteTranslationStore(str(tmp_path / "tm.sqlite3")), capacity=1)
+    assert reloaded.translate("एक। दो।", "hi", "en", translator) == "<एक।> <दो।>"
+
+    assert len(translator.batches) == 1
+    assert reloaded.metrics.store_hits == 2
+    assert reloaded.metrics.hit_rate == 1.0
@@ -0,0 +1,103 @@
+"""
+Tests for the batched Translator client.
+Run with: python -m pytest test_translator_client.py
+"""
+
+import threading
+
+import pytest
+
+from TranscribeAudio.translator_client import TranslatorClient, build_elements, pack_requests, split_long
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class FakePost:
+    """Echoes each element upper-cased; optionally throttles the first request"""
+
+    def __init__(self, throttle_first=False):
+        self.requests = []
+        self.throttle_first = throttle_first
+        self.lock = threading.Lock()
+
+    def __call__(self, url, headers=None, params=None, json=None):
+        with self.lock:
+            self.requests.append([item["text"] for item in json])
+            if self.throttle_first and len(self.requests) == 1:
+                return FakeResponse(429, "Too many requests", {"Retry-After": "2"})
+        return FakeResponse(200, [{"translations": [{"text": item["text"].upper()}]} for item in json])
+
+
+def test_split_long_cuts_at_whitespace():
+    assert split_long("aaa bbb ccc", 7) == ["aaa bbb", " ccc"]
+    assert split_long("abcdefgh", 3) == ["abc", "def", "gh"]
+
+
+def test_build_elements_groups_sentences():
+    elements, spacings = build_elements("One. Two. Three is longer.", 10)
+    assert elements == ["One. Two.", "Three is", " longer."]
+    assert all(len(element) <= 10 for element in elements)
+    assert spacings == [" ", "", ""]
+
+
+def test_pack_requests_respects_limits():
+    texts = ["a" * 40, "b" * 40, "c" * 10, "d", "e"]
+    assert pack_requests(texts, max_elements=2, max_chars=100) == [[0, 1], [2, 3], [4]]
+    assert pack_requests(texts, max_elements=10, max_chars=60) == [[0], [1, 2, 3, 4]]
+
+
+def test_translate_many_preserves_order_across_requests():
+    post = FakePost()
+    client = TranslatorClient("key", "region", max_elements=3, post=post, sleep=lambda s: None)
+    texts = [f"t{i}" for i in range(10)]
+
+    assert client.translate_many(texts, "hi", "en") == [f"T{i}" for i in range(10)]
+    assert len(post.requests) == 4
+    assert all(len(request) <= 3 for request in post.requests)
+
+
+def test_translate_text_reassembles_sentences():
+    post = FakePost()
+    client = TranslatorClient("key", "region", element_chars=12, post=post, sleep=lambda s: None)
+    assert client.translate_text("नमस्ते। आप कैसे हैं? ठीक।", "hi", "en") == "नमस्ते। आप कैसे हैं? ठीक।".upper()
+
+
+def test_throttled_request_honours_retry_after():
+    post = FakePost(throttle_first=True)
+    sleeps = []
+    client = TranslatorClient("key", "region", post=post, sleep=sleeps.append)
+
+    assert client.translate_many(["hola"], "es", "en") == ["HOLA"]
+    assert sleeps == [2.0]
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def post(url, **kwargs):
+        calls.append(1)
+        return FakeResponse(400, "Invalid language")
+
+    client = TranslatorClient("key", "region", post=post, sleep=lambda s: None)
+    with pytest.raises(Exception, match="Translation failed"):
+        client.translate_many(["hola"], "xx", "en")
+    assert len(calls) == 1
+
+
+def test_translate_segments_splits_oversized_sentences():
+    """A sentence longer than the element limit is split, never sent as one oversized element"""
+    post = FakePost()
+    client = TranslatorClient("key", "region", element_chars=10, max_chars=10, post=post, sleep=lambda s: None)
+    long_sentence = "aaaa bbbb cccc dddd eeee"
+
+    assert client.translate_segments(["short.", long_sentence], "hi", "en") == ["SHORT.", "AAAA BBBB CCCC DDDD EEEE"]
+    assert all(len(text) <= 10 for request in post.requests for text in request)
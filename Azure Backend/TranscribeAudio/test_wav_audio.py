@@ -0,0 +1,88 @@
+"""
+Tests for in-process WAV decoding and resampling.
+Run with: python -m pytest test_wav_audio.py
+"""
+
+import wave
+
+import numpy as np
+
+from TranscribeAudio.wav_audio import decode_wav_in_process, read_mono, read_wav_info, resample
+
+
+def write_pcm(path, samples: np.ndarray, sample_rate: int, sample_width: int = 2) -> None:
+    """Write (frames, channels) float samples as integer PCM"""
+    scale = {1: 127, 2: 32767, 3: 8388607}[sample_width]
+    ints = np.round(samples * scale).astype(np.int32)
+    if sample_width == 1:
+        raw = (ints + 128).astype(np.uint8).tobytes()
+    elif sample_width == 2:
+        raw = ints.astype("<i2").tobytes()
+    else:
+        raw = ints.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(raw)
+
+
+def tone(sample_rate: int, seconds: float = 1.0, frequency: float = 440.0) -> np.ndarray:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def dominant_frequency(samples: np.ndarray, sample_rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.fft.rfftfreq(len(samples), 1 / sample_rate)[spectrum.argmax()]
+
+
+def test_stt_ready_wav_is_moved_without_conversion(tmp_path):
+    src, dst = tmp_path / "in.mp4", tmp_path / "out.wav"
+    write_pcm(src, tone(16000)[:, None], 16000)
+    original = src.read_bytes()
+
+    assert decode_wav_in_process(str(src), str(dst))
+    assert not src.exists()
+    assert dst.read_bytes() == original
+
+
+def test_stereo_48k_is_downmixed_and_resampled(tmp_path):
+    src, dst = tmp_path / "in.mp4", tmp_path / "out.wav"
+    left = tone(48000)
+    write_pcm(src, np.stack([left, left], axis=1), 48000)
+
+    assert decode_wav_in_process(str(src), str(dst))
+    info = read_wav_info(str(dst))
+    assert info.is_stt_ready
+    assert info.frame_count == 16000
+
+    samples, rate = read_mono(str(dst))
+    assert abs(dominant_frequency(samples, rate) - 440) < 2
+
+
+def test_24bit_44k_is_resampled(tmp_path):
+    src, dst = tmp_path / "in.mp4", tmp_path / "out.wav"
+    write_pcm(src, tone(44100)[:, None], 44100, sample_width=3)
+
+    assert decode_wav_in_process(str(src), str(dst))
+    samples, rate = read_mono(str(dst))
+    assert rate == 16000
+    assert abs(len(samples) - 16000) <= 1
+    assert abs(dominant_frequency(samples, rate) - 440) < 2
+
+
+def test_compressed_input_needs_ffmpeg(tmp_path):
+    src = tmp_path / "in.mp4"
+    src.write_bytes(b"\x00\x00\x00\x20ftypisom" + b"\x00" * 64)
+
+    assert not decode_wav_in_process(str(src), str(tmp_path / "out.wav"))
+    assert src.exists()
+
+
+def test_resample_removes_content_above_new_nyquist():
+    """A 12 kHz tone would alias into the 16 kHz output without the anti-aliasing filter"""
+    high = tone(48000, frequency=12000)
+    out = resample(high, 48000, 16000)
+    # Ignore the filter's onset transient at the edges
+    assert np.abs(out[50:-50]).max() < 0.01
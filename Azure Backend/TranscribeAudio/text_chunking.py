@@ -0,0 +1,179 @@
+"""
+Token-aware chunking for LLM prompts over long transcripts.
+Text is split on sentence boundaries into chunks that fit the model's context
+window; chunks are processed concurrently and reassembled in order, and long
+transcripts are summarized map-reduce style.
+"""
+
+import functools
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from .translation_memory import split_segments
+from .translator_client import split_long
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens text uses in a prompt.
+
+    Uses tiktoken when it is installed. Otherwise ASCII text is estimated at
+    four characters per token and every other character at two tokens, since
+    cl100k encodes scripts such as Devanagari at a token or more per character;
+    the estimate errs towards smaller chunks rather than overflowing a prompt.
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for char in text if char.isascii())
+    return math.ceil(ascii_chars / 4) + 2 * (len(text) - ascii_chars)
+
+
+def get_chunk_tokens() -> int:
+    """Largest transcript sent in one prompt; LLM_CHUNK_TOKENS, default 1500"""
+    return int(os.environ.get("LLM_CHUNK_TOKENS", "1500"))
+
+
+def get_chunk_workers() -> int:
+    """Chunk prompts in flight at once; LLM_CHUNK_WORKERS, default 4"""
+    return int(os.environ.get("LLM_CHUNK_WORKERS", "4"))
+
+
+def chunk_text(text: str, max_tokens: int) -> list[str]:
+    """
+    Group consecutive sentences into chunks of at most max_tokens.
+
+    A sentence longer than max_tokens is split at whitespace.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+
+    Returns:
+        Chunks in order, without leading or trailing whitespace
+    """
+    chunks = []
+    current, current_tokens = [], 0
+    for sentence, _ in split_segments(text):
+        pieces = [sentence]
+        sentence_tokens = count_tokens(sentence)
+        if sentence_tokens > max_tokens:
+            # Size pieces by the sentence's own characters per token, with headroom
+            pieces = split_long(sentence, max(1, int(0.9 * max_tokens * len(sentence) / sentence_tokens)))
+        for piece in pieces:
+            piece = piece.strip()
+            if not piece:
+                continue
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def map_chunks(fn: Callable[[str], str], chunks: list[str], workers: int = None) -> list[str]:
+    """Apply fn to each chunk with at most workers calls in flight, preserving order"""
+    workers = workers or get_chunk_workers()
+    if len(chunks) <= 1:
+        return [fn(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return list(executor.map(fn, chunks))
+
+
+def transform_in_chunks(text: str, transform: Callable[..., str], max_tokens: int = None, workers: int = None, on_progress: Callable[[str], None] = None) -> str:
+    """
+    Apply a text-to-text prompt such as polishing to text of any length.
+
+    Text that fits in max_tokens is sent whole; longer text is chunked, the
+    chunks are transformed concurrently and rejoined in order.
+
+    Args:
+        text: Input text
+        transform: Runs the prompt on one chunk; called as transform(chunk, on_progress)
+            to stream the output when on_progress is given and the text fits one prompt
+        max_tokens: Token budget per chunk (defaults to LLM_CHUNK_TOKENS)
+        workers: Concurrent prompts (defaults to LLM_CHUNK_WORKERS)
+        on_progress: Optional callback receiving the output produced so far
+
+    Returns:
+        Transformed text
+    """
+    max_tokens = max_tokens or get_chunk_tokens()
+    if count_tokens(text) <= max_tokens:
+        return transform(text, on_progress) if on_progress else transform(text)
+    chunks = chunk_text(text, max_tokens)
+    logging.info(f"Processing {len(chunks)} chunks of up to {max_tokens} tokens")
+    workers = workers or get_chunk_workers()
+    done = []
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        # Results arrive in order, so each finished chunk extends the output prefix
+        for result in executor.map(transform, chunks):
+            done.append(result.strip())
+            if on_progress:
+                on_progress(" ".join(done))
+    return " ".join(done)
+
+
+def map_reduce_summary(
+    text: str,
+    summarize: Callable[..., str],
+    summarize_part: Callable[[str], str],
+    combine: Callable[..., str],
+    max_tokens: int = None,
+    workers: int = None,
+    on_progress: Callable[[str], None] = None,
+) -> str:
+    """
+    Summarize text of any length.
+
+    Text that fits is summarized in one prompt. Otherwise each chunk is
+    summarized concurrently (map) and the partial summaries are combined
+    into one (reduce), repeating the map step while the partial summaries
+    are still too long for a single prompt.
+
+    Args:
+        text: Text to summarize
+        summarize: Summarizes text that fits in one prompt
+        summarize_part: Summarizes one chunk of a longer text
+        combine: Merges the ordered partial summaries into the final summary
+        max_tokens: Token budget per prompt (defaults to LLM_CHUNK_TOKENS)
+        workers: Concurrent prompts (defaults to LLM_CHUNK_WORKERS)
+        on_progress: Optional callback streaming the final summary; passed as
+            the second argument to summarize or combine
+
+    Returns:
+        Summary text
+    """
+    def final(step: Callable[..., str], prompt_text: str) -> str:
+        return step(prompt_text, on_progress) if on_progress else step(prompt_text)
+
+    max_tokens = max_tokens or get_chunk_tokens()
+    if count_tokens(text) <= max_tokens:
+        return final(summarize, text)
+
+    partials = [text]
+    while True:
+        chunks = chunk_text("\n\n".join(partials), max_tokens)
+        logging.info(f"Summarizing {len(chunks)} chunks of up to {max_tokens} tokens")
+        previous = len(partials)
+        partials = [summary.strip() for summary in map_chunks(summarize_part, chunks, workers)]
+        combined = "\n\n".join(partials)
+        # Stop if another pass would not shrink the input
+        if count_tokens(combined) <= max_tokens or len(partials) >= previous > 1:
+            return final(combine, combined)
@@ -0,0 +1,229 @@
+"""
+Sentence-level translation memory for translate_to_english.
+Text is split into sentences and each (language pair, normalized sentence)
+is looked up in an in-process LRU and an optional SQLite store; only the
+misses are sent to the Translator, in one batched request.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+# A sentence ends at Latin or Devanagari terminators followed by whitespace, at
+# CJK full-width terminators, or at the end of the text
+_SEGMENT_RE = re.compile(r".+?(?:[.!?।॥]+(?=\s|$)|[。！？]+|$)\s*", re.S)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def split_segments(text: str) -> list[tuple[str, str]]:
+    """
+    Split text into sentences.
+
+    Returns:
+        List of (sentence, whitespace that followed it) so the text can be reassembled
+    """
+    segments = []
+    for match in _SEGMENT_RE.finditer(text):
+        piece = match.group(0)
+        sentence = piece.rstrip()
+        if sentence:
+            segments.append((sentence, piece[len(sentence):]))
+        elif segments:
+            segments[-1] = (segments[-1][0], segments[-1][1] + piece)
+    return segments
+
+
+def join_segments(translations: list[str], spacings: list[str]) -> str:
+    """Reassemble translated sentences with the whitespace that followed each original"""
+    parts = []
+    for index, (translation, spacing) in enumerate(zip(translations, spacings)):
+        parts.append(translation)
+        # CJK sentences are not separated by spaces but their translations are
+        if not spacing and index < len(translations) - 1:
+            spacing = " "
+        parts.append(spacing)
+    return "".join(parts)
+
+
+def normalize_segment(segment: str) -> str:
+    """Lookup form of a sentence: NFC with whitespace runs collapsed"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", segment)).strip()
+
+
+@dataclass
+class TranslationMetrics:
+    """
+    Segment counters for translation memory lookups.
+
+    misses counts the distinct sentences sent to the Translator, and repeats
+    the further copies of those sentences within the same text, which are
+    translated by the same request.
+    """
+    segments: int = 0
+    memory_hits: int = 0
+    store_hits: int = 0
+    repeats: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of segments that did not need a Translator request"""
+        return (self.segments - self.misses) / self.segments if self.segments else 0.0
+
+    def add(self, other: "TranslationMetrics") -> None:
+        self.segments += other.segments
+        self.memory_hits += other.memory_hits
+        self.store_hits += other.store_hits
+        self.repeats += other.repeats
+        self.misses += other.misses
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 3)}
+
+
+class SQLiteTranslationStore:
+    """Persistent translation memory backed by SQLite"""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations "
+                "(language_pair TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+                "PRIMARY KEY (language_pair, source))"
+            )
+            self._conn.commit()
+
+    def get_many(self, language_pair: str, sources: list[str]) -> dict[str, str]:
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(sources), 500):
+                batch = sources[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT source, target FROM translations WHERE language_pair = ? AND source IN ({','.join('?' * len(batch))})",
+                    (language_pair, *batch)
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, language_pair: str, translations: dict[str, str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (language_pair, source, target) VALUES (?, ?, ?)",
+                [(language_pair, source, target) for source, target in translations.items()]
+            )
+            self._conn.commit()
+
+
+class TranslationMemory:
+    """
+    LRU of recent sentence translations in front of an optional persistent store.
+
+    Cumulative hit and miss counts are kept in metrics.
+    """
+
+    def __init__(self, store: Optional[SQLiteTranslationStore] = None, capacity: int = 10000):
+        self._store = store
+        self._capacity = capacity
+        self._lru: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = TranslationMetrics()
+
+    def _remember(self, language_pair: str, translations: dict[str, str]) -> None:
+        with self._lock:
+            for source, target in translations.items():
+                self._lru[(language_pair, source)] = target
+                self._lru.move_to_end((language_pair, source))
+            while len(self._lru) > self._capacity:
+                self._lru.popitem(last=False)
+
+    def translate(self, text: str, source_language: str, target_language: str, translate_batch: Callable[[list[str]], list[str]]) -> str:
+        """
+        Translate text sentence by sentence, reusing remembered sentences.
+
+        Args:
+            text: Text to translate
+            source_language: Translator source language code
+            target_language: Translator target language code
+            translate_batch: Translates a list of sentences in one request, preserving order
+
+        Returns:
+            Translated text with the original sentence spacing
+        """
+        segments = split_segments(text)
+        if not segments:
+            return text
+        language_pair = f"{source_language}:{target_language}"
+        keys = [normalize_segment(sentence) for sentence, _ in segments]
+        call_metrics = TranslationMetrics(segments=len(keys))
+
+        found = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if (language_pair, key) in self._lru:
+                    self._lru.move_to_end((language_pair, key))
+                    found[key] = self._lru[(language_pair, key)]
+        call_metrics.memory_hits = sum(1 for key in keys if key in found)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and self._store is not None:
+            stored = self._store.get_many(language_pair, missing)
+            found.update(stored)
+            self._remember(language_pair, stored)
+            call_metrics.store_hits = sum(1 for key in keys if key in stored)
+            missing = [key for key in missing if key not in stored]
+
+        if missing:
+            translated = dict(zip(missing, translate_batch(missing)))
+            found.update(translated)
+            self._remember(language_pair, translated)
+            if self._store is not None:
+                self._store.put_many(language_pair, translated)
+        call_metrics.misses = len(missing)
+        call_metrics.repeats = call_metrics.segments - call_metrics.memory_hits - call_metrics.store_hits - call_metrics.misses
+
+        with self._lock:
+            self.metrics.add(call_metrics)
+        logging.info(
+            f"Translation memory: {call_metrics.to_dict()}, cumulative hit rate {self.metrics.hit_rate:.1%}"
+        )
+
+        return join_segments([found[key] for key in keys], [spacing for _, spacing in segments])
+
+
+_memory: Optional[TranslationMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """
+    Get the process-wide translation memory, or None when it is off.
+
+    TRANSLATION_MEMORY selects "off" (default), "memory" (in-process LRU of
+    TRANSLATION_MEMORY_SIZE sentences, default 10000) or "sqlite" (the LRU in
+    front of a SQLite database at TRANSLATION_MEMORY_PATH).
+    """
+    global _memory
+    mode = os.environ.get("TRANSLATION_MEMORY", "off").lower()
+    if mode == "off":
+        return None
+    with _memory_lock:
+        if _memory is None:
+            capacity = int(os.environ.get("TRANSLATION_MEMORY_SIZE", "10000"))
+            if mode == "memory":
+                _memory = TranslationMemory(capacity=capacity)
+            elif mode == "sqlite":
+                path = os.environ.get("TRANSLATION_MEMORY_PATH", os.path.join(tempfile.gettempdir(), "translation_memory.sqlite3"))
+                _memory = TranslationMemory(SQLiteTranslationStore(path), capacity=capacity)
+            else:
+                raise ValueError(f"Unsupported TRANSLATION_MEMORY: {mode}. Use 'off', 'memory', or 'sqlite'")
+        return _memory
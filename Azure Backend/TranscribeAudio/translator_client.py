@@ -0,0 +1,233 @@
+"""
+Azure Translator client with size-aware batching.
+Text is split on sentence boundaries into elements, elements are packed into
+requests under the Translator's per-request element and character limits,
+and the requests run concurrently, backing off on 429 and 5xx responses.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .http_session import get_session
+from .polling import parse_retry_after
+from .translation_memory import join_segments, split_segments
+
+TRANSLATOR_ENDPOINT = "https://api.cognitive.microsofttranslator.com/translate"
+
+# Translator v3 limits per request
+MAX_ELEMENTS = 1000
+MAX_CHARS = 50000
+
+
+def split_long(text: str, max_chars: int) -> list[str]:
+    """Split text longer than max_chars at whitespace (or hard, if there is none)"""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut])
+        text = text[cut:]
+    pieces.append(text)
+    return pieces
+
+
+def build_elements(text: str, element_chars: int) -> tuple[list[str], list[str]]:
+    """
+    Group consecutive sentences into elements of up to element_chars.
+
+    Returns:
+        Tuple of (elements, whitespace to put after each translated element)
+    """
+    elements, spacings = [], []
+    current, current_spacing = "", ""
+    for sentence, spacing in split_segments(text):
+        for piece in split_long(sentence, element_chars):
+            if current and len(current) + len(current_spacing) + len(piece) > element_chars:
+                elements.append(current)
+                spacings.append(current_spacing)
+                current, current_spacing = "", ""
+            current = f"{current}{current_spacing}{piece}" if current else piece
+            current_spacing = ""
+        current_spacing = spacing
+    if current:
+        elements.append(current)
+        spacings.append(current_spacing)
+    return elements, spacings
+
+
+def pack_requests(texts: list[str], max_elements: int = MAX_ELEMENTS, max_chars: int = MAX_CHARS) -> list[list[int]]:
+    """
+    Pack element indices into requests that respect the element and character limits.
+
+    Every text must already be at most max_chars long.
+    """
+    batches, current, current_chars = [], [], 0
+    for index, text in enumerate(texts):
+        if current and (len(current) == max_elements or current_chars + len(text) > max_chars):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(index)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TranslatorClient:
+    """
+    Translates lists of texts in as few concurrent requests as the limits allow.
+
+    Args:
+        key: Translator subscription key
+        region: Translator resource region
+        workers: Requests in flight at once
+        element_chars: Target characters per element when splitting long text
+        max_retries: Retries per request on 429 and 5xx responses
+        post: Callable with the requests.post signature
+        sleep: Used between retries
+    """
+
+    def __init__(
+        self,
+        key: str,
+        region: str,
+        workers: int = 4,
+        element_chars: int = 1000,
+        max_retries: int = 3,
+        max_elements: int = MAX_ELEMENTS,
+        max_chars: int = MAX_CHARS,
+        post: Callable = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._headers = {
+            "Ocp-Apim-Subscription-Key": key,
+            "Ocp-Apim-Subscription-Region": region,
+            "Content-Type": "application/json"
+        }
+        self.workers = workers
+        self.element_chars = min(element_chars, max_chars)
+        self.max_retries = max_retries
+        self.max_elements = max_elements
+        self.max_chars = max_chars
+        self._post = post or get_session().post
+        self._sleep = sleep
+
+    def _send(self, texts: list[str], source_language: str, target_language: str) -> list[str]:
+        params = {"api-version": "3.0", "from": source_language, "to": target_language}
+        body = [{"text": text} for text in texts]
+        for attempt in range(self.max_retries + 1):
+            response = self._post(TRANSLATOR_ENDPOINT, headers=self._headers, params=params, json=body)
+            if response.status_code == 200:
+                return [item["translations"][0]["text"] for item in response.json()]
+            if response.status_code != 429 and response.status_code < 500:
+                break
+            if attempt < self.max_retries:
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                delay = delay if delay is not None else 2 ** attempt
+                logging.warning(f"Translator returned {response.status_code}; retrying in {delay:.1f}s")
+                self._sleep(delay)
+        raise Exception(f"Translation failed: {response.text}")
+
+    def translate_many(self, texts: list[str], source_language: str, target_language: str) -> list[str]:
+        """
+        Translate texts, each under max_chars, preserving order.
+
+        Args:
+            texts: Texts to translate
+            source_language: Translator source language code
+            target_language: Translator target language code
+
+        Returns:
+            Translations in the same order
+        """
+        batches = pack_requests(texts, self.max_elements, self.max_chars)
+        if len(batches) > 1:
+            logging.info(f"Translating {len(texts)} elements in {len(batches)} requests")
+
+        def run(batch: list[int]) -> list[str]:
+            return self._send([texts[index] for index in batch], source_language, target_language)
+
+        if len(batches) == 1:
+            results = [run(batches[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as executor:
+                results = list(executor.map(run, batches))
+
+        translations = [None] * len(texts)
+        for batch, batch_result in zip(batches, results):
+            for index, translation in zip(batch, batch_result):
+                translations[index] = translation
+        return translations
+
+    def translate_segments(self, segments: list[str], source_language: str, target_language: str) -> list[str]:
+        """
+        Translate sentences of any length, one translation per sentence.
+
+        Sentences longer than element_chars are split the same way
+        translate_text splits them, and their pieces are rejoined afterwards.
+
+        Args:
+            segments: Sentences to translate
+            source_language: Translator source language code
+            target_language: Translator target language code
+
+        Returns:
+            Translations in the same order
+        """
+        pieces, owners = [], []
+        for index, segment in enumerate(segments):
+            for piece in split_long(segment, self.element_chars):
+                pieces.append(piece)
+                owners.append(index)
+        translations = [""] * len(segments)
+        for piece, owner, translation in zip(pieces, owners, self.translate_many(pieces, source_language, target_language)):
+            # Pieces cut at whitespace are rejoined with a space, hard cuts without one
+            separator = " " if translations[owner] and piece[:1].isspace() else ""
+            translations[owner] = f"{translations[owner]}{separator}{translation.strip()}"
+        return translations
+
+    def translate_text(self, text: str, source_language: str, target_language: str) -> str:
+        """
+        Translate text of any length by splitting it on sentence boundaries.
+
+        Args:
+            text: Text to translate
+            source_language: Translator source language code
+            target_language: Translator target language code
+
+        Returns:
+            Translated text
+        """
+        elements, spacings = build_elements(text, self.element_chars)
+        if not elements:
+            return text
+        return join_segments(self.translate_many(elements, source_language, target_language), spacings)
+
+
+_client: Optional[TranslatorClient] = None
+_client_lock = threading.Lock()
+
+
+def get_translator_client() -> TranslatorClient:
+    """
+    Get the process-wide Translator client.
+
+    Uses AZURE_TRANSLATOR_KEY and AZURE_TRANSLATOR_REGION, with
+    TRANSLATOR_WORKERS (default 4) concurrent requests and
+    TRANSLATOR_ELEMENT_CHARS (default 1000) characters per element.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TranslatorClient(
+                os.environ["AZURE_TRANSLATOR_KEY"],
+                os.environ["AZURE_TRANSLATOR_REGION"],
+                workers=int(os.environ.get("TRANSLATOR_WORKERS", "4")),
+                element_chars=int(os.environ.get("TRANSLATOR_ELEMENT_CHARS", "1000")),
+            )
+        return _client
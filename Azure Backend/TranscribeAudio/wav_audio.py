@@ -0,0 +1,258 @@
+"""
+In-process WAV decoding and resampling with NumPy.
+Inputs that are already WAV/PCM are downmixed and resampled to 16 kHz mono
+here, so ffmpeg is only spawned for genuinely compressed containers.
+"""
+
+import logging
+import os
+import struct
+import wave
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Format expected by Azure Speech batch transcription
+TARGET_SAMPLE_RATE = 16000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Windowed-sinc anti-aliasing filter length and rows filtered per block
+_FILTER_TAPS = 63
+_FILTER_BLOCK = 1 << 16
+
+
+@dataclass
+class WavInfo:
+    """Layout of a WAV file's audio data"""
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_count(self) -> int:
+        return self.data_size // (self.channels * self.bits_per_sample // 8)
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate
+
+    @property
+    def is_stt_ready(self) -> bool:
+        """Already 16-bit PCM, 16 kHz, mono"""
+        return (
+            self.format_tag == WAVE_FORMAT_PCM
+            and self.bits_per_sample == 16
+            and self.channels == 1
+            and self.sample_rate == TARGET_SAMPLE_RATE
+        )
+
+
+def sniff_format(header: bytes) -> str:
+    """
+    Identify an audio container from its first bytes.
+
+    Returns:
+        "wav" for RIFF/WAVE files, otherwise "compressed"
+    """
+    if len(header) >= 12 and header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    return "compressed"
+
+
+def read_wav_info(path: str) -> Optional[WavInfo]:
+    """
+    Parse a WAV header.
+
+    Returns:
+        WavInfo for PCM or IEEE float WAV files, None for anything ffmpeg must handle
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if sniff_format(f.read(12)) != "wav":
+            return None
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if chunk_size & 1:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None or len(fmt) < 16:
+                    return None
+                format_tag, channels, sample_rate, _, _, bits_per_sample = struct.unpack("<HHIIHH", fmt[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                    # The sub-format GUID starts with the real format tag
+                    format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+                supported = (
+                    (format_tag == WAVE_FORMAT_PCM and bits_per_sample in (8, 16, 24, 32))
+                    or (format_tag == WAVE_FORMAT_IEEE_FLOAT and bits_per_sample in (32, 64))
+                )
+                if not supported or channels < 1 or sample_rate < 1:
+                    return None
+
+                # Piped writers leave the size unset (0 or 0xFFFFFFFF); trust the file length then
+                data_offset = f.tell()
+                data_size = file_size - data_offset
+                if chunk_size not in (0, 0xFFFFFFFF):
+                    data_size = min(chunk_size, data_size)
+                return WavInfo(format_tag, channels, sample_rate, bits_per_sample, data_offset, data_size)
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def read_samples(path: str, info: WavInfo) -> np.ndarray:
+    """
+    Decode WAV data to float32 samples in [-1, 1].
+
+    Returns:
+        Array of shape (frames, channels)
+    """
+    frame_bytes = info.channels * info.bits_per_sample // 8
+    with open(path, "rb") as f:
+        f.seek(info.data_offset)
+        raw = f.read(info.frame_count * frame_bytes)
+
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        samples = np.frombuffer(raw, dtype="<f4" if info.bits_per_sample == 32 else "<f8").astype(np.float32)
+    elif info.bits_per_sample == 8:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif info.bits_per_sample == 16:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif info.bits_per_sample == 24:
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        samples = values.astype(np.float32) / 8388608.0
+    else:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+
+    return samples.reshape(-1, info.channels)
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Average all channels into one"""
+    if samples.ndim == 1:
+        return samples
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+def _lowpass_filter(cutoff: float) -> np.ndarray:
+    """Hamming-windowed sinc low-pass filter; cutoff is in cycles per sample"""
+    n = np.arange(_FILTER_TAPS) - (_FILTER_TAPS - 1) / 2
+    taps = np.sinc(2 * cutoff * n) * np.hamming(_FILTER_TAPS)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def _filter(samples: np.ndarray, taps: np.ndarray, step: int = 1) -> np.ndarray:
+    """Apply an FIR filter, only computing every step-th output sample"""
+    pad = len(taps) // 2
+    padded = np.pad(samples, (pad, len(taps) - 1 - pad))
+    windows = sliding_window_view(padded, len(taps))[::step]
+    out = np.empty(len(windows), dtype=np.float32)
+    for start in range(0, len(windows), _FILTER_BLOCK):
+        out[start:start + _FILTER_BLOCK] = windows[start:start + _FILTER_BLOCK] @ taps[::-1]
+    return out
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample mono audio.
+
+    Downsampling applies an anti-aliasing filter first; integer ratios then
+    decimate directly, other ratios use linear interpolation.
+
+    Args:
+        samples: Mono float samples
+        src_rate: Source sample rate
+        dst_rate: Target sample rate
+
+    Returns:
+        Resampled float32 samples
+    """
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+
+    if dst_rate < src_rate:
+        taps = _lowpass_filter(0.5 * dst_rate / src_rate)
+        if src_rate % dst_rate == 0:
+            return _filter(samples, taps, step=src_rate // dst_rate)
+        samples = _filter(samples, taps)
+
+    out_length = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(out_length, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> None:
+    """Write mono float samples as 16-bit PCM WAV"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+
+def read_mono(path: str) -> tuple[np.ndarray, int]:
+    """
+    Read a WAV file as mono float samples.
+
+    Returns:
+        Tuple of (samples, sample_rate)
+
+    Raises:
+        ValueError: If the file is not a PCM or IEEE float WAV
+    """
+    info = read_wav_info(path)
+    if info is None:
+        raise ValueError(f"Unsupported WAV file: {path}")
+    return to_mono(read_samples(path, info)), info.sample_rate
+
+
+def decode_wav_in_process(src_path: str, wav_path: str) -> bool:
+    """
+    Produce the 16 kHz mono WAV for STT without spawning ffmpeg, when possible.
+
+    Files that are already 16-bit 16 kHz mono PCM are moved into place as-is;
+    other PCM/float WAV files are downmixed and resampled with NumPy.
+
+    Args:
+        src_path: Downloaded source file
+        wav_path: Where to write the STT-ready WAV
+
+    Returns:
+        True if wav_path was produced, False if the input needs ffmpeg
+    """
+    info = read_wav_info(src_path)
+    if info is None:
+        return False
+
+    if info.is_stt_ready:
+        logging.info("Input is already 16 kHz mono PCM WAV; skipping conversion")
+        os.replace(src_path, wav_path)
+        return True
+
+    logging.info(
+        f"Converting WAV in-process: {info.channels} ch, {info.sample_rate} Hz, "
+        f"{info.bits_per_sample}-bit -> 1 ch, {TARGET_SAMPLE_RATE} Hz, 16-bit"
+    )
+    samples = to_mono(read_samples(src_path, info))
+    write_wav(wav_path, resample(samples, info.sample_rate))
+    return True
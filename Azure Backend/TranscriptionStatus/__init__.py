@@ -0,0 +1,31 @@
+import azure.functions as func
+import json
+import logging
+from TranscribeAudio.jobs import get_job_store
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    job_id = req.route_params.get("job_id")
+
+    try:
+        record = get_job_store().get(job_id)
+    except Exception as e:
+        logging.error(f"Error: {str(e)}")
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+    if record is None:
+        return func.HttpResponse(
+            json.dumps({"error": f"Unknown job: {job_id}"}),
+            status_code=404,
+            mimetype="application/json"
+        )
+
+    return func.HttpResponse(
+        json.dumps(record),
+        status_code=200,
+        mimetype="application/json"
+    )
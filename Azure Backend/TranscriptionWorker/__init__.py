@@ -0,0 +1,15 @@
+import azure.functions as func
+import logging
+import os
+from TranscribeAudio import process_transcription
+from TranscribeAudio.jobs import get_job_store, run_job
+
+
+def main(msg: func.QueueMessage) -> None:
+    logging.info(f"Transcription worker picked up message: {msg.id}")
+    # Earlier attempts raise so the queue redelivers the message; keep JOB_MAX_ATTEMPTS in step with maxDequeueCount in host.json
+    record = run_job(
+        msg.get_body().decode("utf-8"), get_job_store(), process_transcription,
+        attempt=msg.dequeue_count, max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+    )
+    logging.info(f"Job {record['job_id']} finished with status: {record['status']}")
@@ -0,0 +1,9 @@
+import azure.functions as func
+import logging
+from TranscribeAudio.ffmpeg_binary import prewarm_ffmpeg
+
+
+def main(warmupContext: func.Context) -> None:
+    # Runs when a new instance is added, before it receives traffic
+    logging.info("Warmup started: provisioning ffmpeg")
+    prewarm_ffmpeg(background=False)
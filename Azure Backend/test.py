@@ -1,3 +1,4 @@
+import time
 import requests
 
 # Update the URL to the new async HTTP endpoint
@@ -10,3 +11,14 @@ payload = {
 response = requests.post(url, json=payload)
 print("Status code:", response.status_code)
 print("Response:", response.text)
+
+# Poll the status endpoint until the job finishes
+if response.status_code == 202:
+    status_url = "http://localhost:7071" + response.json()["status_url"]
+    while True:
+        job = requests.get(status_url).json()
+        print("Stage:", job["stage"])
+        if job["status"] in ("succeeded", "failed"):
+            print("Result:", job["result"] or job["error"])
+            break
+        time.sleep(2)
@@ -15,7 +15,7 @@ from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_b
 from azure.cognitiveservices.speech import SpeechConfig
 from datetime import datetime, timedelta
 from .language_config import get_language_config, get_supported_countries
-from langchain_openai import AzureChatOpenAI
+from .llm import complete
 
 def clean_transcription(text: str, language: str) -> str:
     """
@@ -26,27 +26,13 @@ def clean_transcription(text: str, language: str) -> str:
     Returns:
         Cleaned transcription string
     """
-    import os
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
-    api_key = os.environ.get("AZURE_OPENAI_KEY")
-    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
-
-    if not api_key or not azure_endpoint:
-        raise Exception("Missing Azure OpenAI configuration. Please set AZURE_OPENAI_KEY and AZURE_OPENAI_ENDPOINT environment variables.")
-
     prompt = (
         f"Clean up this {language} transcription: "
         "remove filler words, repeated words, fix grammar and punctuation, "
         "and make it easy to translate. Output only the cleaned text.\n\n"
         f"Transcription:\n{text}\n\nCleaned:"
     )
-    llm = AzureChatOpenAI(
-        deployment_name=deployment_name,
-        api_key=api_key,
-        azure_endpoint=azure_endpoint
-    )
-    response = llm.invoke(prompt)
-    return response.content
+    return complete(prompt, kind="chat")
 
 def polish_english_text(text: str) -> str:
     """
@@ -56,26 +42,12 @@ def polish_english_text(text: str) -> str:
     Returns:
         Polished English text
     """
-    import os
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
-    api_key = os.environ.get("AZURE_OPENAI_KEY")
-    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
-
-    if not api_key or not azure_endpoint:
-        raise Exception("Missing Azure OpenAI configuration. Please set AZURE_OPENAI_KEY and AZURE_OPENAI_ENDPOINT environment variables.")
-
     prompt = (
         "Polish this English text for clarity, grammar, and natural flow. "
         "Output only the improved version.\n\n"
         f"Text:\n{text}\n\nPolished:"
     )
-    llm = AzureChatOpenAI(
-        deployment_name=deployment_name,
-        api_key=api_key,
-        azure_endpoint=azure_endpoint
-    )
-    response = llm.invoke(prompt)
-    return response.content
+    return complete(prompt, kind="chat")
 
 
 def summarize_transcript(text: str) -> str:
@@ -86,26 +58,12 @@ def summarize_transcript(text: str) -> str:
     Returns:
         Summary string
     """
-    import os
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-35-turbo")
-    api_key = os.environ.get("AZURE_OPENAI_KEY")
-    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
-
-    if not api_key or not azure_endpoint:
-        raise Exception("Missing Azure OpenAI configuration. Please set AZURE_OPENAI_KEY and AZURE_OPENAI_ENDPOINT environment variables.")
-
     prompt = (
         "Summarize the following voice memo in 2-3 sentences, highlighting the main points and any action items. "
         "Output only the summary.\n\n"
         f"Transcript:\n{text}\n\nSummary:"
     )
-    llm = AzureChatOpenAI(
-        deployment_name=deployment_name,
-        api_key=api_key,
-        azure_endpoint=azure_endpoint
-    )
-    response = llm.invoke(prompt)
-    return response.content
+    return complete(prompt, kind="chat")
 
 #local Testing
 """